@@ -0,0 +1,84 @@
+# account/authentication.py
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+# حقول لا تُخزن في النسخة المخففة (تبقى مؤجلة وتُحمّل عند الحاجة فقط)
+SNAPSHOT_EXCLUDED_FIELDS = ('password',)
+
+
+def _get_cache():
+    return caches[getattr(settings, 'AUTH_USER_CACHE_ALIAS', 'default')]
+
+
+def user_cache_key(user_id):
+    return f'auth:user:{user_id}'
+
+
+def invalidate_cached_user(user_id):
+    """
+    حذف النسخة المخزنة للمستخدم: فوراً، ومرة أخرى بعد نجاح المعاملة
+    حتى لا يُعيد طلب متزامن تخزين القيم القديمة قبل الاعتماد
+    """
+    if user_id is None:
+        return
+    key = user_cache_key(user_id)
+    _get_cache().delete(key)
+    transaction.on_commit(lambda: _get_cache().delete(key))
+
+
+def _snapshot_fields(model):
+    return [
+        field for field in model._meta.concrete_fields
+        if field.name not in SNAPSHOT_EXCLUDED_FIELDS
+    ]
+
+
+def build_user_snapshot(user):
+    return {field.attname: getattr(user, field.attname) for field in _snapshot_fields(type(user))}
+
+
+def user_from_snapshot(model, snapshot):
+    """إعادة بناء المستخدم كأنه محمّل من قاعدة البيانات (الحقول غير المخزنة مؤجلة)"""
+    field_names = [field.attname for field in _snapshot_fields(model) if field.attname in snapshot]
+    return model.from_db(
+        model.objects.db,
+        field_names,
+        [snapshot[name] for name in field_names]
+    )
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication مع تخزين نسخة مخففة من المستخدم لكل معرف (AUTH_USER_CACHE_TIMEOUT ثانية)
+    فلا يحتاج التحقق من الصلاحيات (is_admin / is_learner) لأي استعلام في الطلبات المتكررة
+    النسخة تُحذف عند حفظ المستخدم أو حذفه، فردياً أو جماعياً (CustomUser.save / delete و CustomUserQuerySet)
+    """
+
+    def get_user(self, validated_token):
+        timeout = getattr(settings, 'AUTH_USER_CACHE_TIMEOUT', 60)
+        # التحقق من تغيير كلمة المرور يحتاج صف المستخدم كاملاً
+        if not timeout or api_settings.CHECK_REVOKE_TOKEN:
+            return super().get_user(validated_token)
+
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_('Token contained no recognizable user identification'))
+
+        cache = _get_cache()
+        key = user_cache_key(user_id)
+        snapshot = cache.get(key)
+        if snapshot is not None:
+            user = user_from_snapshot(self.user_model, snapshot)
+        else:
+            user = super().get_user(validated_token)
+            cache.set(key, build_user_snapshot(user), timeout=timeout)
+
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+        return user
@@ -0,0 +1,85 @@
+# account/last_login.py
+import atexit
+import threading
+
+from django.conf import settings
+from django.db import connections, models
+from django.utils import timezone
+
+# عدد المستخدمين في كل جملة UPDATE ... CASE
+FLUSH_BATCH_SIZE = 500
+
+
+class LastLoginBuffer:
+    """
+    تخزين تحديثات last_login في الذاكرة وكتابتها دفعة واحدة:
+    جملة UPDATE واحدة (CASE id WHEN ... THEN ...) لكل FLUSH_BATCH_SIZE مستخدم
+    كل LAST_LOGIN_MAX_STALENESS ثانية على الأكثر، وعند إيقاف العملية (atexit)
+    فلا ينتظر تسجيل الدخول قفل الكتابة في SQLite
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._timer = None
+
+    @property
+    def max_staleness(self):
+        return getattr(settings, 'LAST_LOGIN_MAX_STALENESS', 30)
+
+    def record(self, user, when=None):
+        when = when or timezone.now()
+        user.last_login = when
+
+        if not self.max_staleness:
+            # التخزين معطل: كتابة مباشرة للعمود فقط
+            self.write({user.pk: when})
+            return
+
+        with self._lock:
+            self._pending[user.pk] = when
+            if self._timer is None:
+                self._timer = threading.Timer(self.max_staleness, self._flush_from_timer)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def pending_count(self):
+        with self._lock:
+            return len(self._pending)
+
+    def flush(self):
+        """كتابة كل القيم المعلقة وإرجاع عدد المستخدمين المحدثين"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        if pending:
+            self.write(pending)
+        return len(pending)
+
+    def _flush_from_timer(self):
+        try:
+            self.flush()
+        finally:
+            # اتصال قاعدة البيانات الخاص بخيط المؤقت
+            connections.close_all()
+
+    @staticmethod
+    def write(values):
+        from .models import CustomUser
+
+        items = sorted(values.items())
+        for start in range(0, len(items), FLUSH_BATCH_SIZE):
+            batch = items[start:start + FLUSH_BATCH_SIZE]
+            # update() يحذف النسخ المخزنة للمصادقة لهذه الدفعة (CustomUserQuerySet)
+            CustomUser.objects.filter(pk__in=[user_id for user_id, _ in batch]).update(
+                last_login=models.Case(
+                    *[models.When(pk=user_id, then=models.Value(when)) for user_id, when in batch],
+                    output_field=models.DateTimeField()
+                )
+            )
+
+
+last_login_buffer = LastLoginBuffer()
+atexit.register(last_login_buffer.flush)
@@ -0,0 +1,54 @@
+# account/management/commands/prune_tokens.py
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+
+class Command(BaseCommand):
+    help = (
+        'حذف التوكنات المنتهية من جداول OutstandingToken و BlacklistedToken على دفعات محدودة '
+        '(كل دفعة في معاملة قصيرة حتى لا تُقفل الجداول طويلاً) '
+        '(مثال cron: 15 3 * * * python manage.py prune_tokens)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='عدد الصفوف المحذوفة في كل دفعة')
+        parser.add_argument('--pause', type=float, default=0.0, help='انتظار بالثواني بين الدفعات')
+        parser.add_argument('--dry-run', action='store_true', help='عرض الأعداد فقط دون حذف')
+
+    def _prune(self, model, queryset, batch_size, pause):
+        deleted = 0
+        while True:
+            batch_ids = list(queryset.order_by('id').values_list('id', flat=True)[:batch_size])
+            if not batch_ids:
+                return deleted
+            with transaction.atomic():
+                model.objects.filter(id__in=batch_ids).delete()
+            deleted += len(batch_ids)
+            if pause:
+                time.sleep(pause)
+
+    def handle(self, *args, **options):
+        batch_size = max(1, options['batch_size'])
+        now = timezone.now()
+
+        # الإلغاءات أولاً (مرتبطة بالتوكن بمفتاح أجنبي) ثم التوكنات المنتهية
+        expired_blacklisted = BlacklistedToken.objects.filter(token__expires_at__lte=now)
+        expired_outstanding = OutstandingToken.objects.filter(expires_at__lte=now)
+
+        if options['dry_run']:
+            self.stdout.write(
+                f'التوكنات الملغاة المنتهية: {expired_blacklisted.count()}، '
+                f'التوكنات المنتهية: {expired_outstanding.count()}'
+            )
+            return
+
+        blacklisted = self._prune(BlacklistedToken, expired_blacklisted, batch_size, options['pause'])
+        outstanding = self._prune(OutstandingToken, expired_outstanding, batch_size, options['pause'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ تم حذف {blacklisted} توكن ملغى و {outstanding} توكن منتهي'
+        ))
@@ -1,10 +1,40 @@
 # accounts/models.py 
+from django.conf import settings
 from django.db import models
 from django.contrib.auth.models import AbstractUser, BaseUserManager
 from django.utils.translation import gettext_lazy as _
 
+class CustomUserQuerySet(models.QuerySet):
+    """
+    التحديث والحذف الجماعي يحذفان النسخ المخزنة للمستخدمين المتأثرين (CachedJWTAuthentication)
+    كما يفعل save() و delete() - مثلاً update(is_active=False) يسري من الطلب التالي
+    """
+    
+    def _invalidate_auth_cache(self, user_ids):
+        from .authentication import invalidate_cached_user
+        for user_id in user_ids:
+            invalidate_cached_user(user_id)
+    
+    def update(self, **kwargs):
+        user_ids = list(self.values_list('pk', flat=True))
+        updated = super().update(**kwargs)
+        self._invalidate_auth_cache(user_ids)
+        return updated
+    
+    update.alters_data = True
+    
+    def delete(self):
+        user_ids = list(self.values_list('pk', flat=True))
+        result = super().delete()
+        self._invalidate_auth_cache(user_ids)
+        return result
+    
+    delete.alters_data = True
+    delete.queryset_only = True
+
+
 # **مدير مخصص للمستخدمين بدون اسم مستخدم**
-class CustomUserManager(BaseUserManager):
+class CustomUserManager(BaseUserManager.from_queryset(CustomUserQuerySet)):
     """مدير مخصص لإنشاء مستخدمين بدون اسم مستخدم"""
     
     def create_user(self, email, password=None, **extra_fields):
@@ -75,53 +105,81 @@ class CustomUser(AbstractUser):
     def is_admin(self):
         return self.user_type == 'admin' or self.is_superuser
     
+    # **الانضمام يُقرأ من جدول الانضمام courses_course_enrolled_learners**
+    # حقل enrolled_courses_titles أصبح نسخة مخزنة اختيارية فقط (ENROLLMENT_TITLES_CACHE)
+    def _enrollment_queryset(self):
+        """صفوف الانضمام للمسارات النشطة - تستخدم فهرس customuser_id في جدول الانضمام"""
+        Enrollment = self.enrolled_courses_as_learner.through
+        return Enrollment.objects.filter(
+            customuser_id=self.pk,
+            course__is_active=True
+        ).order_by('id')
+    
+    def _invalidate_enrollment_cache(self):
+        self.__dict__.pop('_enrolled_titles', None)
+    
+    def refresh_enrolled_courses_cache(self):
+        """إعادة بناء النسخة المخزنة من العناوين مع تحديث هذا العمود فقط"""
+        self._invalidate_enrollment_cache()
+        self.enrolled_courses_titles = list(self.get_enrolled_courses_list())
+        # update() يحذف النسخة المخزنة للمصادقة (CustomUserQuerySet)
+        type(self).objects.filter(pk=self.pk).update(
+            enrolled_courses_titles=self.enrolled_courses_titles
+        )
+    
     # **دالة جديدة: إضافة مسار للمتعلم**
     def add_enrolled_course(self, course_title):
-        """إضافة عنوان مسار إلى قائمة المسارات المنضم لها"""
-        if self.is_learner:
-            # تهيئة القائمة إذا كانت فارغة
-            if self.enrolled_courses_titles is None:
-                self.enrolled_courses_titles = []
-            
-            if course_title not in self.enrolled_courses_titles:
-                self.enrolled_courses_titles.append(course_title)
-                self.save()
-                print(f" تم إضافة المسار '{course_title}' للمتعلم '{self.email}'")
-                return True
-            else:
-                print(f" المسار '{course_title}' موجود بالفعل في قائمة المتعلم '{self.email}'")
-                return False
-        print(f" المستخدم '{self.email}' ليس متعلمًا")
-        return False
+        """
+        يُستدعى بعد إضافة صف الانضمام - لا يعيد حفظ صف المستخدم بالكامل
+        ويحدّث النسخة المخزنة فقط إذا كانت مفعلة
+        """
+        if not self.is_learner:
+            return False
+        self._invalidate_enrollment_cache()
+        if getattr(settings, 'ENROLLMENT_TITLES_CACHE', False):
+            self.refresh_enrolled_courses_cache()
+        return True
     
     # **دالة جديدة: إزالة مسار من قائمة المتعلم**
     def remove_enrolled_course(self, course_title):
-        """إزالة عنوان مسار من قائمة المسارات المنضم لها"""
-        if self.is_learner and self.enrolled_courses_titles and course_title in self.enrolled_courses_titles:
-            self.enrolled_courses_titles.remove(course_title)
-            self.save()
-            print(f" تم إزالة المسار '{course_title}' من قائمة المتعلم '{self.email}'")
-            return True
-        return False
+        """يُستدعى بعد حذف صف الانضمام"""
+        if not self.is_learner:
+            return False
+        self._invalidate_enrollment_cache()
+        if getattr(settings, 'ENROLLMENT_TITLES_CACHE', False):
+            self.refresh_enrolled_courses_cache()
+        return True
     
     # **دالة جديدة: التحقق من انضمام المتعلم للمسار**
-    def is_enrolled_in_course(self, course_title):
-        """التحقق إذا كان المتعلم منضم لمسار معين"""
-        return self.is_learner and self.enrolled_courses_titles and course_title in self.enrolled_courses_titles
+    def is_enrolled_in_course(self, course):
+        """التحقق إذا كان المتعلم منضم لمسار معين (كائن مسار، معرف، أو عنوان)"""
+        if not self.is_learner:
+            return False
+        queryset = self._enrollment_queryset()
+        if isinstance(course, str):
+            return queryset.filter(course__title=course).exists()
+        return queryset.filter(course_id=getattr(course, 'pk', course)).exists()
     
     # **دالة جديدة: الحصول على عدد المسارات المنضم لها المتعلم**
     def get_enrolled_courses_count(self):
         """الحصول على عدد المسارات المنضم لها"""
-        if self.is_learner and self.enrolled_courses_titles:
-            return len(self.enrolled_courses_titles)
-        return 0
+        return len(self.get_enrolled_courses_list())
     
     # **دالة جديدة: عرض قائمة المسارات المنضم لها المتعلم**
     def get_enrolled_courses_list(self):
-        """الحصول على قائمة المسارات المنضم لها"""
-        if self.is_learner and self.enrolled_courses_titles:
-            return self.enrolled_courses_titles
-        return []
+        """الحصول على قائمة المسارات المنضم لها (استعلام واحد لكل نسخة)"""
+        if not self.is_learner or self.pk is None:
+            return []
+        if '_enrolled_titles' not in self.__dict__:
+            self.__dict__['_enrolled_titles'] = list(
+                self._enrollment_queryset().values_list('course__title', flat=True)
+            )
+        return self.__dict__['_enrolled_titles']
+    
+    def _invalidate_auth_cache(self):
+        """حذف النسخة المخزنة المستخدمة في المصادقة (CachedJWTAuthentication)"""
+        from .authentication import invalidate_cached_user
+        invalidate_cached_user(self.pk)
     
     # **حفظ النموذج مع ضبط القيم للمشرفين**
     def save(self, *args, **kwargs):
@@ -129,6 +187,14 @@ class CustomUser(AbstractUser):
         if self.user_type == 'admin' and self.enrolled_courses_titles:
             self.enrolled_courses_titles = None
         super().save(*args, **kwargs)
+        self._invalidate_auth_cache()
+    
+    def delete(self, *args, **kwargs):
+        user_id = self.pk
+        result = super().delete(*args, **kwargs)
+        from .authentication import invalidate_cached_user
+        invalidate_cached_user(user_id)
+        return result
     
     class Meta:
         verbose_name = _('مستخدم')
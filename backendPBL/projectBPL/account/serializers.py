@@ -4,7 +4,9 @@ from django.contrib.auth import authenticate
 from django.contrib.auth.password_validation import validate_password
 from django.core.validators import validate_email
 from django.core.exceptions import ValidationError
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer as BaseTokenRefreshSerializer
 from .models import CustomUser
+from .tokens import RefreshToken
 
 # **سيريالايزر جديد لتسجيل المتعلمين**
 class RegisterLearnerSerializer(serializers.ModelSerializer):
@@ -171,4 +173,9 @@ class ProfileSerializer(serializers.ModelSerializer):
             representation.pop('enrolled_courses_count', None)
         if representation.get('enrolled_courses_titles') is None:
             representation.pop('enrolled_courses_titles', None)
-        return representation
\ No newline at end of file
+        return representation
+
+
+class TokenRefreshSerializer(BaseTokenRefreshSerializer):
+    """تجديد التوكن مع فحص القائمة السوداء عبر المرشح داخل العملية"""
+    token_class = RefreshToken
@@ -1,3 +1,129 @@
-from django.test import TestCase
+# account/tests.py
+"""
+اختبارات المصادقة: النسخة المخزنة من المستخدم (CachedJWTAuthentication)
+ومرشح التوكنات الملغاة (RevokedTokenFilter)
+"""
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.tokens import AccessToken
 
-# Create your tests here.
+from .last_login import last_login_buffer
+from .models import CustomUser
+from .tokens import RefreshToken, revoked_tokens
+
+
+def api_client(user):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}')
+    return client
+
+
+class CachedUserTests(TestCase):
+    """تغييرات المستخدم تسري من الطلب التالي حتى عبر update() الجماعي"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.learner = CustomUser.objects.create(email='learner@example.com', user_type='learner')
+
+    def setUp(self):
+        caches[getattr(settings, 'AUTH_USER_CACHE_ALIAS', 'default')].clear()
+        self.client = api_client(self.learner)
+        self.url = reverse('courses:list-courses')
+
+    def tearDown(self):
+        last_login_buffer.flush()
+
+    def user_queries(self):
+        """الاستجابة وعدد استعلامات تحميل المستخدم"""
+        with CaptureQueriesContext(connections[DEFAULT_DB_ALIAS]) as queries:
+            response = self.client.get(self.url)
+        return response, len([
+            query for query in queries if query['sql'].startswith('SELECT "account_customuser"."id"')
+        ])
+
+    def test_snapshot_is_reused(self):
+        response, loads = self.user_queries()
+        self.assertEqual((response.status_code, loads), (200, 1))
+        response, loads = self.user_queries()
+        self.assertEqual((response.status_code, loads), (200, 0))
+
+    def test_bulk_deactivate_applies_on_next_request(self):
+        self.assertEqual(self.user_queries()[0].status_code, 200)
+
+        CustomUser.objects.filter(pk=self.learner.pk).update(is_active=False)
+
+        response, loads = self.user_queries()
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(loads, 1)
+
+    def test_bulk_type_change_applies_on_next_request(self):
+        self.assertEqual(self.client.get(reverse('courses:my-courses')).status_code, 200)
+
+        CustomUser.objects.filter(pk=self.learner.pk).update(user_type='admin')
+
+        # الواجهة للمتعلمين فقط
+        self.assertEqual(self.client.get(reverse('courses:my-courses')).status_code, 403)
+
+
+@override_settings(TOKEN_BLACKLIST_FILTER_REFRESH_SECONDS=3600)
+class RevokedTokenFilterTests(TestCase):
+    """القائمة السوداء عبر مرشح revoked_tokens (account/tokens.py)"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.learner = CustomUser.objects.create(email='learner@example.com', user_type='learner')
+
+    def setUp(self):
+        revoked_tokens.reset()
+        revoked_tokens.sync()
+        self.addCleanup(revoked_tokens.reset)
+
+    def blacklist_queries(self, token):
+        """فك التوكن وعدد الاستعلامات على جدول القائمة السوداء"""
+        with CaptureQueriesContext(connections[DEFAULT_DB_ALIAS]) as queries:
+            try:
+                RefreshToken(str(token))
+                rejected = False
+            except TokenError:
+                rejected = True
+        return rejected, len([query for query in queries if 'token_blacklist_blacklistedtoken' in query['sql']])
+
+    def test_token_blacklisted_in_process_is_rejected_immediately(self):
+        token = RefreshToken.for_user(self.learner)
+        token.blacklist()
+        # بدون انتظار التحديث التزايدي (كل ساعة هنا): المرشح يعرف الـ jti، والتأكيد من الجدول
+        self.assertEqual(self.blacklist_queries(token), (True, 1))
+
+    def test_row_from_another_process_is_picked_up_after_incremental_sync(self):
+        token = RefreshToken.for_user(self.learner)
+        # إلغاء من عملية أخرى: صف في الجدول لا يمر على revoked_tokens.add
+        BlacklistedToken.objects.create(token=OutstandingToken.objects.get(jti=token['jti']))
+        self.assertEqual(self.blacklist_queries(token), (False, 0))
+
+        built_at = revoked_tokens._built_at
+        with override_settings(TOKEN_BLACKLIST_FILTER_REFRESH_SECONDS=0):
+            rejected, _ = self.blacklist_queries(token)
+        self.assertTrue(rejected)
+        # تحديث تزايدي وليس إعادة بناء
+        self.assertEqual(revoked_tokens._built_at, built_at)
+
+    def test_valid_token_does_no_blacklist_query(self):
+        RefreshToken.for_user(self.learner).blacklist()
+        token = RefreshToken.for_user(self.learner)
+        self.assertEqual(self.blacklist_queries(token), (False, 0))
+
+    def test_rotated_refresh_token_cannot_be_reused(self):
+        refresh = str(RefreshToken.for_user(self.learner))
+        client = APIClient()
+
+        response = client.post(reverse('token_refresh'), {'refresh': refresh}, format='json')
+        self.assertEqual(response.status_code, 200, response.content)
+        response = client.post(reverse('token_refresh'), {'refresh': refresh}, format='json')
+        self.assertEqual(response.status_code, 401, response.content)
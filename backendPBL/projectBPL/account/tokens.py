@@ -0,0 +1,118 @@
+# account/tokens.py
+import hashlib
+import threading
+import time
+
+from django.conf import settings
+from django.utils import timezone
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+from rest_framework_simplejwt.tokens import RefreshToken as BaseRefreshToken
+
+
+class RevokedTokenFilter:
+    """
+    مرشح Bloom داخل العملية لمعرفات التوكنات الملغاة (jti):
+    - "غير موجود" مؤكد ⇒ التوكن غير ملغى دون أي استعلام
+    - "ربما موجود" ⇒ يُؤكد من جدول BlacklistedToken
+
+    التحديث تزايدي: كل refresh_interval ثانية تُقرأ الصفوف الجديدة فقط (id أكبر من آخر id مقروء)
+    وإعادة البناء الكاملة (للتوكنات غير المنتهية فقط) كل rebuild_interval ثانية حتى لا يتشبع المرشح
+    """
+
+    # عدد الصفوف الأخيرة التي يُعاد قراءتها في كل تحديث: معاملة بدأت قبل أخرى
+    # قد تُعتمد بعدها بمعرف أصغر من آخر معرف مقروء
+    REFRESH_OVERLAP = 100
+
+    def __init__(self, size_bits=2 ** 23, hash_count=7, refresh_interval=None, rebuild_interval=None):
+        self.size_bits = size_bits
+        self.hash_count = hash_count
+        self.refresh_interval = refresh_interval
+        self.rebuild_interval = rebuild_interval
+        self._lock = threading.Lock()
+        self._bits = None
+        self._high_water = 0
+        self._refreshed_at = 0.0
+        self._built_at = 0.0
+
+    def _positions(self, jti):
+        digest = hashlib.blake2b(jti.encode('utf-8'), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'little')
+        second = int.from_bytes(digest[8:], 'little') | 1
+        return [(first + index * second) % self.size_bits for index in range(self.hash_count)]
+
+    def _set(self, bits, jti):
+        for position in self._positions(jti):
+            bits[position >> 3] |= 1 << (position & 7)
+
+    def _load(self, bits, queryset):
+        """قراءة معرفات jti بدفعات حسب id وإعادة أكبر id مقروء"""
+        start = max(0, self._high_water - self.REFRESH_OVERLAP)
+        high_water = start
+        while True:
+            rows = list(
+                queryset.filter(id__gt=high_water).order_by('id').values_list('id', 'token__jti')[:5000]
+            )
+            if not rows:
+                return max(high_water, self._high_water)
+            for row_id, jti in rows:
+                self._set(bits, jti)
+            high_water = rows[-1][0]
+
+    def _get_interval(self, value, setting_name, default):
+        if value is not None:
+            return value
+        return getattr(settings, setting_name, default)
+
+    def sync(self, force=False):
+        now = time.monotonic()
+        rebuild_interval = self._get_interval(self.rebuild_interval, 'TOKEN_BLACKLIST_FILTER_REBUILD_SECONDS', 3600)
+        refresh_interval = self._get_interval(self.refresh_interval, 'TOKEN_BLACKLIST_FILTER_REFRESH_SECONDS', 1)
+
+        with self._lock:
+            if self._bits is None or force or now - self._built_at >= rebuild_interval:
+                bits = bytearray(self.size_bits // 8)
+                self._high_water = 0
+                self._high_water = self._load(
+                    bits,
+                    BlacklistedToken.objects.filter(token__expires_at__gt=timezone.now())
+                )
+                self._bits = bits
+                self._built_at = self._refreshed_at = now
+            elif now - self._refreshed_at >= refresh_interval:
+                self._high_water = self._load(self._bits, BlacklistedToken.objects.all())
+                self._refreshed_at = now
+
+    def add(self, jti):
+        with self._lock:
+            if self._bits is not None:
+                self._set(self._bits, jti)
+
+    def might_contain(self, jti):
+        self.sync()
+        bits = self._bits
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in self._positions(jti))
+
+    def reset(self):
+        with self._lock:
+            self._bits = None
+            self._high_water = 0
+
+
+revoked_tokens = RevokedTokenFilter()
+
+
+class RefreshToken(BaseRefreshToken):
+    """
+    RefreshToken يفحص القائمة السوداء عبر مرشح revoked_tokens أولاً:
+    قاعدة البيانات تُسأل فقط عندما يقول المرشح "ربما ملغى"
+    """
+
+    def check_blacklist(self):
+        if revoked_tokens.might_contain(self.payload[api_settings.JTI_CLAIM]):
+            super().check_blacklist()
+
+    def blacklist(self):
+        result = super().blacklist()
+        revoked_tokens.add(self.payload[api_settings.JTI_CLAIM])
+        return result
@@ -1,7 +1,6 @@
 from rest_framework import generics, permissions, status
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
 from django.contrib.auth import logout
 from django.utils.translation import gettext_lazy as _
@@ -12,6 +11,9 @@ from .serializers import (
     ProfileSerializer
 )
 from .models import CustomUser
+from .tokens import RefreshToken
+from .last_login import last_login_buffer
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
 
 class RegisterLearnerView(generics.CreateAPIView):
     """إنشاء حساب متعلم"""
@@ -87,6 +89,10 @@ class LoginView(APIView):
         # إنشاء توكنات JWT
         refresh = RefreshToken.for_user(user)
         
+        # تحديث آخر دخول عبر المخزن المؤقت (يُكتب دفعة واحدة لاحقاً)
+        if jwt_settings.UPDATE_LAST_LOGIN:
+            last_login_buffer.record(user)
+        
         # تحضير بيانات المستخدم حسب النوع
         user_data = {
             'id': user.id,
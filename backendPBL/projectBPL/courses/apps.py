@@ -4,3 +4,11 @@ from django.apps import AppConfig
 class CoursesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'courses'
+
+    def ready(self):
+        from .cache import connect_signals
+        from .counters import connect_counter_signals
+        from .sqlite import connect_sqlite_tuning
+        connect_signals()
+        connect_counter_signals()
+        connect_sqlite_tuning()
@@ -0,0 +1,157 @@
+# courses/cache.py
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import parse_http_date_safe
+from rest_framework.renderers import JSONRenderer
+
+from .replicas import current_read_database, get_replica_aliases, read_from_primary
+
+GENERATION_KEY = 'catalog:generation'
+WRITTEN_AT_KEY = 'catalog:written_at'
+
+# ترويسات الطلب الشرطي المحفوظة مع النسخة المخزنة
+CACHED_HEADERS = ('ETag', 'Last-Modified')
+
+
+def get_catalog_cache():
+    return caches[getattr(settings, 'CATALOG_CACHE_ALIAS', 'default')]
+
+
+def get_generation():
+    """رقم الجيل الحالي للكتالوج - يتغير مع كل كتابة فتصبح كل المفاتيح القديمة غير مستخدمة"""
+    cache = get_catalog_cache()
+    generation = cache.get(GENERATION_KEY)
+    if generation is None:
+        cache.add(GENERATION_KEY, 1, timeout=None)
+        generation = cache.get(GENERATION_KEY, 1)
+    return generation
+
+
+def _bump_now():
+    cache = get_catalog_cache()
+    try:
+        cache.incr(GENERATION_KEY)
+    except ValueError:
+        # المفتاح غير موجود (أول تشغيل أو تم مسح الذاكرة)
+        cache.add(GENERATION_KEY, 1, timeout=None)
+        cache.incr(GENERATION_KEY)
+    if get_replica_aliases():
+        cache.set(WRITTEN_AT_KEY, time.time(), timeout=None)
+
+
+def catalog_written_recently():
+    """آخر كتابة على الكتالوج خلال REPLICA_STICKY_SECONDS (قد لا تكون وصلت لنسخ القراءة)"""
+    written_at = get_catalog_cache().get(WRITTEN_AT_KEY)
+    return written_at is not None and time.time() - written_at < getattr(settings, 'REPLICA_STICKY_SECONDS', 10)
+
+
+def bump_generation():
+    """
+    إبطال كل نسخ الكتالوج المخزنة - يُنفذ بعد نجاح المعاملة فقط
+    حتى لا يُخزن طلب متزامن بيانات لم تُعتمد بعد تحت الجيل الجديد
+    """
+    transaction.on_commit(_bump_now)
+
+
+def catalog_cache_key(view_name, audience, request, view_kwargs=None):
+    """المفتاح: الجيل + الجمهور (admin/learner) + اسم الواجهة + معاملات المسار والاستعلام"""
+    params = sorted(request.query_params.lists())
+    raw = repr((sorted((view_kwargs or {}).items()), params)).encode('utf-8')
+    digest = hashlib.md5(raw, usedforsecurity=False).hexdigest()
+    return f'catalog:{get_generation()}:{audience}:{view_name}:{digest}'
+
+
+class CatalogCacheMixin:
+    """
+    تخزين استجابة GET الناجحة كبايتات JSON جاهزة:
+    عند الإصابة تُعاد البايتات مباشرة دون أي استعلام على المسارات أو المشاريع
+    """
+    catalog_cache_name = None
+
+    def get_catalog_audience(self):
+        return 'admin' if self.request.user.is_admin else 'learner'
+
+    def get(self, request, *args, **kwargs):
+        cache = get_catalog_cache()
+        key = catalog_cache_key(
+            self.catalog_cache_name or type(self).__name__,
+            self.get_catalog_audience(),
+            request,
+            kwargs
+        )
+
+        cached = cache.get(key)
+        if cached is not None:
+            return self.cached_response(request, cached)
+
+        if current_read_database() is not None and catalog_written_recently():
+            # ⭐ النسخة المخزنة يراها الجميع تحت الجيل الجديد، فلا تُبنى من نسخة قراءة متأخرة
+            with read_from_primary():
+                response = super().get(request, *args, **kwargs)
+        else:
+            response = super().get(request, *args, **kwargs)
+        if response.status_code == 200:
+            cache.set(
+                key,
+                {
+                    'content': JSONRenderer().render(response.data),
+                    'headers': {
+                        header: response[header]
+                        for header in CACHED_HEADERS if response.has_header(header)
+                    },
+                },
+                timeout=getattr(settings, 'CATALOG_CACHE_TIMEOUT', 300)
+            )
+        return response
+
+    def cached_response(self, request, cached):
+        """الاستجابة من النسخة المخزنة مع دعم الطلبات الشرطية على الـ ETag المخزن"""
+        headers = cached['headers']
+        last_modified = headers.get('Last-Modified')
+        not_modified = get_conditional_response(
+            request,
+            etag=headers.get('ETag'),
+            last_modified=parse_http_date_safe(last_modified) if last_modified else None
+        )
+        if not_modified is not None:
+            response = not_modified
+        else:
+            response = HttpResponse(cached['content'], content_type='application/json')
+        for header, value in headers.items():
+            response[header] = value
+        return response
+
+
+# === إبطال الكتالوج عند الكتابة ===
+
+def _invalidate_catalog(sender, **kwargs):
+    bump_generation()
+
+
+def _invalidate_catalog_for_admin(sender, instance, **kwargs):
+    # اسم المشرف يظهر في الكتالوج
+    if getattr(instance, 'is_admin', False):
+        bump_generation()
+
+
+def connect_signals():
+    from .models import Course
+
+    enrollment_model = Course.enrolled_learners.through
+    for sender in (Course, 'projects.Project', enrollment_model):
+        post_save.connect(_invalidate_catalog, sender=sender, dispatch_uid=f'catalog-save-{sender}')
+        post_delete.connect(_invalidate_catalog, sender=sender, dispatch_uid=f'catalog-delete-{sender}')
+    # تغيرات الانضمام (m2m_changed) لا تُبطل الكتالوج: تُغير enrolled_count فقط،
+    # فعدد المنضمين في النسخ المخزنة قد يتأخر حتى CATALOG_CACHE_TIMEOUT (courses.counters)
+    post_save.connect(
+        _invalidate_catalog_for_admin,
+        sender=settings.AUTH_USER_MODEL,
+        dispatch_uid='catalog-instructor'
+    )
@@ -0,0 +1,154 @@
+# courses/conditional.py
+import hashlib
+
+from django.db import models
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+from .cache import get_generation
+
+
+def build_etag(*parts):
+    raw = repr(parts).encode('utf-8')
+    return 'W/"%s"' % hashlib.md5(raw, usedforsecurity=False).hexdigest()
+
+
+def _latest(*timestamps):
+    timestamps = [value for value in timestamps if value is not None]
+    return max(timestamps) if timestamps else None
+
+
+# === استعلامات الفحص المسبق (استعلام واحد لكل واجهة، بدون تحويل البيانات) ===
+
+def _projects_stats(outer_ref='pk'):
+    """آخر تعديل وعدد المشاريع النشطة في المسار كاستعلامات فرعية مرتبطة"""
+    from projects.models import Project
+
+    active_projects = Project.objects.filter(
+        course_id=models.OuterRef(outer_ref),
+        is_active=True
+    ).order_by().values('course_id')
+    return {
+        'projects_updated_at': models.Subquery(
+            active_projects.annotate(latest=models.Max('updated_at')).values('latest')
+        ),
+        'projects_total': models.Subquery(
+            active_projects.annotate(total=models.Count('pk')).values('total')
+        ),
+    }
+
+
+def _enrollment_stats(user):
+    """
+    نسخة الانضمام: عدد صفوف جدول الانضمام وأكبر معرف (يتغيران مع أي إضافة أو إزالة)
+    وحالة انضمام المستخدم الحالي
+    """
+    from .models import Course
+
+    enrollments = Course.enrolled_learners.through.objects.filter(
+        course_id=models.OuterRef('pk')
+    ).order_by().values('course_id')
+    return {
+        'enrollment_total': models.Subquery(
+            enrollments.annotate(total=models.Count('pk')).values('total')
+        ),
+        'enrollment_last_id': models.Subquery(
+            enrollments.annotate(last=models.Max('pk')).values('last')
+        ),
+        'user_enrolled': models.Exists(
+            Course.enrolled_learners.through.objects.filter(
+                course_id=models.OuterRef('pk'),
+                customuser_id=user.pk
+            )
+        ),
+    }
+
+
+_COURSE_STATE_FIELDS = (
+    'updated_at', 'title', 'is_public', 'is_active', 'projects_count', 'enrolled_count',
+    'instructor_id', 'instructor__first_name', 'instructor__last_name', 'instructor__email',
+)
+
+
+def course_detail_state(queryset, course_id, user):
+    """حالة المسار مع مشاريعه والمنضمين إليه - تغير أي منها يغير الـ ETag"""
+    row = queryset.filter(pk=course_id).annotate(
+        **_projects_stats(),
+        **_enrollment_stats(user)
+    ).values(
+        *_COURSE_STATE_FIELDS,
+        'projects_updated_at', 'projects_total',
+        'enrollment_total', 'enrollment_last_id', 'user_enrolled'
+    ).first()
+    if row is None:
+        return None
+    return row, _latest(row['updated_at'], row['projects_updated_at'])
+
+
+def course_projects_state(queryset, course_id):
+    """حالة المسار ومشاريعه فقط (قائمة مشاريع مسار)"""
+    row = queryset.filter(pk=course_id).annotate(
+        **_projects_stats()
+    ).values(*_COURSE_STATE_FIELDS, 'projects_updated_at', 'projects_total').first()
+    if row is None:
+        return None
+    return row, _latest(row['updated_at'], row['projects_updated_at'])
+
+
+def queryset_state(queryset, *extra_latest, **extra_aggregates):
+    """
+    حالة قائمة: آخر تعديل وعدد الصفوف (يلتقط الإضافة والحذف والتعطيل)
+    extra_aggregates: أجزاء إضافية للـ ETag لا تؤثر على Last-Modified
+    """
+    aggregates = {
+        'latest': models.Max('updated_at'),
+        'total': models.Count('pk'),
+        **extra_aggregates,
+    }
+    for index, lookup in enumerate(extra_latest):
+        aggregates[f'latest_{index}'] = models.Max(lookup)
+    row = queryset.order_by().aggregate(**aggregates)
+    return row, _latest(*(value for key, value in row.items() if key.startswith('latest')))
+
+
+class ConditionalGetMixin:
+    """
+    دعم GET الشرطي (ETag / Last-Modified): يُنفذ get_condition_state() كاستعلام فحص مسبق رخيص
+    وإذا طابق If-None-Match أو If-Modified-Since تُعاد 304 دون بناء الاستجابة
+
+    get_condition_state() تُعيد (أجزاء الحالة, آخر تعديل) أو None لتخطي الفحص
+    """
+
+    def get_condition_state(self, request, *args, **kwargs):
+        return None
+
+    def get_condition_audience(self, request):
+        user = request.user
+        return 'admin' if user.is_admin else 'learner'
+
+    def get(self, request, *args, **kwargs):
+        state = self.get_condition_state(request, *args, **kwargs)
+        if state is None:
+            return super().get(request, *args, **kwargs)
+
+        parts, last_modified = state
+        etag = build_etag(
+            type(self).__name__,
+            self.get_condition_audience(request),
+            request.get_full_path(),
+            get_generation(),
+            parts
+        )
+        timestamp = int(last_modified.timestamp()) if last_modified else None
+
+        not_modified = get_conditional_response(request, etag=etag, last_modified=timestamp)
+        if not_modified is not None:
+            not_modified['ETag'] = etag
+            return not_modified
+
+        response = super().get(request, *args, **kwargs)
+        if response.status_code == 200:
+            response['ETag'] = etag
+            if timestamp is not None:
+                response['Last-Modified'] = http_date(timestamp)
+        return response
@@ -0,0 +1,161 @@
+# courses/counters.py
+import threading
+from contextlib import ContextDecorator
+
+from django.db import transaction
+
+_state = threading.local()
+
+
+def _pending():
+    return getattr(_state, 'pending', None)
+
+
+class defer_course_counters(ContextDecorator):
+    """
+    تأجيل إعادة حساب projects_count داخل كتلة أو دالة:
+    كل عمليات الكتابة على المشاريع تسجل معرف المسار فقط، وعند الخروج من الكتلة
+    الخارجية يُعاد حساب كل مسار مرة واحدة بجملة UPDATE واحدة (COUNT ... GROUP BY course_id)
+
+        with defer_course_counters():
+            for project in projects:
+                project.delete()
+
+    عند الخروج باستثناء داخل معاملة لا يتم الحساب (المعاملة ستُلغى)،
+    أما خارج أي معاملة فالكتابات السابقة محفوظة فيُعاد الحساب أيضاً
+    """
+
+    def __enter__(self):
+        if _pending() is None:
+            _state.pending = set()
+            _state.depth = 0
+        _state.depth += 1
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        _state.depth -= 1
+        if _state.depth:
+            return False
+
+        course_ids = _state.pending
+        _state.pending = None
+        if not course_ids:
+            return False
+        if exc_type is None or not transaction.get_connection().in_atomic_block:
+            flush_projects_counts(course_ids)
+        return False
+
+
+def is_deferred():
+    return _pending() is not None
+
+
+def recount_projects(course_ids):
+    """
+    إعادة حساب projects_count للمسارات المعطاة: تُسجل فقط إذا كان التأجيل مفعلاً،
+    وإلا تُنفذ فوراً. تُعيد True إذا تم التأجيل
+    """
+    pending = _pending()
+    if pending is not None:
+        pending.update(course_id for course_id in course_ids if course_id is not None)
+        return True
+    flush_projects_counts(course_ids)
+    return False
+
+
+def flush_projects_counts(course_ids):
+    from .models import Course
+
+    course_ids = sorted({course_id for course_id in course_ids if course_id is not None})
+    if not course_ids:
+        return 0
+    with transaction.atomic():
+        return Course.objects.filter(id__in=course_ids).recount_projects()
+
+
+# === مزامنة enrolled_count مع جدول الانضمام ===
+# الإضافة والإزالة (من أي طرف) تُزيد أو تُنقص العداد بعدد الصفوف التي تغيرت فعلاً (F)،
+# أما clear() من طرف المتعلم وحذفه وأمر reconcile_enrollment_counts فيُعيدون الحساب من الصفوف
+# لا يتغير updated_at ولا جيل الكتالوج: عدد المنضمين في الكتالوج المخزن قد يتأخر حتى CATALOG_CACHE_TIMEOUT
+
+def shift_enrolled_counts(deltas):
+    """deltas: {course_id: مقدار التغيير} - جملة UPDATE واحدة لكل مقدار مختلف"""
+    from django.db.models import F
+
+    from .models import Course
+
+    by_delta = {}
+    for course_id, delta in deltas.items():
+        if delta:
+            by_delta.setdefault(delta, []).append(course_id)
+    for delta, course_ids in sorted(by_delta.items()):
+        Course.objects.filter(pk__in=sorted(course_ids)).update(enrolled_count=F('enrolled_count') + delta)
+
+
+def flush_enrolled_counts(course_ids):
+    from .models import Course
+
+    course_ids = sorted({course_id for course_id in course_ids if course_id is not None})
+    if not course_ids:
+        return 0
+    # جملة UPDATE واحدة، فلا حاجة لـ savepoint داخل معاملة الكتابة
+    return Course.objects.filter(id__in=course_ids).recount_enrollments()
+
+
+def _enrollment_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == 'pre_remove' and pk_set:
+        # pk_set في الإزالة هو ما طُلب حذفه وليس ما كان موجوداً فعلاً
+        # (القراءة داخل معاملة remove() التي تحجز قفل الكتابة، transaction_mode=IMMEDIATE)
+        if reverse:
+            rows = sender.objects.filter(customuser_id=instance.pk, course_id__in=pk_set)
+        else:
+            rows = sender.objects.filter(course_id=instance.pk, customuser_id__in=pk_set)
+        instance._removed_course_ids = list(rows.values_list('course_id', flat=True))
+    elif action == 'post_remove':
+        removed = instance.__dict__.pop('_removed_course_ids', [])
+        if reverse:
+            shift_enrolled_counts({course_id: -1 for course_id in removed})
+        else:
+            shift_enrolled_counts({instance.pk: -len(removed)})
+    elif action == 'post_add' and pk_set:
+        # pk_set في الإضافة يحتوي فقط الصفوف التي أُدرجت فعلاً
+        if reverse:
+            shift_enrolled_counts({course_id: 1 for course_id in pk_set})
+        else:
+            shift_enrolled_counts({instance.pk: len(pk_set)})
+    elif action == 'pre_clear' and reverse:
+        # بعد clear() من طرف المتعلم لا يمكن معرفة المسارات المتأثرة
+        instance._cleared_course_ids = list(
+            sender.objects.filter(customuser_id=instance.pk).values_list('course_id', flat=True)
+        )
+    elif action == 'post_clear':
+        flush_enrolled_counts(instance.__dict__.pop('_cleared_course_ids', []) if reverse else [instance.pk])
+
+
+def _learner_pre_delete(sender, instance, **kwargs):
+    # صفوف الانضمام تُحذف مع المتعلم بدون إشارات (جدول وسيط تلقائي)
+    from .models import Course
+
+    instance._enrolled_course_ids = list(
+        Course.enrolled_learners.through.objects.filter(customuser_id=instance.pk)
+        .values_list('course_id', flat=True)
+    )
+
+
+def _learner_post_delete(sender, instance, **kwargs):
+    flush_enrolled_counts(instance.__dict__.pop('_enrolled_course_ids', []))
+
+
+def connect_counter_signals():
+    from django.conf import settings
+    from django.db.models.signals import m2m_changed, post_delete, pre_delete
+
+    from .models import Course
+
+    m2m_changed.connect(
+        _enrollment_changed,
+        sender=Course.enrolled_learners.through,
+        dispatch_uid='courses.counters.enrollment_changed'
+    )
+    pre_delete.connect(_learner_pre_delete, sender=settings.AUTH_USER_MODEL, dispatch_uid='courses.counters.learner_pre_delete')
+    post_delete.connect(_learner_post_delete, sender=settings.AUTH_USER_MODEL, dispatch_uid='courses.counters.learner_post_delete')
@@ -0,0 +1,40 @@
+# courses/eager.py
+
+
+class EagerLoadingMixin:
+    """
+    كل serializer يصرح بالعلاقات التي يمر عليها أثناء التحويل
+    (select_related_fields للمفاتيح الأجنبية و prefetch_related_fields للعلاقات المتعددة)
+    و setup_eager_loading() تطبقها على أي استعلام قبل التحويل - بدلاً من استعلام لكل صف
+    """
+    select_related_fields = ()
+    prefetch_related_fields = ()
+
+    @classmethod
+    def setup_eager_loading(cls, queryset):
+        if cls.select_related_fields:
+            queryset = queryset.select_related(*cls.select_related_fields)
+        if cls.prefetch_related_fields:
+            queryset = queryset.prefetch_related(*cls.prefetch_related_fields)
+        return queryset
+
+
+class EagerLoadingViewMixin:
+    """
+    get_queryset() مشترك للواجهات: الاستعلام الأساسي من get_base_queryset()
+    ثم تحضيره حسب الـ serializer (العلاقات المطلوبة والأعمدة المؤجلة في ?fields= / ?omit=)
+    """
+
+    def get_base_queryset(self):
+        return super().get_queryset()
+
+    def get_queryset(self):
+        return self.prepare_queryset(self.get_base_queryset())
+
+    def prepare_queryset(self, queryset):
+        serializer_class = self.get_serializer_class()
+        if hasattr(serializer_class, 'setup_eager_loading'):
+            queryset = serializer_class.setup_eager_loading(queryset)
+        if hasattr(serializer_class, 'prune_queryset_for_request'):
+            queryset = serializer_class.prune_queryset_for_request(queryset, self.request)
+        return queryset
@@ -0,0 +1,107 @@
+# courses/exports.py
+import csv
+from datetime import date, datetime
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+from django.utils.translation import gettext_lazy as _
+from rest_framework import permissions, status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+# عدد الصفوف المقروءة من قاعدة البيانات في كل دفعة
+EXPORT_CHUNK_SIZE = 2000
+# عدد الأسطر المجمعة في كل جزء مُرسل
+EXPORT_LINES_PER_WRITE = 500
+
+
+class _EchoBuffer:
+    """ملف وهمي لـ csv.writer: يُعيد السطر بدلاً من تخزينه"""
+
+    def write(self, value):
+        return value
+
+
+def _csv_value(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if value is None:
+        return ''
+    return value
+
+
+def ndjson_lines(rows):
+    encoder = DjangoJSONEncoder(ensure_ascii=False, separators=(',', ':'))
+    for row in rows:
+        yield encoder.encode(row) + '\n'
+
+
+def csv_lines(rows, columns):
+    writer = csv.writer(_EchoBuffer())
+    # BOM حتى يفتح Excel الملف بترميز UTF-8 (العناوين العربية)
+    yield '\ufeff' + writer.writerow(columns)
+    for row in rows:
+        yield writer.writerow([_csv_value(row[column]) for column in columns])
+
+
+def batched(lines, size=EXPORT_LINES_PER_WRITE):
+    """تجميع الأسطر في أجزاء أكبر لتقليل عدد عمليات الكتابة على الاتصال"""
+    buffer = []
+    for line in lines:
+        buffer.append(line)
+        if len(buffer) >= size:
+            yield ''.join(buffer)
+            buffer = []
+    if buffer:
+        yield ''.join(buffer)
+
+
+class IsAdminExporter(permissions.BasePermission):
+    """التصدير الكامل للمشرفين فقط"""
+
+    def has_permission(self, request, view):
+        return bool(request.user and request.user.is_authenticated and request.user.is_admin)
+
+
+class StreamingExportView(APIView):
+    """
+    تصدير جدول كامل كـ NDJSON أو CSV (?output=ndjson|csv) عبر StreamingHttpResponse:
+    الصفوف تُقرأ بـ values().iterator(chunk_size) وتُرسل أولاً بأول، فالذاكرة ثابتة مهما كبر الجدول
+    ويصل أول جزء فور تنفيذ الاستعلام
+
+    الواجهات الفرعية تحدد export_name و export_columns و get_export_queryset()
+    """
+    permission_classes = [permissions.IsAuthenticated, IsAdminExporter]
+    export_name = None
+    export_columns = ()
+    output_query_param = 'output'
+    output_formats = {
+        'ndjson': 'application/x-ndjson; charset=utf-8',
+        'csv': 'text/csv; charset=utf-8',
+    }
+
+    def get_export_queryset(self):
+        raise NotImplementedError
+
+    def get(self, request, *args, **kwargs):
+        output = request.query_params.get(self.output_query_param, 'ndjson').lower()
+        if output not in self.output_formats:
+            return Response({
+                'success': False,
+                'message': _('صيغة التصدير غير مدعومة'),
+                'errors': {self.output_query_param: list(self.output_formats)}
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        rows = self.get_export_queryset().values(*self.export_columns).iterator(
+            chunk_size=EXPORT_CHUNK_SIZE
+        )
+        if output == 'csv':
+            lines = csv_lines(rows, self.export_columns)
+        else:
+            lines = ndjson_lines(rows)
+
+        response = StreamingHttpResponse(batched(lines), content_type=self.output_formats[output])
+        response['Content-Disposition'] = f'attachment; filename="{self.export_name}.{output}"'
+        # منع تخزين الاستجابة كاملة في الوكيل العكسي قبل إرسالها
+        response['X-Accel-Buffering'] = 'no'
+        return response
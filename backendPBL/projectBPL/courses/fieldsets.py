@@ -0,0 +1,60 @@
+# courses/fieldsets.py
+
+
+def parse_field_list(value):
+    """تحويل 'title,level' إلى قائمة أسماء (None إذا لم يُمرر المعامل)"""
+    if value is None:
+        return None
+    return [name.strip() for name in value.split(',') if name.strip()]
+
+
+class SparseFieldsetMixin:
+    """
+    اختيار الحقول المُرجعة عبر ?fields=a,b أو ?omit=c,d
+    مع تمرير الاختيار للاستعلام: الأعمدة الثقيلة (deferrable_fields) غير المطلوبة تُؤجل بـ defer()
+    فلا تُقرأ من قاعدة البيانات أصلاً
+
+    يمكن تمرير fieldset=(fields, omit) صراحةً (للـ serializers المتداخلة) بدلاً من معاملات الطلب
+    """
+    fields_query_param = 'fields'
+    omit_query_param = 'omit'
+    # حقل الإخراج -> عمود/أعمدة النموذج التي يمكن تأجيلها إذا لم يُطلب الحقل
+    deferrable_fields = {}
+
+    def __init__(self, *args, **kwargs):
+        fieldset = kwargs.pop('fieldset', None)
+        super().__init__(*args, **kwargs)
+        if fieldset is None:
+            fieldset = self.get_requested_fieldset(self.context.get('request'))
+        for name in self.get_excluded_fields(self.fields.keys(), *fieldset):
+            self.fields.pop(name)
+
+    @classmethod
+    def get_requested_fieldset(cls, request, prefix=''):
+        if request is None:
+            return None, None
+        params = getattr(request, 'query_params', request.GET)
+        return (
+            parse_field_list(params.get(prefix + cls.fields_query_param)),
+            parse_field_list(params.get(prefix + cls.omit_query_param)),
+        )
+
+    @staticmethod
+    def get_excluded_fields(names, fields=None, omit=None):
+        return [
+            name for name in names
+            if (fields is not None and name not in fields) or (omit and name in omit)
+        ]
+
+    @classmethod
+    def prune_queryset(cls, queryset, fields=None, omit=None):
+        """تأجيل أعمدة الحقول غير المطلوبة"""
+        columns = []
+        for name in cls.get_excluded_fields(cls.Meta.fields, fields, omit):
+            deferrable = cls.deferrable_fields.get(name, ())
+            columns.extend([deferrable] if isinstance(deferrable, str) else deferrable)
+        return queryset.defer(*columns) if columns else queryset
+
+    @classmethod
+    def prune_queryset_for_request(cls, queryset, request, prefix=''):
+        return cls.prune_queryset(queryset, *cls.get_requested_fieldset(request, prefix))
@@ -0,0 +1,3 @@
+# courses/management/commands/bench_endpoints.py
+# التنفيذ في projectBPL/benchmarks.py بجانب سجل الميزانيات
+from projectBPL.benchmarks import EndpointBenchmarkCommand as Command
@@ -0,0 +1,208 @@
+# courses/management/commands/bench_sqlite.py
+import io
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+from contextlib import redirect_stdout
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connections
+
+from account.models import CustomUser
+from courses.models import Course
+from courses.sqlite import get_sqlite_pragmas
+from projectBPL.benchmarks import percentile
+from projects.models import Project
+
+# الإعدادات الافتراضية لـ Django و sqlite3 في بايثون: سجل rollback ومهلة 5 ثوانٍ ومعاملات مؤجلة
+# (قيم SQLite الافتراضية صراحةً لأن SQLITE_PRAGMAS العامة تُطبق على كل اتصال Django)
+STOCK_PROFILE = {
+    'pragmas': {
+        'journal_mode': 'DELETE', 'synchronous': 'FULL', 'busy_timeout': 5000,
+        'mmap_size': 0, 'cache_size': -2000, 'temp_store': 'DEFAULT',
+    },
+    'transaction_mode': None,
+    'timeout': 5.0,
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'قياس تزامن القراءة والكتابة على نسخة من قاعدة SQLite: الإعدادات الافتراضية (stock) '
+        'مقابل SQLITE_PRAGMAS و BEGIN IMMEDIATE (tuned). '
+        'الكتّاب ينفذون مسار الانضمام الفعلي (Course.add_learner كما في JoinCourseView) '
+        'والقراء ينفذون استعلامات الكتالوج ومشاريع المسار. لا تُعدّل قاعدة البيانات الأصلية'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS, help='اسم قاعدة البيانات في DATABASES')
+        parser.add_argument('--seconds', type=float, default=10.0, help='مدة كل ملف إعدادات')
+        parser.add_argument('--readers', type=int, default=8, help='عدد خيوط القراءة')
+        parser.add_argument('--writers', type=int, default=4, help='عدد خيوط الكتابة')
+        parser.add_argument('--seed', type=int, default=42, help='بذرة اختيار المسارات والمتعلمين')
+
+    def handle(self, *args, **options):
+        connection = connections[options['database']]
+        if connection.vendor != 'sqlite':
+            raise CommandError(f'قاعدة البيانات {options["database"]} ليست SQLite')
+
+        self.course_ids = list(
+            Course.objects.using(options['database']).filter(is_active=True, is_public=True)
+            .values_list('id', flat=True)[:5000]
+        )
+        self.learner_ids = list(
+            CustomUser.objects.using(options['database']).filter(user_type='learner')
+            .values_list('id', flat=True)[:20000]
+        )
+        if not self.course_ids or not self.learner_ids:
+            raise CommandError('لا توجد مسارات أو متعلمون، شغل seed_scale أولاً')
+
+        self.tables = {
+            'course': Course._meta.db_table,
+            'project': Project._meta.db_table,
+        }
+        self.options = options
+        profiles = {
+            'stock': STOCK_PROFILE,
+            'tuned': {
+                'pragmas': get_sqlite_pragmas(connection.settings_dict),
+                'transaction_mode': 'IMMEDIATE',
+                'timeout': 5.0,
+            },
+        }
+
+        source = connection.settings_dict['NAME']
+        results = {}
+        with tempfile.TemporaryDirectory() as directory:
+            for name, profile in profiles.items():
+                path = os.path.join(directory, f'{name}.sqlite3')
+                self._copy_database(source, path, profile)
+                results[name] = self._run_profile(path, profile, self._copy_settings(connection, path, profile))
+                self._print_profile(name, results[name])
+
+        stock, tuned = results['stock'], results['tuned']
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ tuned مقابل stock: القراءة ×{self._ratio(tuned["reads"], stock["reads"])}، '
+            f'الكتابة ×{self._ratio(tuned["writes"], stock["writes"])}، '
+            f'أخطاء القفل {stock["lock_errors"]} ← {tuned["lock_errors"]}'
+        ))
+
+    def _ratio(self, value, baseline):
+        return f'{value / baseline:.2f}' if baseline else '∞'
+
+    def _copy_database(self, source, path, profile):
+        # نسخة متسقة عبر backup API حتى لو كانت القاعدة الأصلية قيد الاستخدام
+        source_connection = sqlite3.connect(source)
+        target_connection = sqlite3.connect(path)
+        try:
+            source_connection.backup(target_connection)
+            target_connection.execute(f'PRAGMA journal_mode = {profile["pragmas"].get("journal_mode", "DELETE")}')
+        finally:
+            target_connection.close()
+            source_connection.close()
+
+    def _copy_settings(self, connection, path, profile):
+        """إعدادات اتصال Django بالنسخة بنفس ملف الإعدادات (PRAGMA ونوع المعاملة والمهلة)"""
+        options = {
+            name: value for name, value in connection.settings_dict.get('OPTIONS', {}).items()
+            if name != 'transaction_mode'
+        }
+        options['timeout'] = profile['timeout']
+        if profile['transaction_mode']:
+            options['transaction_mode'] = profile['transaction_mode']
+        return dict(connection.settings_dict, NAME=path, OPTIONS=options, PRAGMAS=profile['pragmas'])
+
+    def _connect(self, path, profile):
+        connection = sqlite3.connect(path, timeout=profile['timeout'], isolation_level=None, check_same_thread=False)
+        for name, value in profile['pragmas'].items():
+            connection.execute(f'PRAGMA {name} = {value}')
+        return connection
+
+    def _run_profile(self, path, profile, copy_settings):
+        stop_at = time.perf_counter() + self.options['seconds']
+        lock = threading.Lock()
+        totals = {'reads': 0, 'writes': 0, 'read_errors': 0, 'write_errors': 0, 'read_ms': [], 'write_ms': []}
+
+        def record(kind, duration=None, error=False):
+            with lock:
+                if error:
+                    totals[f'{kind}_errors'] += 1
+                else:
+                    totals[f'{kind}s'] += 1
+                    totals[f'{kind}_ms'].append(duration * 1000)
+
+        def reader(index):
+            rng = random.Random(self.options['seed'] * 1000 + index)
+            connection = self._connect(path, profile)
+            try:
+                while time.perf_counter() < stop_at:
+                    started = time.perf_counter()
+                    try:
+                        connection.execute(
+                            f'SELECT id, title, projects_count, enrolled_count FROM {self.tables["course"]} '
+                            f'WHERE is_active AND is_public ORDER BY created_at DESC LIMIT 20 OFFSET ?',
+                            (rng.randrange(0, 200) * 20,)
+                        ).fetchall()
+                        connection.execute(
+                            f'SELECT id, title, "order" FROM {self.tables["project"]} '
+                            f'WHERE course_id = ? AND is_active ORDER BY "order"',
+                            (rng.choice(self.course_ids),)
+                        ).fetchall()
+                        record('read', time.perf_counter() - started)
+                    except sqlite3.OperationalError:
+                        record('read', error=True)
+            finally:
+                connection.close()
+
+        def writer(index):
+            # اتصال default في هذا الخيط يشير للنسخة (كل الكتابات تُوجه إلى default)
+            rng = random.Random(self.options['seed'] * 1000 + 500 + index)
+            try:
+                while time.perf_counter() < stop_at:
+                    course_id = rng.choice(self.course_ids)
+                    learner_id = rng.choice(self.learner_ids)
+                    started = time.perf_counter()
+                    try:
+                        course = Course.objects.get(id=course_id, is_active=True)
+                        course.add_learner(CustomUser.objects.get(pk=learner_id))
+                        record('write', time.perf_counter() - started)
+                    except OperationalError:
+                        record('write', error=True)
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=reader, args=(index,)) for index in range(self.options['readers'])]
+        threads += [threading.Thread(target=writer, args=(index,)) for index in range(self.options['writers'])]
+        # اتصالات Django تُنشأ لكل خيط من connections.settings عند أول استخدام
+        original = connections.settings[DEFAULT_DB_ALIAS]
+        connections.settings[DEFAULT_DB_ALIAS] = copy_settings
+        try:
+            # رسائل add_learner لكل انضمام لا تُطبع
+            with redirect_stdout(io.StringIO()):
+                for thread in threads:
+                    thread.start()
+                for thread in threads:
+                    thread.join()
+        finally:
+            connections.settings[DEFAULT_DB_ALIAS] = original
+
+        seconds = self.options['seconds']
+        return {
+            'reads': totals['reads'] / seconds,
+            'writes': totals['writes'] / seconds,
+            'read_errors': totals['read_errors'],
+            'write_errors': totals['write_errors'],
+            'lock_errors': totals['read_errors'] + totals['write_errors'],
+            'read_p95_ms': percentile(sorted(totals['read_ms']), 0.95) if totals['read_ms'] else 0.0,
+            'write_p95_ms': percentile(sorted(totals['write_ms']), 0.95) if totals['write_ms'] else 0.0,
+        }
+
+    def _print_profile(self, name, result):
+        self.stdout.write(
+            f'{name:<6} قراءة {result["reads"]:>8.1f}/ث (p95 {result["read_p95_ms"]:.1f}ms)  '
+            f'كتابة {result["writes"]:>7.1f}/ث (p95 {result["write_p95_ms"]:.1f}ms)  '
+            f'أخطاء القفل: قراءة {result["read_errors"]}، كتابة {result["write_errors"]}'
+        )
@@ -0,0 +1,28 @@
+# courses/management/commands/reconcile_enrollment_counts.py
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from courses.models import Course
+
+
+class Command(BaseCommand):
+    help = 'إعادة بناء عداد enrolled_count لكل المسارات من جدول الانضمام'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--course',
+            type=int,
+            action='append',
+            dest='course_ids',
+            help='معرف مسار محدد (يمكن تكراره)، بدون هذا الخيار تتم معالجة كل المسارات',
+        )
+
+    def handle(self, *args, **options):
+        queryset = Course.objects.all()
+        if options['course_ids']:
+            queryset = queryset.filter(id__in=options['course_ids'])
+
+        with transaction.atomic():
+            updated = queryset.recount_enrollments()
+
+        self.stdout.write(self.style.SUCCESS(f'✅ تمت إعادة بناء عداد المنضمين لـ {updated} مسار'))
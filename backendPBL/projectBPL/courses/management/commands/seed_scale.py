@@ -0,0 +1,192 @@
+# courses/management/commands/seed_scale.py
+import random
+import time
+from itertools import islice
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from account.models import CustomUser
+from courses.cache import bump_generation
+from courses.models import Course
+from projects.models import Project
+
+LEVELS = [value for value, _ in Course.LEVEL_CHOICES]
+CATEGORIES = [value for value, _ in Course.CATEGORY_CHOICES]
+LANGUAGES = [value for value, _ in Project.PROGRAMMING_LANGUAGE_CHOICES]
+
+WORDS = (
+    'تطبيق', 'مشروع', 'بيانات', 'واجهة', 'خادم', 'تحليل', 'تصميم', 'نموذج', 'اختبار', 'نشر',
+    'قاعدة', 'شبكة', 'أمان', 'أداء', 'مكتبة', 'خوارزمية', 'لوحة', 'تقرير', 'بحث', 'تكامل',
+)
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def split_evenly(total, parts):
+    """توزيع total على parts بحيث يختلف كل جزء بواحد على الأكثر"""
+    base, remainder = divmod(total, parts) if parts else (0, 0)
+    return [base + (1 if index < remainder else 0) for index in range(parts)]
+
+
+class Command(BaseCommand):
+    help = (
+        'توليد بيانات بحجم الإنتاج لاختبارات الأداء (bulk_create على دفعات، '
+        'كلمة مرور مشفرة مرة واحدة، ونتيجة ثابتة لنفس --seed) '
+        '(مثال: python manage.py seed_scale --learners 50000 --courses 20000 --enrollments 2000000)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--learners', type=int, default=50000, help='عدد المتعلمين')
+        parser.add_argument('--admins', type=int, default=500, help='عدد المشرفين')
+        parser.add_argument('--courses', type=int, default=20000, help='عدد المسارات')
+        parser.add_argument('--projects', type=int, default=300000, help='عدد المشاريع (موزعة على المسارات)')
+        parser.add_argument('--enrollments', type=int, default=2000000, help='عدد صفوف الانضمام')
+        parser.add_argument('--seed', type=int, default=42, help='بذرة المولد العشوائي')
+        parser.add_argument('--chunk-size', type=int, default=5000, help='عدد الصفوف في كل bulk_create')
+        parser.add_argument('--password', default='Seed123!x', help='كلمة المرور لكل المستخدمين المولدين')
+        parser.add_argument(
+            '--prefix', default=None,
+            help='بادئة البريد الإلكتروني وعناوين المسارات (الافتراضي seed<SEED>)'
+        )
+
+    def handle(self, *args, **options):
+        for name in ('learners', 'admins', 'courses', 'projects', 'enrollments'):
+            if options[name] < 0:
+                raise CommandError(f'--{name} لا يمكن أن يكون سالباً')
+        if options['courses'] and not options['admins']:
+            raise CommandError('المسارات تحتاج مشرفاً واحداً على الأقل (--admins)')
+        if options['enrollments'] > options['learners'] * options['courses']:
+            raise CommandError('عدد صفوف الانضمام أكبر من عدد أزواج (متعلم، مسار) الممكنة')
+
+        self.rng = random.Random(options['seed'])
+        self.chunk_size = max(1, options['chunk_size'])
+        self.prefix = options['prefix'] or f"seed{options['seed']}"
+
+        if CustomUser.objects.filter(email__startswith=f'{self.prefix}.').exists():
+            raise CommandError(f'توجد بيانات مولدة بالبادئة "{self.prefix}" مسبقاً، استخدم --prefix أو --seed آخر')
+
+        started = time.monotonic()
+        # تشفير كلمة المرور مرة واحدة (set_password لكل مستخدم يستغرق ساعات مع PBKDF2)
+        password = make_password(options['password'])
+
+        admin_ids = self._stage('المشرفين', lambda: self._create_users('admin', options['admins'], password))
+        learner_ids = self._stage('المتعلمين', lambda: self._create_users('learner', options['learners'], password))
+
+        projects_per_course = split_evenly(options['projects'], options['courses'])
+        enrollments_per_learner = split_evenly(options['enrollments'], len(learner_ids))
+        # أعداد الانضمام لكل مسار تُحسب مسبقاً لتُكتب مع المسار (بدون إعادة عد لاحقاً)
+        enrollment_plan = [
+            self.rng.sample(range(options['courses']), count) if count else []
+            for count in enrollments_per_learner
+        ]
+        enrolled_per_course = [0] * options['courses']
+        for course_indexes in enrollment_plan:
+            for course_index in course_indexes:
+                enrolled_per_course[course_index] += 1
+
+        course_ids = self._stage('المسارات', lambda: self._create_courses(
+            admin_ids, projects_per_course, enrolled_per_course
+        ))
+        self._stage('المشاريع', lambda: self._create_projects(course_ids, projects_per_course))
+        self._stage('الانضمامات', lambda: self._create_enrollments(learner_ids, course_ids, enrollment_plan))
+
+        bump_generation()
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ تم توليد البيانات في {time.monotonic() - started:.1f} ثانية '
+            f'(البادئة "{self.prefix}"، كلمة المرور "{options["password"]}")'
+        ))
+
+    def _stage(self, label, function):
+        started = time.monotonic()
+        with transaction.atomic():
+            result = function()
+        count = len(result) if isinstance(result, list) else result
+        self.stdout.write(f'  {label}: {count} صف في {time.monotonic() - started:.1f} ثانية')
+        return result
+
+    def _words(self, count):
+        return ' '.join(self.rng.choice(WORDS) for _ in range(count))
+
+    def _create_users(self, user_type, count, password):
+        users = (
+            CustomUser(
+                email=f'{self.prefix}.{user_type}{index}@example.com',
+                password=password,
+                user_type=user_type,
+                first_name=f'{user_type}{index}',
+                last_name=self.prefix,
+            )
+            for index in range(count)
+        )
+        ids = []
+        for chunk in chunked(users, self.chunk_size):
+            ids.extend(user.pk for user in CustomUser.objects.bulk_create(chunk))
+        return ids
+
+    def _create_courses(self, admin_ids, projects_per_course, enrolled_per_course):
+        courses = (
+            Course(
+                title=f'{self.prefix} مسار {index} {self._words(2)}',
+                description=self._words(self.rng.randint(20, 120)),
+                level=self.rng.choice(LEVELS),
+                category=self.rng.choice(CATEGORIES),
+                estimated_duration=self.rng.randint(5, 200),
+                projects_count=projects_count,
+                enrolled_count=enrolled_count,
+                is_public=self.rng.random() < 0.9,
+                is_active=self.rng.random() < 0.97,
+                instructor_id=admin_ids[index % len(admin_ids)],
+            )
+            for index, (projects_count, enrolled_count) in enumerate(zip(projects_per_course, enrolled_per_course))
+        )
+        ids = []
+        for chunk in chunked(courses, self.chunk_size):
+            ids.extend(course.pk for course in Course.objects.bulk_create(chunk))
+        return ids
+
+    def _create_projects(self, course_ids, projects_per_course):
+        # projects_count المخزن يعد كل المشاريع المولدة لذلك كلها نشطة
+        # الترتيب بفجوات ORDER_GAP كما في إنشاء المشاريع، فالنقل والإدراج لا يحتاجان إعادة ترقيم
+        projects = (
+            Project(
+                course_id=course_id,
+                title=f'مشروع {order} {self._words(2)}',
+                description=self._words(self.rng.randint(20, 150)),
+                requirements=self._words(self.rng.randint(5, 40)),
+                objectives=self._words(self.rng.randint(5, 40)),
+                resources=self._words(self.rng.randint(0, 20)),
+                estimated_time=self.rng.randint(1, 80),
+                level=self.rng.choice(LEVELS),
+                language=self.rng.choice(LANGUAGES),
+                order=order * Project.ORDER_GAP,
+            )
+            for course_id, count in zip(course_ids, projects_per_course)
+            for order in range(1, count + 1)
+        )
+        created = 0
+        for chunk in chunked(projects, self.chunk_size):
+            Project.objects.bulk_create(chunk)
+            created += len(chunk)
+        return created
+
+    def _create_enrollments(self, learner_ids, course_ids, enrollment_plan):
+        Enrollment = Course.enrolled_learners.through
+        rows = (
+            Enrollment(course_id=course_ids[course_index], customuser_id=learner_id)
+            for learner_id, course_indexes in zip(learner_ids, enrollment_plan)
+            for course_index in course_indexes
+        )
+        created = 0
+        for chunk in chunked(rows, self.chunk_size):
+            Enrollment.objects.bulk_create(chunk)
+            created += len(chunk)
+        return created
@@ -0,0 +1,54 @@
+# courses/management/commands/sqlite_maintenance.py
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+class Command(BaseCommand):
+    help = (
+        'صيانة دورية لقاعدة SQLite: نقل سجل WAL إلى الملف الرئيسي (wal_checkpoint) '
+        'وتحديث إحصائيات المخطط (PRAGMA optimize) '
+        '(مثال cron: */15 * * * * python manage.py sqlite_maintenance، '
+        'ويومياً في وقت الهدوء: 30 3 * * * python manage.py sqlite_maintenance --mode truncate)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS, help='اسم قاعدة البيانات في DATABASES')
+        parser.add_argument(
+            '--mode', choices=('passive', 'full', 'restart', 'truncate'), default='passive',
+            help='نوع نقطة التفتيش: passive لا ينتظر أحداً، truncate ينتظر القراء ويصفّر ملف WAL'
+        )
+        parser.add_argument('--skip-optimize', action='store_true', help='تنفيذ نقطة التفتيش فقط')
+
+    def handle(self, *args, **options):
+        connection = connections[options['database']]
+        if connection.vendor != 'sqlite':
+            raise CommandError(f'قاعدة البيانات {options["database"]} ليست SQLite')
+
+        wal_path = f'{connection.settings_dict["NAME"]}-wal'
+        size_before = os.path.getsize(wal_path) if os.path.exists(wal_path) else 0
+
+        with connection.cursor() as cursor:
+            journal_mode = cursor.execute('PRAGMA journal_mode').fetchone()[0]
+            if journal_mode.lower() != 'wal':
+                self.stdout.write(self.style.WARNING(f'⚠️ وضع السجل {journal_mode} وليس WAL، لا حاجة لنقطة تفتيش'))
+            else:
+                busy, log_frames, checkpointed = cursor.execute(
+                    f'PRAGMA wal_checkpoint({options["mode"].upper()})'
+                ).fetchone()
+                size_after = os.path.getsize(wal_path) if os.path.exists(wal_path) else 0
+                message = (
+                    f'نقطة التفتيش ({options["mode"]}): {checkpointed} من {log_frames} صفحة، '
+                    f'حجم WAL {size_before // 1024}KB ← {size_after // 1024}KB'
+                )
+                if busy:
+                    self.stdout.write(self.style.WARNING(f'⚠️ {message} (لم تكتمل بسبب قراء أو كتاب نشطين)'))
+                else:
+                    self.stdout.write(message)
+
+            if not options['skip_optimize']:
+                cursor.execute('PRAGMA optimize')
+                self.stdout.write('تم تحديث إحصائيات المخطط (PRAGMA optimize)')
+
+        self.stdout.write(self.style.SUCCESS('✅ اكتملت صيانة SQLite'))
@@ -0,0 +1,265 @@
+# courses/management/commands/stress_concurrency.py
+import random
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+
+# ⭐ لا تُستورد النماذج على مستوى الوحدة: العمليات الفرعية (spawn على Windows)
+# تستورد هذه الوحدة قبل django.setup() في _init_worker
+
+LOCK_ERROR_MARKERS = ('database is locked', 'database table is locked', 'deadlock', 'lock wait timeout')
+
+
+def _init_worker():
+    import logging
+
+    import django
+    from django.conf import settings
+
+    django.setup()
+    # عميل الاختبار يرسل Host: testserver، وسطر السجل لكل طلب يضيف زمناً للقياس
+    if 'testserver' not in settings.ALLOWED_HOSTS:
+        settings.ALLOWED_HOSTS = list(settings.ALLOWED_HOSTS) + ['testserver']
+    settings.SQL_INSTRUMENTATION = False
+    # أخطاء 500 تُحتسب في التقرير بدلاً من طباعة سجل لكل طلب
+    logging.getLogger('django.request').setLevel(logging.CRITICAL)
+
+
+def _classify(status_code, body):
+    text = body.lower()
+    if any(marker in text for marker in LOCK_ERROR_MARKERS):
+        return 'lock'
+    if status_code < 400:
+        return 'ok'
+    return f'http_{status_code}'
+
+
+def _run_task(task, close_connection=False):
+    """
+    تنفيذ طلب واحد وإرجاع (النوع، التصنيف، الزمن بالثواني)
+    task = (النوع، الطريقة، الرابط، التوكن، الجسم)
+    """
+    from django.db import OperationalError, connections
+    from rest_framework.test import APIClient
+
+    kind, method, url, token, data = task
+    client = APIClient(raise_request_exception=False)
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+    started = time.perf_counter()
+    try:
+        response = getattr(client, method)(url, data=data, format='json')
+        body = b''.join(response.streaming_content) if response.streaming else response.content
+        outcome = _classify(response.status_code, body.decode('utf-8', 'replace'))
+    except OperationalError as error:
+        outcome = 'lock' if any(marker in str(error).lower() for marker in LOCK_ERROR_MARKERS) else 'db_error'
+    except Exception as error:  # كل خطأ غير متوقع يُحتسب ولا يوقف القياس
+        outcome = f'exception_{type(error).__name__}'
+    finally:
+        if close_connection:
+            # كل خيط يفتح اتصاله الخاص؛ الإغلاق يمنع تراكم الاتصالات المفتوحة
+            connections.close_all()
+    return kind, outcome, time.perf_counter() - started
+
+
+def _run_thread_task(task):
+    return _run_task(task, close_connection=True)
+
+
+class Command(BaseCommand):
+    help = (
+        'اختبار التزامن: موجة انضمام لمسار واحد (مع طلبات مكررة لنفس المتعلم)، إنشاء مشاريع متزامن في نفس المسار وقراءات مختلطة '
+        'بعدة خيوط أو عمليات، مع قياس الإنتاجية وأخطاء القفل (database is locked) '
+        'والتحقق من الثوابت بعد التشغيل (ترتيب مكرر، projects_count، enrolled_count). '
+        'يكتب بيانات فعلية - استخدمه على نسخة من قاعدة البيانات (seed_scale)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--course', type=int, help='معرف المسار المستهدف (الافتراضي: إنشاء مسار جديد للاختبار)')
+        parser.add_argument('--joins', type=int, default=500, help='عدد طلبات الانضمام (متعلم مختلف لكل طلب)')
+        parser.add_argument(
+            '--duplicate-joins', type=float, default=0.1,
+            help='نسبة طلبات الانضمام التي تُرسل مرة ثانية بنفس التوكن بجوار الأولى (سباق انضمام مكرر لنفس المتعلم)'
+        )
+        parser.add_argument('--creates', type=int, default=100, help='عدد طلبات إنشاء المشاريع في المسار')
+        parser.add_argument('--reads', type=int, default=500, help='عدد طلبات القراءة المختلطة')
+        parser.add_argument('--workers', type=int, default=16, help='عدد الخيوط أو العمليات المتزامنة')
+        parser.add_argument('--mode', choices=('threads', 'processes'), default='threads', help='نوع التزامن')
+        parser.add_argument('--seed', type=int, default=42, help='بذرة ترتيب الطلبات')
+        parser.add_argument('--strict', action='store_true', help='فشل الأمر عند أي خرق للثوابت')
+
+    def handle(self, *args, **options):
+        from django.db import connections
+
+        if not 0 <= options['duplicate_joins'] <= 1:
+            raise CommandError('--duplicate-joins نسبة بين 0 و 1')
+
+        _init_worker()
+        course = self._get_course(options['course'])
+        tasks = self._build_tasks(course, options)
+        if not tasks:
+            raise CommandError('لا توجد طلبات للتنفيذ (--joins و --creates و --reads كلها صفر)')
+
+        self.stdout.write(
+            f'المسار {course.id}: {len(tasks)} طلب ({options["joins"]} انضمام + {self.duplicate_joins} مكرر، '
+            f'{options["creates"]} إنشاء، {options["reads"]} قراءة) بـ {options["workers"]} {options["mode"]}'
+        )
+
+        # العمليات الفرعية لا يجب أن ترث اتصالات قاعدة البيانات المفتوحة
+        connections.close_all()
+        started = time.perf_counter()
+        if options['mode'] == 'processes':
+            with ProcessPoolExecutor(max_workers=options['workers'], initializer=_init_worker) as executor:
+                results = list(executor.map(_run_task, tasks, chunksize=8))
+        else:
+            with ThreadPoolExecutor(max_workers=options['workers']) as executor:
+                results = list(executor.map(_run_thread_task, tasks))
+        elapsed = time.perf_counter() - started
+
+        self._report(results, elapsed)
+        violations = self._check_invariants(course.id, results)
+        if violations and options['strict']:
+            raise CommandError(f'{len(violations)} خرق للثوابت')
+
+    def _get_course(self, course_id):
+        from account.models import CustomUser
+        from courses.models import Course
+
+        if course_id:
+            try:
+                return Course.objects.get(id=course_id, is_active=True)
+            except Course.DoesNotExist:
+                raise CommandError(f'المسار {course_id} غير موجود')
+
+        admin = CustomUser.objects.filter(user_type='admin', is_active=True).order_by('id').first()
+        if admin is None:
+            raise CommandError('لا يوجد مشرف في قاعدة البيانات، شغل seed_scale أولاً')
+        return Course.objects.create(
+            title=f'اختبار التزامن {int(time.time())}',
+            description='مسار مؤقت لاختبار موجات الانضمام وإنشاء المشاريع المتزامن',
+            estimated_duration=10,
+            is_public=True,
+            instructor=admin,
+        )
+
+    def _build_tasks(self, course, options):
+        from django.urls import reverse
+        from rest_framework_simplejwt.tokens import AccessToken
+
+        from account.models import CustomUser
+
+        learners = list(
+            CustomUser.objects.filter(user_type='learner', is_active=True)
+            .exclude(enrolled_courses_as_learner=course)
+            .order_by('id')[:max(options['joins'], 1)]
+        )
+        if len(learners) < options['joins']:
+            raise CommandError(f'عدد المتعلمين غير المنضمين للمسار ({len(learners)}) أقل من --joins')
+        admins = list(CustomUser.objects.filter(user_type='admin', is_active=True).order_by('id')[:options['workers']])
+        if options['creates'] and not admins:
+            raise CommandError('إنشاء المشاريع يحتاج مشرفاً واحداً على الأقل')
+
+        learner_tokens = [str(AccessToken.for_user(learner)) for learner in learners]
+        admin_tokens = [str(AccessToken.for_user(admin)) for admin in admins]
+
+        tasks = [
+            ('join', 'post', reverse('courses:join-course', kwargs={'id': course.id}), token, None)
+            for token in learner_tokens[:options['joins']]
+        ]
+        tasks += [
+            (
+                'create', 'post', reverse('projects:create-project'), admin_tokens[index % len(admin_tokens)],
+                {
+                    'course_id': course.id,
+                    'title': f'مشروع التزامن {index}',
+                    'description': 'مشروع مولد لاختبار إنشاء المشاريع المتزامن في نفس المسار',
+                    'estimated_time': 5,
+                    'level': 'beginner',
+                    'language': 'python',
+                },
+            )
+            for index in range(options['creates'])
+        ]
+        read_urls = [
+            reverse('courses:course-detail', kwargs={'id': course.id}),
+            reverse('projects:course-projects', kwargs={'course_id': course.id}),
+            reverse('courses:check-enrollment', kwargs={'id': course.id}),
+            reverse('courses:list-courses') + '?fields=id,title',
+        ]
+        reader_tokens = learner_tokens or admin_tokens
+        tasks += [
+            ('read', 'get', read_urls[index % len(read_urls)], reader_tokens[index % len(reader_tokens)], None)
+            for index in range(options['reads'])
+        ]
+
+        rng = random.Random(options['seed'])
+        rng.shuffle(tasks)
+
+        # ⭐ نسخة ثانية من بعض طلبات الانضمام بجوار الأولى مباشرة فتُنفذان في نفس الوقت
+        # (الثابت enrolled_count == صفوف الانضمام وعدد الانضمامات الناجحة يكشفان الاحتساب المزدوج)
+        join_positions = [index for index, task in enumerate(tasks) if task[0] == 'join']
+        duplicated = set(rng.sample(join_positions, round(len(join_positions) * options['duplicate_joins'])))
+        self.duplicate_joins = len(duplicated)
+        with_duplicates = []
+        for index, task in enumerate(tasks):
+            with_duplicates.append(task)
+            if index in duplicated:
+                with_duplicates.append(task)
+        return with_duplicates
+
+    def _report(self, results, elapsed):
+        from projectBPL.benchmarks import percentile
+
+        by_kind = defaultdict(list)
+        outcomes = defaultdict(Counter)
+        for kind, outcome, duration in results:
+            by_kind[kind].append(duration * 1000)
+            outcomes[kind][outcome] += 1
+
+        self.stdout.write(f'الإنتاجية: {len(results) / elapsed:.1f} طلب/ثانية ({len(results)} طلب في {elapsed:.2f} ثانية)')
+        for kind, durations in sorted(by_kind.items()):
+            durations.sort()
+            summary = '، '.join(f'{outcome}={count}' for outcome, count in outcomes[kind].most_common())
+            line = (
+                f'  {kind:<7} p50={percentile(durations, 0.5):.1f}ms p95={percentile(durations, 0.95):.1f}ms '
+                f'p99={percentile(durations, 0.99):.1f}ms  {summary}'
+            )
+            if outcomes[kind]['lock']:
+                self.stdout.write(self.style.WARNING(f'{line} ⚠️ أخطاء قفل'))
+            else:
+                self.stdout.write(line)
+
+    def _check_invariants(self, course_id, results):
+        from django.db.models import Count
+
+        from courses.models import Course
+        from projects.models import Project
+
+        course = Course.objects.with_projects_count_drift().get(id=course_id)
+        enrollment_rows = Course.enrolled_learners.through.objects.filter(course_id=course_id).count()
+        duplicate_orders = list(
+            Project.objects.filter(course_id=course_id, is_active=True)
+            .values('order').annotate(total=Count('id')).filter(total__gt=1)
+            .values_list('order', 'total')
+        )
+        successful = Counter(kind for kind, outcome, _ in results if outcome == 'ok')
+
+        violations = []
+        if duplicate_orders:
+            violations.append(f'قيم order مكررة: {duplicate_orders[:10]}')
+        if course.projects_count != course.actual_projects_count:
+            violations.append(f'projects_count={course.projects_count} والفعلي={course.actual_projects_count}')
+        if course.enrolled_count != enrollment_rows:
+            violations.append(f'enrolled_count={course.enrolled_count} وصفوف الانضمام={enrollment_rows}')
+        if successful['join'] > enrollment_rows:
+            violations.append(f'{successful["join"]} انضمام ناجح لكن صفوف الانضمام {enrollment_rows} فقط')
+
+        if violations:
+            for violation in violations:
+                self.stdout.write(self.style.ERROR(f'❌ {violation}'))
+        else:
+            self.stdout.write(self.style.SUCCESS(
+                f'✅ الثوابت سليمة: {course.projects_count} مشروع، {enrollment_rows} منضم، بدون ترتيب مكرر'
+            ))
+        return violations
@@ -0,0 +1,52 @@
+# courses/management/commands/sync_sqlite_replicas.py
+import sqlite3
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from courses.replicas import get_replica_aliases
+
+
+class Command(BaseCommand):
+    help = (
+        'نسخ قاعدة SQLite الرئيسية إلى ملفات نسخ القراءة (SQLITE_REPLICAS) عبر backup API. '
+        'مع --interval يعمل باستمرار كبديل محلي للنسخ المتماثل '
+        '(يجب أن تكون الفترة أقل من REPLICA_STICKY_SECONDS)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', action='append', help='نسخة قراءة محددة (الافتراضي: كل REPLICA_DATABASES)')
+        parser.add_argument('--interval', type=float, default=0, help='إعادة النسخ كل N ثانية (0 = مرة واحدة)')
+
+    def handle(self, *args, **options):
+        aliases = options['database'] or get_replica_aliases()
+        if not aliases:
+            raise CommandError('لا توجد نسخ قراءة، حدد SQLITE_REPLICAS')
+        for alias in aliases:
+            if alias not in get_replica_aliases() or connections[alias].vendor != 'sqlite':
+                raise CommandError(f'{alias} ليست نسخة قراءة SQLite في REPLICA_DATABASES')
+
+        # النسخ عبر اتصال Django نفسه (يعمل أيضاً مع أسماء URI وقاعدة الاختبار في الذاكرة)
+        source = connections[DEFAULT_DB_ALIAS]
+        if source.vendor != 'sqlite':
+            raise CommandError('القاعدة الرئيسية ليست SQLite')
+        while True:
+            for alias in aliases:
+                self._sync(source, connections[alias].settings_dict['NAME'], alias)
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
+
+    def _sync(self, source, target, alias):
+        started = time.perf_counter()
+        source.ensure_connection()
+        # الكتابة في ملف النسخة تنتظر انتهاء القراءات الجارية عليها
+        timeout = (getattr(settings, 'SQLITE_PRAGMAS', None) or {}).get('busy_timeout', 5000) / 1000
+        target_connection = sqlite3.connect(target, timeout=timeout)
+        try:
+            source.connection.backup(target_connection)
+        finally:
+            target_connection.close()
+        self.stdout.write(f'{alias}: {target} ({(time.perf_counter() - started) * 1000:.0f}ms)')
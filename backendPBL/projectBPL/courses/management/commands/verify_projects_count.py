@@ -0,0 +1,52 @@
+# courses/management/commands/verify_projects_count.py
+from django.core.management.base import BaseCommand
+from django.db import models, transaction
+
+from courses.models import Course
+
+
+class Command(BaseCommand):
+    help = (
+        'التحقق الدوري من تطابق projects_count مع العدد الفعلي للمشاريع النشطة '
+        'على دفعات، مع الإصلاح عند تمرير --repair '
+        '(مثال cron: */30 * * * * python manage.py verify_projects_count --repair)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repair', action='store_true', help='إصلاح المسارات المنحرفة')
+        parser.add_argument('--batch-size', type=int, default=1000, help='عدد المسارات في كل دفعة')
+
+    def handle(self, *args, **options):
+        batch_size = max(1, options['batch_size'])
+        repair = options['repair']
+        last_id = 0
+        checked = 0
+        drifted = []
+
+        while True:
+            batch_ids = list(
+                Course.objects.filter(id__gt=last_id).order_by('id').values_list('id', flat=True)[:batch_size]
+            )
+            if not batch_ids:
+                break
+            last_id = batch_ids[-1]
+            checked += len(batch_ids)
+
+            rows = list(
+                Course.objects.filter(id__in=batch_ids)
+                .with_projects_count_drift()
+                .exclude(projects_count=models.F('actual_projects_count'))
+                .values_list('id', 'projects_count', 'actual_projects_count')
+            )
+            for course_id, stored, actual in rows:
+                drifted.append(course_id)
+                self.stdout.write(f'⚠️  المسار {course_id}: المخزن={stored} الفعلي={actual}')
+
+            if repair and rows:
+                with transaction.atomic():
+                    Course.objects.filter(id__in=[row[0] for row in rows]).recount_projects()
+
+        summary = f'تم فحص {checked} مسار، عدد المسارات المنحرفة: {len(drifted)}'
+        if repair and drifted:
+            summary += ' (تم الإصلاح)'
+        self.stdout.write(self.style.SUCCESS(f'✅ {summary}') if not drifted or repair else self.style.WARNING(summary))
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-17 14:51
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='course',
+            index=models.Index(fields=['is_active', 'created_at', 'id'], name='course_catalog_keyset_idx'),
+        ),
+    ]
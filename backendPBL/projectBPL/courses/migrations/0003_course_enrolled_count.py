@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-17 14:52
+
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+
+
+def backfill_enrolled_count(apps, schema_editor):
+    """تعبئة العداد من جدول الانضمام بجملة UPDATE واحدة"""
+    Course = apps.get_model('courses', 'Course')
+    Enrollment = Course.enrolled_learners.through
+
+    enrolled_subquery = Enrollment.objects.filter(
+        course_id=models.OuterRef('pk')
+    ).order_by().values('course_id').annotate(
+        total=models.Count('pk')
+    ).values('total')
+
+    Course.objects.update(
+        enrolled_count=Coalesce(
+            models.Subquery(enrolled_subquery, output_field=models.IntegerField()),
+            0
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0002_course_catalog_keyset_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='course',
+            name='enrolled_count',
+            field=models.IntegerField(default=0, editable=False, help_text='عداد مخزن يُحدّث ذرياً عند الانضمام والمغادرة', verbose_name='عدد المتعلمين المنضمين'),
+        ),
+        migrations.RunPython(backfill_enrolled_count, migrations.RunPython.noop),
+    ]
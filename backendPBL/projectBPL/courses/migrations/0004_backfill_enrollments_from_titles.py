@@ -0,0 +1,69 @@
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+
+BATCH_SIZE = 500
+
+
+def backfill_enrollments(apps, schema_editor):
+    """
+    نقل الانضمامات المخزنة في CustomUser.enrolled_courses_titles إلى جدول الانضمام
+    على دفعات من المستخدمين، ثم إعادة بناء enrolled_count للمسارات المتأثرة
+    """
+    CustomUser = apps.get_model('account', 'CustomUser')
+    Course = apps.get_model('courses', 'Course')
+    Enrollment = Course.enrolled_learners.through
+
+    course_ids_by_title = dict(
+        Course.objects.filter(is_active=True).values_list('title', 'id')
+    )
+    if not course_ids_by_title:
+        return
+
+    learners = CustomUser.objects.filter(user_type='learner').order_by('pk')
+    touched_courses = set()
+    last_pk = 0
+
+    while True:
+        batch = list(
+            learners.filter(pk__gt=last_pk).values_list('pk', 'enrolled_courses_titles')[:BATCH_SIZE]
+        )
+        if not batch:
+            break
+        last_pk = batch[-1][0]
+
+        rows = []
+        for user_id, titles in batch:
+            for title in titles or []:
+                course_id = course_ids_by_title.get(title)
+                if course_id is not None:
+                    rows.append(Enrollment(course_id=course_id, customuser_id=user_id))
+                    touched_courses.add(course_id)
+
+        # الصفوف الموجودة مسبقاً تُتجاهل بفضل القيد الفريد (course_id, customuser_id)
+        Enrollment.objects.bulk_create(rows, batch_size=BATCH_SIZE, ignore_conflicts=True)
+
+    if touched_courses:
+        enrolled_subquery = Enrollment.objects.filter(
+            course_id=models.OuterRef('pk')
+        ).order_by().values('course_id').annotate(
+            total=models.Count('pk')
+        ).values('total')
+
+        Course.objects.filter(id__in=touched_courses).update(
+            enrolled_count=Coalesce(
+                models.Subquery(enrolled_subquery, output_field=models.IntegerField()),
+                0
+            )
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account', '0001_initial'),
+        ('courses', '0003_course_enrolled_count'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_enrollments, migrations.RunPython.noop),
+    ]
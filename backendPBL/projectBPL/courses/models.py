@@ -1,10 +1,111 @@
 # courses/models.py
-from django.db import models
+import logging
+
+from django.conf import settings
+from django.db import models, transaction
 from django.utils.translation import gettext_lazy as _
 from django.utils import timezone
+from django.db.models.functions import Coalesce, Concat, NullIf, Trim
 from account.models import CustomUser
+from .cache import bump_generation
+from .counters import is_deferred, recount_projects, shift_enrolled_counts
+from .tracking import DirtyFieldsMixin
+
+logger = logging.getLogger(__name__)
+
+
+def _active_projects_subquery():
+    """عدد المشاريع النشطة لكل مسار (مرتبط بـ OuterRef('pk'))"""
+    from projects.models import Project
+    
+    return Project.objects.filter(
+        course_id=models.OuterRef('pk'),
+        is_active=True
+    ).order_by().values('course_id').annotate(
+        total=models.Count('pk')
+    ).values('total')
+
+
+class CourseQuerySet(models.QuerySet):
+    """استعلامات مخصصة للمسارات"""
+    
+    def with_catalog_stats(self):
+        """
+        إضافة إحصائيات الكتالوج (عدد المنضمين، عدد المشاريع النشطة، اسم المشرف)
+        كحقول محسوبة في نفس استعلام SQL بدلاً من استعلام لكل مسار
+        عدد المنضمين يُقرأ من العمود المخزن enrolled_count دون مسح جدول الانضمام
+        """
+        projects_subquery = _active_projects_subquery()
+        
+        # الاسم الكامل للمشرف، ثم البريد الإلكتروني، ثم قيمة افتراضية
+        full_name = Trim(Concat(
+            Coalesce('instructor__first_name', models.Value('')),
+            models.Value(' '),
+            Coalesce('instructor__last_name', models.Value('')),
+            output_field=models.CharField()
+        ))
+        instructor_name = Coalesce(
+            NullIf(full_name, models.Value('')),
+            NullIf('instructor__email', models.Value('')),
+            models.Value('مشرف النظام'),
+            output_field=models.CharField()
+        )
+        
+        return self.annotate(
+            catalog_enrolled_count=models.F('enrolled_count'),
+            catalog_projects_count=Coalesce(
+                models.Subquery(projects_subquery, output_field=models.IntegerField()),
+                0
+            ),
+            catalog_instructor_name=instructor_name,
+        )
+    
+    def with_projects_count_drift(self):
+        """إضافة العدد الفعلي للمشاريع النشطة بجانب projects_count المخزن لكشف الانحراف"""
+        return self.annotate(
+            actual_projects_count=Coalesce(
+                models.Subquery(_active_projects_subquery(), output_field=models.IntegerField()),
+                0
+            )
+        )
+    
+    def recount_projects(self):
+        """
+        إعادة بناء projects_count لكل المسارات في الاستعلام بجملة UPDATE واحدة
+        (COUNT ... GROUP BY course_id كاستعلام فرعي مرتبط)
+        """
+        updated = self.update(
+            projects_count=Coalesce(
+                models.Subquery(_active_projects_subquery(), output_field=models.IntegerField()),
+                0
+            ),
+            updated_at=timezone.now()
+        )
+        if updated:
+            bump_generation()
+        return updated
+    
+    def recount_enrollments(self):
+        """
+        إعادة بناء enrolled_count لكل المسارات في الاستعلام من جدول الانضمام
+        بجملة UPDATE واحدة (COUNT ... GROUP BY course_id) بدلاً من حلقة على المسارات
+        (عداد فقط: لا يُغير updated_at ولا جيل الكتالوج، راجع courses.counters)
+        """
+        enrolled_subquery = Course.enrolled_learners.through.objects.filter(
+            course_id=models.OuterRef('pk')
+        ).order_by().values('course_id').annotate(
+            total=models.Count('pk')
+        ).values('total')
+        
+        return self.update(
+            enrolled_count=Coalesce(
+                models.Subquery(enrolled_subquery, output_field=models.IntegerField()),
+                0
+            )
+        )
+
 
-class Course(models.Model):
+class Course(DirtyFieldsMixin, models.Model):
     """نموذج المسار التعليمي"""
     LEVEL_CHOICES = (
         ('beginner', 'مبتدئ'),
@@ -54,6 +155,12 @@ class Course(models.Model):
         help_text='عدد المشاريع العملية في هذا المسار',
         editable=False
     )
+    enrolled_count = models.IntegerField(
+        default=0,
+        verbose_name='عدد المتعلمين المنضمين',
+        help_text='عداد مخزن يُحدّث ذرياً عند الانضمام والمغادرة',
+        editable=False
+    )
     is_public = models.BooleanField(
         default=False,
         verbose_name='عام للجميع',
@@ -87,10 +194,19 @@ class Course(models.Model):
         help_text='هل هذا المسار نشط أم معطل؟'
     )
     
+    objects = CourseQuerySet.as_manager()
+    
+    # العدادات لا تُكتب من save() أبداً
+    untracked_fields = ('projects_count', 'enrolled_count')
+    
     class Meta:
         verbose_name = _('مسار تعليمي')
         verbose_name_plural = _('المسارات التعليمية')
         ordering = ['-created_at']
+        indexes = [
+            # ⭐ فهرس الترقيم بالمؤشر على (created_at, id)
+            models.Index(fields=['is_active', 'created_at', 'id'], name='course_catalog_keyset_idx'),
+        ]
         constraints = [
             models.UniqueConstraint(
                 fields=['title'],
@@ -104,53 +220,66 @@ class Course(models.Model):
         return f"{self.title} - {self.get_level_display()}"
     
     def save(self, *args, **kwargs):
-        # منع التعديل اليدوي لـ projects_count في save
-        if self.pk:
-            from django.db import connection
-            with connection.cursor() as cursor:
-                cursor.execute(
-                    "SELECT projects_count FROM courses_course WHERE id = %s",
-                    [self.pk]
-                )
-                old_count = cursor.fetchone()[0]
-                if self.projects_count != old_count:
-                    # استعادة القيمة القديمة
-                    self.projects_count = old_count
-        
-        if not self.instructor.is_admin:
-            raise ValueError('يجب أن يكون منشئ المسار مشرفاً')
+        # منع التعديل اليدوي لـ projects_count و enrolled_count في save
+        # (عدادات تُحدّث ذرياً وقد تتغير من طلب آخر بعد تحميل هذه النسخة)
+        if not self._state.adding:
+            update_fields = self.get_save_update_fields(kwargs.get('update_fields'))
+            if update_fields is None:
+                update_fields = [
+                    field.attname for field in self._meta.concrete_fields
+                    if not field.primary_key and field.attname not in self.untracked_fields
+                ]
+            kwargs['update_fields'] = update_fields
+        
+        # التحقق من المشرف فقط عند الإنشاء أو تغيير المشرف (يتطلب تحميل المستخدم)
+        if self._state.adding or self.is_field_changed('instructor_id'):
+            if not self.instructor.is_admin:
+                raise ValueError('يجب أن يكون منشئ المسار مشرفاً')
         
         super().save(*args, **kwargs)
+        self._snapshot_loaded_values()
     
     # ⭐⭐ دالة محسنة لتحديث عدد المشاريع
     def update_projects_count(self):
-        """تحديث عدد المشاريع النشطة في المسار - تلقائي"""
-        try:
-            from projects.models import Project
-            
-            # حساب المشاريع النشطة فعليًا
-            actual_count = Project.objects.filter(
-                course=self,
-                is_active=True
-            ).count()
-            
-            # تحديث مباشر في قاعدة البيانات لتجنب recursion
-            if self.projects_count != actual_count:
-                Course.objects.filter(pk=self.pk).update(
-                    projects_count=actual_count,
-                    updated_at=timezone.now()
-                )
-                # تحديث نسخة الـ instance أيضًا
-                self.projects_count = actual_count
-                
-                print(f"✅ تم تحديث عدد المشاريع للمسار '{self.title}' إلى: {actual_count}")
-                return True
-            
-            return False
-            
-        except Exception as e:
-            print(f"❌ خطأ في تحديث عدد المشاريع: {e}")
+        """
+        تحديث عدد المشاريع النشطة في المسار - يُستدعى من مسارات الكتابة فقط
+        (حفظ/حذف مشروع وحذف المسار) داخل نفس المعاملة، لذلك لا تُبتلع الأخطاء هنا
+        داخل defer_course_counters() يُسجل المسار فقط ويُحسب مرة واحدة عند الخروج
+        """
+        from projects.models import Project
+        
+        if is_deferred():
+            recount_projects([self.pk])
             return False
+        
+        # حساب المشاريع النشطة فعليًا
+        actual_count = Project.objects.filter(
+            course_id=self.pk,
+            is_active=True
+        ).count()
+        
+        # تحديث مباشر في قاعدة البيانات لتجنب recursion
+        # المقارنة تتم مع القيمة المخزنة وليس نسخة الذاكرة التي قد تكون قديمة
+        updated = Course.objects.filter(pk=self.pk).exclude(
+            projects_count=actual_count
+        ).update(
+            projects_count=actual_count,
+            updated_at=timezone.now()
+        )
+        # تحديث نسخة الـ instance أيضًا
+        self.projects_count = actual_count
+        
+        if updated:
+            bump_generation()
+            logger.debug('تم تحديث عدد المشاريع للمسار %s إلى: %s', self.pk, actual_count)
+        return bool(updated)
+    
+    def soft_delete(self):
+        """تعطيل المسار مع تحديث عدد المشاريع في نفس المعاملة"""
+        with transaction.atomic():
+            self.is_active = False
+            self.save()
+            self.update_projects_count()
     
     # ⭐⭐ دالة مساعدة للحصول على العدد الحقيقي (للاستخدام في الاستعلامات)
     def get_actual_projects_count(self):
@@ -170,36 +299,78 @@ class Course(models.Model):
             return False
         return self.enrolled_learners.filter(id=student.id).exists()
 
+    # ⭐⭐ العدد يُقرأ من العمود المخزن بدلاً من COUNT على جدول الانضمام
     def get_enrolled_students_count(self):
-        return self.enrolled_learners.count()
+        return self.enrolled_count
     
     def get_enrolled_learners_count(self):
-        return self.enrolled_learners.count()
+        return self.enrolled_count
     
     def add_learner(self, user):
         if user.is_learner:
-            if not self.enrolled_learners.filter(id=user.id).exists():
-                self.enrolled_learners.add(user)
-                user.add_enrolled_course(self.title)
-                
-                print(f"✅ تم إضافة المتعلم '{user.email}' للمسار '{self.title}'")
-                return True
-            else:
-                print(f"⚠️  المتعلم '{user.email}' موجود بالفعل في المسار '{self.title}'")
-                return False
+            with transaction.atomic():
+                if not self.enrolled_learners.filter(id=user.id).exists():
+                    # ⭐ العداد يزيد بعدد الصفوف المُدرجة فعلاً (courses.counters) فلا يُحتسب انضمام مكرر متزامن
+                    self.enrolled_learners.add(user)
+                    self.refresh_from_db(fields=['enrolled_count'])
+                    user.add_enrolled_course(self.title)
+                    
+                    print(f"✅ تم إضافة المتعلم '{user.email}' للمسار '{self.title}'")
+                    return True
+            print(f"⚠️  المتعلم '{user.email}' موجود بالفعل في المسار '{self.title}'")
+            return False
         else:
             print(f"❌ المستخدم '{user.email}' ليس متعلمًا، لا يمكن إضافته للمسار")
             return False
     
     def remove_learner(self, user):
-        if user.is_learner and self.enrolled_learners.filter(id=user.id).exists():
-            self.enrolled_learners.remove(user)
-            user.remove_enrolled_course(self.title)
-            
-            print(f"✅ تم إزالة المتعلم '{user.email}' من المسار '{self.title}'")
-            return True
+        if not user.is_learner:
+            return False
+        with transaction.atomic():
+            if self.enrolled_learners.filter(id=user.id).exists():
+                self.enrolled_learners.remove(user)
+                self.refresh_from_db(fields=['enrolled_count'])
+                user.remove_enrolled_course(self.title)
+                
+                print(f"✅ تم إزالة المتعلم '{user.email}' من المسار '{self.title}'")
+                return True
         return False
     
+    def add_learners_bulk(self, user_ids):
+        """
+        إضافة مجموعة متعلمين دفعة واحدة: إدراج صفوف الانضمام بـ bulk_create
+        ثم زيادة العداد بجملة واحدة. يُعيد مجموعة المعرفات التي أضيفت فعلاً
+        (يجب استدعاؤها داخل transaction.atomic)
+        """
+        Enrollment = Course.enrolled_learners.through
+        user_ids = set(user_ids)
+        if not user_ids:
+            return set()
+        
+        existing = set(
+            Enrollment.objects.filter(
+                course_id=self.pk,
+                customuser_id__in=user_ids
+            ).values_list('customuser_id', flat=True)
+        )
+        new_ids = user_ids - existing
+        
+        # ⭐ قراءة existing تمت داخل معاملة الكتابة (IMMEDIATE) فلا انضمام متزامن بينها وبين الإدراج:
+        # أي تعارض يُرفع IntegrityError بدلاً من تجاهله وانحراف العداد
+        Enrollment.objects.bulk_create(
+            [Enrollment(course_id=self.pk, customuser_id=user_id) for user_id in sorted(new_ids)],
+            batch_size=1000
+        )
+        
+        shift_enrolled_counts({self.pk: len(new_ids)})
+        self.refresh_from_db(fields=['enrolled_count'])
+        
+        if new_ids and getattr(settings, 'ENROLLMENT_TITLES_CACHE', False):
+            for user in CustomUser.objects.filter(pk__in=new_ids):
+                user.refresh_enrolled_courses_cache()
+        
+        return new_ids
+    
     def get_enrolled_learners_list(self):
         return self.enrolled_learners.all()
     
@@ -0,0 +1,134 @@
+# courses/pagination.py
+import base64
+import json
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import ValidationError
+
+
+class KeysetPagination:
+    """
+    ترقيم صفحات بالمؤشر (keyset) على المفتاح المركب (created_at, id)
+    بنفس ترتيب الكتالوج -created_at، بحيث تكلف الصفحة N نفس تكلفة الصفحة الأولى
+    """
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    count_query_param = 'with_count'
+    page_size = 20
+    max_page_size = 100
+    # أكبر قيمة لمفتاح أساسي (BigAutoField)، وما فوقها لا يطابق أي صف
+    max_cursor_id = 2 ** 63 - 1
+
+    def __init__(self, request):
+        self.request = request
+        self.page_size = self.get_page_size()
+        self.position, self.reverse = self.decode_cursor()
+
+    @classmethod
+    def is_requested(cls, request):
+        """تفعيل الوضع فقط عند طلبه صراحةً للحفاظ على شكل الاستجابة القديم"""
+        params = request.query_params
+        return cls.cursor_query_param in params or cls.page_size_query_param in params
+
+    def get_page_size(self):
+        value = self.request.query_params.get(self.page_size_query_param)
+        if value is None:
+            return self.page_size
+        try:
+            size = int(value)
+        except (TypeError, ValueError):
+            raise ValidationError({self.page_size_query_param: _('حجم الصفحة يجب أن يكون رقماً صحيحاً')})
+        if size <= 0:
+            raise ValidationError({self.page_size_query_param: _('حجم الصفحة يجب أن يكون أكبر من صفر')})
+        return min(size, self.max_page_size)
+
+    # === ترميز المؤشر ===
+
+    @staticmethod
+    def encode_cursor(obj, reverse=False):
+        payload = {'c': obj.created_at.isoformat(), 'i': obj.pk}
+        if reverse:
+            payload['r'] = 1
+        raw = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+        return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+    def decode_cursor(self):
+        token = self.request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None, False
+        try:
+            padded = token + '=' * (-len(token) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+            created_at = parse_datetime(payload['c'])
+            pk = int(payload['i'])
+            if created_at is None or not 0 < pk <= self.max_cursor_id:
+                raise ValueError(token)
+        except (TypeError, ValueError, KeyError, UnicodeDecodeError, json.JSONDecodeError):
+            raise ValidationError({self.cursor_query_param: _('المؤشر غير صالح')})
+        return (created_at, pk), bool(payload.get('r'))
+
+    # === تطبيق المؤشر على الاستعلام ===
+
+    def paginate_queryset(self, queryset):
+        """
+        جلب صفحة واحدة فقط (page_size + 1 صف) باستخدام شرط المقارنة على المفتاح
+        بدلاً من OFFSET، مع الاستفادة من فهرس (created_at, id)
+        """
+        if self.position is not None:
+            created_at, pk = self.position
+            if self.reverse:
+                queryset = queryset.filter(
+                    Q(created_at__gt=created_at) | Q(created_at=created_at, pk__gt=pk)
+                )
+            else:
+                queryset = queryset.filter(
+                    Q(created_at__lt=created_at) | Q(created_at=created_at, pk__lt=pk)
+                )
+
+        if self.reverse:
+            queryset = queryset.order_by('created_at', 'id')
+        else:
+            queryset = queryset.order_by('-created_at', '-id')
+
+        rows = list(queryset[:self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+
+        if self.reverse:
+            rows.reverse()
+            self.has_next = self.position is not None
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = self.position is not None
+
+        self.page = rows
+        return rows
+
+    def get_next_cursor(self):
+        if not self.page or not self.has_next:
+            return None
+        return self.encode_cursor(self.page[-1])
+
+    def get_previous_cursor(self):
+        if not self.page or not self.has_previous:
+            return None
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def wants_count(self):
+        value = self.request.query_params.get(self.count_query_param, '')
+        return value.lower() in ('1', 'true', 'yes')
+
+    def get_paginated_payload(self, queryset, data):
+        """بيانات الترقيم المضافة للاستجابة - العدد الكلي اختياري لأنه يتطلب مسحاً كاملاً"""
+        payload = {
+            'next_cursor': self.get_next_cursor(),
+            'previous_cursor': self.get_previous_cursor(),
+            'page_size': self.page_size,
+        }
+        if self.wants_count():
+            payload['count'] = queryset.count()
+        payload['courses'] = data
+        return payload
@@ -0,0 +1,105 @@
+# courses/replicas.py
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS
+from rest_framework.permissions import SAFE_METHODS
+
+# قاعدة القراءة للطلب الحالي (None = الرئيسية) - تُحدد فقط داخل واجهات القراءة
+_read_database = ContextVar('read_database', default=None)
+
+
+def get_replica_aliases():
+    return list(getattr(settings, 'REPLICA_DATABASES', None) or [])
+
+
+def _get_cache():
+    return caches[getattr(settings, 'REPLICA_STICKY_CACHE_ALIAS', 'default')]
+
+
+def sticky_cache_key(user_id):
+    return f'replica:sticky:{user_id}'
+
+
+def mark_user_sticky(user_id):
+    """
+    المستخدم الذي كتب للتو يقرأ من الرئيسية لمدة REPLICA_STICKY_SECONDS
+    (يرى ما كتبه حتى لو لم تصل الكتابة لنسخ القراءة بعد)
+    """
+    timeout = getattr(settings, 'REPLICA_STICKY_SECONDS', 10)
+    if user_id is None or not timeout or not get_replica_aliases():
+        return
+    _get_cache().set(sticky_cache_key(user_id), True, timeout=timeout)
+
+
+def is_user_sticky(user_id):
+    return user_id is not None and _get_cache().get(sticky_cache_key(user_id)) is not None
+
+
+def current_read_database():
+    return _read_database.get()
+
+
+@contextmanager
+def read_from_primary():
+    """قراءات هذا الجزء من الطلب من الرئيسية حتى داخل واجهات القراءة"""
+    token = _read_database.set(None)
+    try:
+        yield
+    finally:
+        _read_database.reset(token)
+
+
+class ReplicaRouter:
+    """
+    القراءات داخل واجهات القراءة (ReplicaReadViewMixin) تذهب لإحدى نسخ REPLICA_DATABASES
+    وكل الكتابات وباقي القراءات للرئيسية (default)
+    """
+
+    def db_for_read(self, model, **hints):
+        return _read_database.get()
+
+    def db_for_write(self, model, **hints):
+        # ⭐ صراحةً: بدون قيمة يستخدم Django قاعدة الكائن المحمّل (قد تكون نسخة قراءة)
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # النسخ مطابقة للرئيسية، فالعلاقة بين كائنات منها مسموحة
+        databases = {DEFAULT_DB_ALIAS, *get_replica_aliases()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # النسخ تُحدّث من الرئيسية فقط (sync_sqlite_replicas)
+        if db in get_replica_aliases():
+            return False
+        return None
+
+
+class ReplicaReadViewMixin:
+    """
+    واجهة قراءة فقط: بعد المصادقة والصلاحيات (على الرئيسية) تُوجه قراءات الطلب
+    لنسخة قراءة عشوائية، إلا إذا كان المستخدم قد كتب خلال REPLICA_STICKY_SECONDS
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        token = _read_database.set(None)
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        finally:
+            _read_database.reset(token)
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if request.method in SAFE_METHODS:
+            _read_database.set(self.get_read_database())
+
+    def get_read_database(self):
+        replicas = get_replica_aliases()
+        if not replicas or is_user_sticky(self.request.user.pk):
+            return None
+        return random.choice(replicas)
@@ -2,6 +2,8 @@
 from datetime import datetime
 from rest_framework import serializers
 from django.utils.translation import gettext_lazy as _
+from .eager import EagerLoadingMixin
+from .fieldsets import SparseFieldsetMixin
 from .models import Course
 
 class CourseCreateSerializer(serializers.ModelSerializer):
@@ -108,13 +110,17 @@ class CourseCreateSerializer(serializers.ModelSerializer):
             **validated_data
         )
         
-        course.enrolled_learners.clear()
+        # ⭐ مسار جديد بدون منضمين (enrolled_count = 0 افتراضياً) - لا حاجة لـ clear()
         
         print(f"✅ تم إنشاء المسار '{course.title}' - المتعلمين المنضمين: 0")
         
         return course
 
-class CourseListSerializer(serializers.ModelSerializer):
+class CourseListSerializer(EagerLoadingMixin, SparseFieldsetMixin, serializers.ModelSerializer):
+    
+    deferrable_fields = {'description': 'description'}
+    # اسم المشرف عند عدم وجود إحصائيات الكتالوج
+    select_related_fields = ('instructor',)
     
     # ⭐⭐ تحسين instructor_name
     instructor_name = serializers.SerializerMethodField()
@@ -135,8 +141,12 @@ class CourseListSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ['projects_count']
     
+    # ⭐⭐ القيم تُقرأ من Course.objects.with_catalog_stats() إن وُجدت لتجنب استعلام لكل صف
     def get_instructor_name(self, obj):
         """⭐ تحسين لمعالجة الأسماء الفارغة"""
+        if hasattr(obj, 'catalog_instructor_name'):
+            return obj.catalog_instructor_name
+        
         first_name = obj.instructor.first_name or ""
         last_name = obj.instructor.last_name or ""
         
@@ -147,14 +157,23 @@ class CourseListSerializer(serializers.ModelSerializer):
             return obj.instructor.email or "مشرف النظام"
     
     def get_enrolled_students_count(self, obj):
+        if hasattr(obj, 'catalog_enrolled_count'):
+            return obj.catalog_enrolled_count
         return obj.get_enrolled_students_count()
     
     def get_actual_projects_count(self, obj):
         """⭐ الحصول على العدد الفعلي للمشاريع (محتسب)"""
+        if hasattr(obj, 'catalog_projects_count'):
+            return obj.catalog_projects_count
         return obj.get_actual_projects_count()
 
-class CourseDetailSerializer(serializers.ModelSerializer):
+class CourseDetailSerializer(EagerLoadingMixin, SparseFieldsetMixin, serializers.ModelSerializer):
     course_projects = serializers.SerializerMethodField()
+    
+    deferrable_fields = {'description': 'description'}
+    select_related_fields = ('instructor',)
+    # ⭐ اختيار حقول المشاريع المتداخلة: ?project_fields= / ?project_omit=
+    projects_fieldset_prefix = 'project_'
 
     # ⭐⭐ تحسين instructor_name
     instructor_name = serializers.SerializerMethodField()
@@ -219,14 +238,22 @@ class CourseDetailSerializer(serializers.ModelSerializer):
         request = self.context.get('request')
         from projects.serializers import ProjectListSerializer
         
-        # جلب المشاريع النشطة في المسار
-        projects = obj.projects.filter(is_active=True).order_by('order')
+        fieldset = ProjectListSerializer.get_requested_fieldset(request, self.projects_fieldset_prefix)
+        
+        # جلب المشاريع النشطة في المسار (بدون الأعمدة غير المطلوبة)
+        projects = ProjectListSerializer.prune_queryset(
+            ProjectListSerializer.setup_eager_loading(
+                obj.projects.filter(is_active=True).order_by('order')
+            ),
+            *fieldset
+        )
         
         # استخدام ProjectListSerializer لتحويل المشاريع
         serializer = ProjectListSerializer(
             projects, 
             many=True,
-            context={'request': request}
+            context={'request': request},
+            fieldset=fieldset
         )
         
         return serializer.data
@@ -423,4 +450,37 @@ class CourseEnrollmentSerializer(serializers.Serializer):
                 _('أنت منضم بالفعل لهذا المسار')
             )
         
-        return data
\ No newline at end of file
+        return data
+
+class CourseBulkEnrollSerializer(serializers.Serializer):
+    """التحقق من طلب الانضمام الجماعي: قائمة معرفات متعلمين أو بريدهم الإلكتروني"""
+    
+    MAX_LEARNERS = 10000
+    # أكبر معرف يقبله عمود INTEGER في SQLite (64 بت)
+    MAX_USER_ID = 2 ** 63 - 1
+    
+    learners = serializers.ListField(
+        child=serializers.CharField(allow_blank=False, max_length=254),
+        allow_empty=False,
+        error_messages={
+            'required': _('قائمة المتعلمين مطلوبة'),
+            'empty': _('قائمة المتعلمين لا يمكن أن تكون فارغة'),
+        }
+    )
+    
+    def validate_learners(self, value):
+        if len(value) > self.MAX_LEARNERS:
+            raise serializers.ValidationError(
+                _('لا يمكن إضافة أكثر من {} متعلم في طلب واحد').format(self.MAX_LEARNERS)
+            )
+        return [self.parse_entry(item.strip()) for item in value]
+    
+    def parse_entry(self, entry):
+        """
+        {'input', 'id', 'email'}: المدخل معرف فقط إذا كان أرقاماً ASCII ضمن نطاق 64 بت
+        ('²' أو رقم أكبر من النطاق يُبحث عنه كبريد فيظهر not_found)
+        البريد بأحرف صغيرة: المطابقة لا تفرق بين الأحرف الكبيرة والصغيرة
+        """
+        if entry.isascii() and entry.isdigit() and int(entry) <= self.MAX_USER_ID:
+            return {'input': entry, 'id': int(entry), 'email': None}
+        return {'input': entry, 'id': None, 'email': entry.lower()}
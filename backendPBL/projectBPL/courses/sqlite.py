@@ -0,0 +1,37 @@
+# courses/sqlite.py
+import re
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.signals import connection_created
+
+_PRAGMA_NAME = re.compile(r'^[a-z_]+$')
+_PRAGMA_VALUE = re.compile(r'^-?[\w.]+$')
+
+
+def get_sqlite_pragmas(settings_dict):
+    """
+    إعدادات PRAGMA لاتصال: SQLITE_PRAGMAS العامة ثم PRAGMAS الخاصة بقاعدة البيانات
+    في DATABASES (مثل query_only لنسخة القراءة)
+    """
+    pragmas = dict(getattr(settings, 'SQLITE_PRAGMAS', None) or {})
+    pragmas.update(settings_dict.get('PRAGMAS') or {})
+    return pragmas
+
+
+def apply_sqlite_pragmas(sender, connection, **kwargs):
+    """تطبيق إعدادات PRAGMA مرة واحدة عند فتح كل اتصال SQLite"""
+    if connection.vendor != 'sqlite':
+        return
+
+    pragmas = get_sqlite_pragmas(connection.settings_dict)
+    for name, value in pragmas.items():
+        value = str(value)
+        if not _PRAGMA_NAME.match(name) or not _PRAGMA_VALUE.match(value):
+            raise ImproperlyConfigured(f'قيمة PRAGMA غير صالحة: {name}={value}')
+        # الاتصال الخام: cursor() الخاص بـ Django يعيد فتح الاتصال داخل هذه الإشارة
+        connection.connection.execute(f'PRAGMA {name} = {value}')
+
+
+def connect_sqlite_tuning():
+    connection_created.connect(apply_sqlite_pragmas, dispatch_uid='courses.sqlite.apply_sqlite_pragmas')
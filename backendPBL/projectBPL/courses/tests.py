@@ -1,3 +1,587 @@
-from django.test import TestCase
+# courses/tests.py
+"""
+اختبارات توجيه القراءة لنسخ القراءة (courses/replicas.py) بملفي SQLite حقيقيين:
+الرئيسية هي قاعدة الاختبار، والنسختان replica1 و replica2 تُنسخان منها بـ sync_sqlite_replicas
+"""
+import base64
+import json
+import os
+import re
+import tempfile
+from datetime import timedelta
+from io import StringIO
 
-# Create your tests here.
+from django.conf import settings
+from django.core.cache import caches
+from django.core.management import call_command
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from account.last_login import last_login_buffer
+from account.models import CustomUser
+from projects.models import Project
+
+from .cache import _bump_now
+from .models import Course
+from .replicas import ReplicaRouter, current_read_database, is_user_sticky
+
+REPLICA_ALIASES = ('replica1', 'replica2')
+
+
+class ReplicaRoutingTests(TransactionTestCase):
+    """
+    TransactionTestCase: النسخ (backup API) يقرأ البيانات المعتمدة فقط
+    النسختان تُسجلان في connections قبل setUpClass فتدخلان في databases = '__all__'
+    """
+    databases = '__all__'
+
+    @classmethod
+    def setUpClass(cls):
+        replica_dir = tempfile.TemporaryDirectory()
+        cls.addClassCleanup(replica_dir.cleanup)
+        replicas = {
+            alias: {
+                'ENGINE': 'django.db.backends.sqlite3',
+                'NAME': os.path.join(replica_dir.name, f'{alias}.sqlite3'),
+                'PRAGMAS': {'query_only': 'ON'},
+                # MIRROR: لا يُفرغها TransactionTestCase بعد كل اختبار (تُستبدل بالنسخ في setUp)
+                'TEST': {'MIRROR': DEFAULT_DB_ALIAS},
+            }
+            for alias in REPLICA_ALIASES
+        }
+        configured = connections.configure_settings({DEFAULT_DB_ALIAS: {}, **replicas})
+        for alias in REPLICA_ALIASES:
+            connections.settings[alias] = configured[alias]
+        cls.addClassCleanup(cls._remove_replicas)
+        cls.enterClassContext(override_settings(REPLICA_DATABASES=list(REPLICA_ALIASES)))
+        super().setUpClass()
+
+    @classmethod
+    def _remove_replicas(cls):
+        for alias in REPLICA_ALIASES:
+            connections[alias].close()
+            del connections[alias]
+            del connections.settings[alias]
+
+    def setUp(self):
+        # بدون كلمات مرور: الطلبات بتوكنات JWT مباشرة
+        self.admin = CustomUser.objects.create(email='admin@example.com', user_type='admin')
+        self.learner = CustomUser.objects.create(email='learner@example.com', user_type='learner')
+        self.other_learner = CustomUser.objects.create(email='other@example.com', user_type='learner')
+        self.course = Course.objects.create(
+            title='مسار النسخ', description='وصف المسار ' * 10, estimated_duration=10,
+            is_public=True, instructor=self.admin
+        )
+        self.project = Project.objects.create(
+            course=self.course, title='مشروع النسخ', description='وصف المشروع ' * 10,
+            estimated_time=5, level='beginner', language='python'
+        )
+        call_command('sync_sqlite_replicas', stdout=StringIO())
+        for alias in ('default', getattr(settings, 'CATALOG_CACHE_ALIAS', 'default')):
+            caches[alias].clear()
+
+    def tearDown(self):
+        last_login_buffer.flush()
+
+    def get_client(self, user):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}')
+        return client
+
+    def request(self, client, method, url):
+        """الاستجابة وعدد الاستعلامات على كل قاعدة"""
+        contexts = {alias: CaptureQueriesContext(connections[alias]) for alias in (DEFAULT_DB_ALIAS, *REPLICA_ALIASES)}
+        for context in contexts.values():
+            context.__enter__()
+        try:
+            response = getattr(client, method)(url, format='json')
+        finally:
+            for context in contexts.values():
+                context.__exit__(None, None, None)
+        return response, {alias: len(context) for alias, context in contexts.items()}
+
+    def replica_queries(self, counts):
+        return sum(counts[alias] for alias in REPLICA_ALIASES)
+
+    def test_read_views_use_a_replica(self):
+        client = self.get_client(self.other_learner)
+        urls = [
+            reverse('courses:list-courses'),
+            reverse('courses:course-detail', kwargs={'id': self.course.id}),
+            reverse('courses:check-enrollment', kwargs={'id': self.course.id}),
+            reverse('projects:list-projects'),
+            reverse('projects:project-detail', kwargs={'pk': self.project.pk}),
+        ]
+        for url in urls:
+            with self.subTest(url=url):
+                response, counts = self.request(client, 'get', url)
+                self.assertEqual(response.status_code, 200)
+                self.assertGreater(self.replica_queries(counts), 0, counts)
+                # المصادقة فقط على الرئيسية (المستخدم من الذاكرة بعد أول طلب)
+                self.assertLessEqual(counts[DEFAULT_DB_ALIAS], 1, counts)
+                self.assertIsNone(current_read_database())
+
+    def test_learner_reads_primary_after_join(self):
+        client = self.get_client(self.learner)
+        check_url = reverse('courses:check-enrollment', kwargs={'id': self.course.id})
+
+        response, counts = self.request(client, 'post', reverse('courses:join-course', kwargs={'id': self.course.id}))
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(self.replica_queries(counts), 0, counts)
+        self.assertTrue(is_user_sticky(self.learner.pk))
+
+        response, counts = self.request(client, 'get', check_url)
+        self.assertTrue(response.data['is_enrolled'])
+        self.assertEqual(response.data['course']['enrolled_learners_count'], 1)
+        self.assertEqual(self.replica_queries(counts), 0, counts)
+
+        # متعلم آخر يقرأ من النسخة التي لم تُحدّث بعد
+        response, counts = self.request(self.get_client(self.other_learner), 'get', check_url)
+        self.assertEqual(response.data['course']['enrolled_learners_count'], 0)
+        self.assertGreater(self.replica_queries(counts), 0, counts)
+
+    def test_catalog_cache_is_filled_from_primary_after_write(self):
+        self.course.title = 'عنوان جديد'
+        self.course.save()
+
+        response, counts = self.request(self.get_client(self.other_learner), 'get', reverse('courses:list-courses'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.replica_queries(counts), 0, counts)
+        self.assertEqual(response.data['courses'][0]['title'], 'عنوان جديد')
+
+    def test_writes_route_to_primary(self):
+        router = ReplicaRouter()
+        replica_course = Course.objects.using('replica1').get(pk=self.course.pk)
+        self.assertEqual(router.db_for_write(Course, instance=replica_course), DEFAULT_DB_ALIAS)
+
+        # حفظ كائن محمّل من النسخة (query_only) يكتب في الرئيسية
+        replica_course.title = 'عنوان من النسخة'
+        replica_course.save()
+        self.assertEqual(Course.objects.using(DEFAULT_DB_ALIAS).get(pk=self.course.pk).title, 'عنوان من النسخة')
+        self.assertEqual(Course.objects.using('replica1').get(pk=self.course.pk).title, 'مسار النسخ')
+        self.assertFalse(router.allow_migrate('replica1', 'courses'))
+
+
+def api_client(user):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}')
+    return client
+
+
+def clear_catalog_caches():
+    for alias in ('default', getattr(settings, 'CATALOG_CACHE_ALIAS', 'default')):
+        caches[alias].clear()
+
+
+def create_course(instructor, index, **fields):
+    values = {
+        'title': f'مسار {index}', 'description': 'وصف المسار ' * 10,
+        'estimated_duration': 10, 'is_public': True, 'instructor': instructor,
+    }
+    values.update(fields)
+    return Course.objects.create(**values)
+
+
+class KeysetPaginationTests(TestCase):
+    """ترقيم الكتالوج بالمؤشر (created_at, id) مع صفوف تتشارك نفس created_at"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = CustomUser.objects.create(email='admin@example.com', user_type='admin')
+        cls.learner = CustomUser.objects.create(email='learner@example.com', user_type='learner')
+        courses = [create_course(cls.admin, index) for index in range(7)]
+        # خمسة مسارات بنفس created_at: الترتيب بينها يعتمد على id فقط
+        shared = timezone.now() - timedelta(days=1)
+        Course.objects.filter(pk__in=[course.pk for course in courses[1:6]]).update(created_at=shared)
+        cls.expected_ids = list(
+            Course.objects.filter(is_active=True, is_public=True)
+            .order_by('-created_at', '-id').values_list('id', flat=True)
+        )
+
+    def setUp(self):
+        clear_catalog_caches()
+        self.client = api_client(self.learner)
+        self.url = reverse('courses:list-courses')
+
+    def tearDown(self):
+        last_login_buffer.flush()
+
+    def get_page(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.data
+
+    def test_cursor_round_trip_with_shared_created_at(self):
+        pages = []
+        page = self.get_page(page_size=2)
+        pages.append(page)
+        while page['next_cursor']:
+            page = self.get_page(page_size=2, cursor=page['next_cursor'])
+            pages.append(page)
+
+        forward_ids = [course['id'] for page in pages for course in page['courses']]
+        self.assertEqual(forward_ids, self.expected_ids)
+        self.assertIsNone(pages[0]['previous_cursor'])
+
+        # الرجوع من الصفحة الأخيرة يعيد نفس الصفحات بالترتيب العكسي
+        backward = []
+        page = pages[-1]
+        while page['previous_cursor']:
+            page = self.get_page(page_size=2, cursor=page['previous_cursor'])
+            backward.append([course['id'] for course in page['courses']])
+        self.assertEqual(backward, [[course['id'] for course in page['courses']] for page in reversed(pages[:-1])])
+
+    def test_invalid_cursor_returns_400(self):
+        def encode(payload):
+            return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip('=')
+
+        cursors = [
+            'not-a-cursor!!',
+            'مؤشر',
+            encode([]),
+            encode({'c': 'yesterday', 'i': 1}),
+            encode({'c': timezone.now().isoformat()}),
+            encode({'c': timezone.now().isoformat(), 'i': 'x'}),
+            encode({'c': timezone.now().isoformat(), 'i': 10 ** 30}),
+            encode({'c': timezone.now().isoformat(), 'i': -1}),
+        ]
+        for cursor in cursors:
+            with self.subTest(cursor=cursor):
+                response = self.client.get(self.url, {'cursor': cursor})
+                self.assertEqual(response.status_code, 400, response.content)
+                self.assertIn('cursor', response.data)
+
+    def test_with_count(self):
+        page = self.get_page(page_size=3, with_count='true')
+        self.assertEqual(page['count'], len(self.expected_ids))
+        self.assertEqual(len(page['courses']), 3)
+        self.assertNotIn('count', self.get_page(page_size=3))
+
+    def test_unpaginated_response_unchanged(self):
+        data = self.get_page()
+        self.assertEqual(set(data), {'message', 'count', 'courses'})
+        self.assertEqual(data['count'], len(self.expected_ids))
+        # نفس الترتيب القديم -created_at فقط (بدون id لكسر التعادل)
+        self.assertCountEqual([course['id'] for course in data['courses']], self.expected_ids)
+        created = [course['created_at'] for course in data['courses']]
+        self.assertEqual(created, sorted(created, reverse=True))
+        self.assertNotIn('next_cursor', data)
+
+
+class EnrollmentCounterTests(TestCase):
+    """enrolled_count يتغير بعدد صفوف الانضمام التي تغيرت فعلاً، من طرف المسار أو المتعلم"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = CustomUser.objects.create(email='admin@example.com', user_type='admin')
+        cls.learners = [
+            CustomUser.objects.create(email=f'learner{index}@example.com', user_type='learner')
+            for index in range(3)
+        ]
+        cls.courses = [create_course(cls.admin, index) for index in range(2)]
+
+    def counts(self):
+        return list(Course.objects.filter(pk__in=[course.pk for course in self.courses])
+                    .order_by('pk').values_list('enrolled_count', flat=True))
+
+    def test_forward_and_reverse_changes(self):
+        course, other = self.courses
+        course.enrolled_learners.add(*self.learners)
+        self.assertEqual(self.counts(), [3, 0])
+
+        # إضافة مكررة وإزالة غير منضم لا تغيران العداد
+        course.enrolled_learners.add(self.learners[0])
+        other.enrolled_learners.remove(self.learners[0])
+        self.assertEqual(self.counts(), [3, 0])
+
+        # من طرف المتعلم: كل مسار ±1
+        self.learners[0].enrolled_courses_as_learner.add(other)
+        self.assertEqual(self.counts(), [3, 1])
+        self.learners[1].enrolled_courses_as_learner.remove(course, other)
+        self.assertEqual(self.counts(), [2, 1])
+
+        course.enrolled_learners.remove(self.learners[1], self.learners[2])
+        self.assertEqual(self.counts(), [1, 1])
+
+        self.learners[0].enrolled_courses_as_learner.clear()
+        self.assertEqual(self.counts(), [0, 0])
+
+        other.enrolled_learners.add(self.learners[2])
+        other.enrolled_learners.clear()
+        self.assertEqual(self.counts(), [0, 0])
+
+    def test_counter_changes_keep_updated_at_and_catalog_generation(self):
+        course = self.courses[0]
+        updated_at = course.updated_at
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            course.add_learner(self.learners[0])
+            course.remove_learner(self.learners[0])
+        self.assertEqual(callbacks, [])
+        course.refresh_from_db()
+        self.assertEqual(course.updated_at, updated_at)
+        self.assertEqual(course.enrolled_count, 0)
+
+
+class BulkEnrollTests(TestCase):
+    """الانضمام الجماعي: مطابقة البريد بدون تفرقة بين الأحرف الكبيرة والصغيرة"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = CustomUser.objects.create(email='admin@example.com', user_type='admin')
+        cls.bob = CustomUser.objects.create(email='Bob@Example.com', user_type='learner')
+        cls.alice = CustomUser.objects.create(email='alice@example.com', user_type='learner')
+        cls.course = create_course(cls.admin, 1)
+
+    def setUp(self):
+        self.client = api_client(self.admin)
+        self.url = reverse('courses:bulk-enroll', kwargs={'id': self.course.id})
+
+    def tearDown(self):
+        last_login_buffer.flush()
+
+    def enroll(self, learners):
+        response = self.client.post(self.url, {'learners': learners}, format='json')
+        self.assertEqual(response.status_code, 200, response.content)
+        return {row['input']: row for row in response.data['results']}, response.data
+
+    def test_email_match_ignores_case(self):
+        results, data = self.enroll(['bob@example.com', 'ALICE@example.com', 'Admin@Example.com', 'nobody@example.com'])
+
+        self.assertEqual(results['bob@example.com'], {'input': 'bob@example.com', 'user_id': self.bob.id, 'status': 'enrolled'})
+        self.assertEqual(results['ALICE@example.com']['user_id'], self.alice.id)
+        self.assertEqual(results['ALICE@example.com']['status'], 'enrolled')
+        self.assertEqual(results['Admin@Example.com']['status'], 'not_learner')
+        self.assertEqual(results['nobody@example.com']['status'], 'not_found')
+        self.assertEqual(data['course']['enrolled_students_count'], 2)
+
+    def test_same_learner_by_id_and_email_is_duplicate(self):
+        results, _ = self.enroll([str(self.bob.id), 'BOB@example.com'])
+        self.assertEqual(results[str(self.bob.id)]['status'], 'enrolled')
+        self.assertEqual(results['BOB@example.com']['status'], 'duplicate')
+
+        results, data = self.enroll(['bob@EXAMPLE.com'])
+        self.assertEqual(results['bob@EXAMPLE.com']['status'], 'already_enrolled')
+        self.assertEqual(data['course']['enrolled_students_count'], 1)
+
+
+class DirtyFieldsSaveTests(TestCase):
+    """save() على نسخة محمّلة يكتب الأعمدة المتغيرة فقط (courses/tracking.py)"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = CustomUser.objects.create(email='admin@example.com', user_type='admin')
+        cls.course = create_course(cls.admin, 1)
+
+    def saved_columns(self, instance, **kwargs):
+        """أعمدة SET في جمل UPDATE التي نفذها save()"""
+        with CaptureQueriesContext(connections[DEFAULT_DB_ALIAS]) as queries:
+            instance.save(**kwargs)
+        updates = [query['sql'] for query in queries if query['sql'].startswith('UPDATE')]
+        return [
+            set(re.findall(r'"(\w+)" = ', sql.split(' SET ', 1)[1].split(' WHERE ', 1)[0]))
+            for sql in updates
+        ]
+
+    def test_one_field_change(self):
+        course = Course.objects.get(pk=self.course.pk)
+        course.title = 'عنوان جديد'
+        self.assertEqual(self.saved_columns(course), [{'title', 'updated_at'}])
+
+        # بعد الحفظ تصبح القيمة الجديدة هي المرجع
+        course.level = 'advanced'
+        self.assertEqual(self.saved_columns(course), [{'level', 'updated_at'}])
+        self.assertEqual(Course.objects.get(pk=course.pk).title, 'عنوان جديد')
+
+    def test_no_change_save_touches_updated_at(self):
+        course = Course.objects.get(pk=self.course.pk)
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.assertEqual(self.saved_columns(course), [{'updated_at'}])
+        # كتابة فعلية: post_save يُبطل الكتالوج
+        self.assertIn(_bump_now, callbacks)
+        self.assertGreater(Course.objects.get(pk=course.pk).updated_at, self.course.updated_at)
+
+    def test_untracked_counters_are_never_written(self):
+        course = Course.objects.get(pk=self.course.pk)
+        # طلب آخر غيّر العدادات بعد تحميل هذه النسخة
+        Course.objects.filter(pk=course.pk).update(enrolled_count=5, projects_count=3)
+        course.enrolled_count = 99
+        course.projects_count = 99
+        course.title = 'عنوان آخر'
+
+        self.assertEqual(self.saved_columns(course), [{'title', 'updated_at'}])
+        self.assertEqual(self.saved_columns(course, update_fields=['enrolled_count', 'description']), [{'description'}])
+
+        stale = Course.objects.get(pk=course.pk)
+        del stale._loaded_values  # حالة غير متتبعة: حفظ بكل الأعمدة عدا العدادات
+        columns = self.saved_columns(stale)[0]
+        self.assertIn('title', columns)
+        self.assertFalse(columns & {'enrolled_count', 'projects_count'})
+        self.assertEqual(
+            Course.objects.filter(pk=course.pk).values_list('enrolled_count', 'projects_count').get(),
+            (5, 3)
+        )
+
+
+class CatalogCacheTests(TestCase):
+    """النسخ المخزنة من الكتالوج (courses/cache.py): الإبطال مع الكتابة وفصل الجمهور"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = CustomUser.objects.create(email='admin@example.com', user_type='admin', first_name='أحمد')
+        cls.learner = CustomUser.objects.create(email='learner@example.com', user_type='learner')
+        cls.course = create_course(cls.admin, 1)
+        cls.private_course = create_course(cls.admin, 2, is_public=False)
+        cls.project = Project.objects.create(
+            course=cls.course, title='مشروع الكتالوج', description='وصف المشروع ' * 10,
+            estimated_time=5, level='beginner', language='python'
+        )
+
+    def setUp(self):
+        clear_catalog_caches()
+
+    def tearDown(self):
+        last_login_buffer.flush()
+
+    def fetch(self, user, url):
+        """البايتات المعادة وعدد الاستعلامات على جداول المسارات والمشاريع"""
+        with CaptureQueriesContext(connections[DEFAULT_DB_ALIAS]) as queries:
+            response = api_client(user).get(url)
+        self.assertEqual(response.status_code, 200, response.content)
+        catalog_queries = [
+            query for query in queries
+            if 'courses_course' in query['sql'] or 'projects_project' in query['sql']
+        ]
+        return response.content, len(catalog_queries)
+
+    def assertChangesAfter(self, write, urls=None):
+        urls = urls or [
+            reverse('courses:list-courses'),
+            reverse('projects:list-projects'),
+            reverse('projects:course-projects', kwargs={'course_id': self.course.id}),
+        ]
+        before = {}
+        for url in urls:
+            before[url], _ = self.fetch(self.learner, url)
+            cached, queries = self.fetch(self.learner, url)
+            self.assertEqual((cached, queries), (before[url], 0), url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            write()
+
+        for url in urls:
+            after, queries = self.fetch(self.learner, url)
+            self.assertGreater(queries, 0, url)
+            self.assertNotEqual(after, before[url], url)
+
+    def test_course_edit_invalidates(self):
+        def edit():
+            self.course.title = 'عنوان معدل'
+            self.course.save()
+        self.assertChangesAfter(edit)
+
+    def test_project_create_and_delete_invalidate(self):
+        self.assertChangesAfter(lambda: Project.objects.create(
+            course=self.course, title='مشروع جديد', description='وصف المشروع ' * 10,
+            estimated_time=3, level='beginner', language='go'
+        ))
+        self.assertChangesAfter(lambda: Project.objects.get(title='مشروع جديد').delete())
+
+    def test_admin_save_invalidates(self):
+        # اسم المشرف يظهر في الكتالوج
+        def rename():
+            self.admin.first_name = 'خالد'
+            self.admin.save()
+        self.assertChangesAfter(rename, [reverse('courses:list-courses')])
+
+    def test_admin_and_learner_never_share_entries(self):
+        url = reverse('courses:list-courses')
+        for first, second in ((self.learner, self.admin), (self.admin, self.learner)):
+            with self.subTest(first=first.user_type):
+                clear_catalog_caches()
+                self.fetch(first, url)
+                content, queries = self.fetch(second, url)
+                self.assertGreater(queries, 0)
+                ids = {course['id'] for course in json.loads(content)['courses']}
+                if second.is_admin:
+                    self.assertEqual(ids, {self.course.id, self.private_course.id})
+                else:
+                    self.assertEqual(ids, {self.course.id})
+
+
+class ConditionalGetTests(TestCase):
+    """ETag لتفاصيل المسار (courses/conditional.py): 304، تغير الـ ETag مع الكتابة، وعدم كشف المسارات الخاصة"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = CustomUser.objects.create(email='admin@example.com', user_type='admin')
+        cls.learner = CustomUser.objects.create(email='learner@example.com', user_type='learner')
+        cls.other_learner = CustomUser.objects.create(email='other@example.com', user_type='learner')
+        cls.course = create_course(cls.admin, 1)
+        cls.private_course = create_course(cls.admin, 2, is_public=False)
+        cls.project = Project.objects.create(
+            course=cls.course, title='مشروع الحالة', description='وصف المشروع ' * 10,
+            estimated_time=5, level='beginner', language='python'
+        )
+
+    def setUp(self):
+        clear_catalog_caches()
+
+    def tearDown(self):
+        last_login_buffer.flush()
+
+    def detail_url(self, course):
+        return reverse('courses:course-detail', kwargs={'id': course.id})
+
+    def etag(self, user, course=None):
+        response = api_client(user).get(self.detail_url(course or self.course))
+        self.assertEqual(response.status_code, 200, response.content)
+        return response['ETag']
+
+    def test_matching_etag_returns_304(self):
+        etag = self.etag(self.learner)
+        client = api_client(self.learner)
+
+        response = client.get(self.detail_url(self.course), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+        response = client.get(self.detail_url(self.course), HTTP_IF_NONE_MATCH='W/"other"')
+        self.assertEqual(response.status_code, 200)
+
+    def test_writes_change_etag(self):
+        def enroll():
+            self.course.add_learner(self.other_learner)
+
+        def edit_project():
+            self.project.title = 'عنوان مشروع معدل'
+            self.project.save()
+
+        def toggle_public():
+            self.course.is_public = not self.course.is_public
+            self.course.save()
+
+        for write in (enroll, edit_project, toggle_public):
+            with self.subTest(write=write.__name__):
+                before = self.etag(self.admin)
+                with self.captureOnCommitCallbacks(execute=True):
+                    write()
+                self.assertNotEqual(self.etag(self.admin), before)
+
+    def test_private_course_is_404_for_learner_with_or_without_etag(self):
+        admin_etag = self.etag(self.admin, self.private_course)
+        client = api_client(self.learner)
+        url = self.detail_url(self.private_course)
+
+        plain = client.get(url)
+        self.assertEqual(plain.status_code, 404)
+        for etag in (admin_etag, '*'):
+            with self.subTest(etag=etag):
+                response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 404)
+                self.assertEqual(response.content, plain.content)
+                self.assertFalse(response.has_header('ETag'))
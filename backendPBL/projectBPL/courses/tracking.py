@@ -0,0 +1,89 @@
+# courses/tracking.py
+
+
+class DirtyFieldsMixin:
+    """
+    تتبع قيم الحقول كما حُمّلت من قاعدة البيانات، بحيث يكتب save() الأعمدة المتغيرة فقط
+    (UPDATE ضيق عبر update_fields) بدلاً من إعادة كتابة كل الأعمدة
+
+    - untracked_fields: حقول لا يكتبها save() أبداً عند التحديث (عدادات تُدار بتحديثات ذرية)
+    - النسخ التي لم تُحمّل من قاعدة البيانات تُحفظ بالطريقة العادية
+    """
+    untracked_fields = ()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._snapshot_loaded_values()
+        return instance
+
+    def _tracked_attnames(self):
+        return [
+            field.attname for field in self._meta.concrete_fields
+            if not field.primary_key
+        ]
+
+    def _snapshot_loaded_values(self, attnames=None):
+        """حفظ القيم الحالية كقيم مرجعية (الحقول المؤجلة غير المحملة تُتجاهل)"""
+        if attnames is None:
+            self._loaded_values = {}
+            attnames = self._tracked_attnames()
+        for attname in attnames:
+            if attname in self.__dict__:
+                self._loaded_values[attname] = self.__dict__[attname]
+
+    def has_tracked_state(self):
+        return not self._state.adding and hasattr(self, '_loaded_values')
+
+    def get_loaded_value(self, attname, default=None):
+        """القيمة كما حُمّلت من قاعدة البيانات (أو آخر حفظ)"""
+        return getattr(self, '_loaded_values', {}).get(attname, default)
+
+    def is_field_changed(self, attname):
+        if not self.has_tracked_state():
+            return True
+        if attname not in self.__dict__:
+            return False
+        if attname not in self._loaded_values:
+            return True
+        return self.__dict__[attname] != self._loaded_values[attname]
+
+    def get_dirty_fields(self):
+        """أسماء الأعمدة (attname) التي تغيرت منذ التحميل، أو None إذا لم تكن الحالة متتبعة"""
+        if not self.has_tracked_state():
+            return None
+        return [
+            attname for attname in self._tracked_attnames()
+            if attname not in self.untracked_fields and self.is_field_changed(attname)
+        ]
+
+    def get_save_update_fields(self, update_fields=None):
+        """
+        تحديد update_fields لعملية الحفظ:
+        - إذا مررها المستدعي تُحترم مع استبعاد الحقول غير المتتبعة
+        - وإلا تُستخدم الحقول المتغيرة فقط مع حقول auto_now (updated_at)
+        - بدون تغييرات: حقول auto_now وحدها، فيبقى save() كتابة فعلية (post_save وتحديث updated_at)
+          بدلاً من update_fields=[] الذي يتخطى الحفظ بصمت
+        - None تعني حفظاً كاملاً (نسخة جديدة أو غير متتبعة، أو بدون تغييرات ولا حقول auto_now)
+        """
+        if update_fields is not None:
+            return [name for name in update_fields if name not in self.untracked_fields]
+
+        dirty = self.get_dirty_fields()
+        if dirty is None:
+            return None
+        auto_now = [
+            field.attname for field in self._meta.concrete_fields
+            if getattr(field, 'auto_now', False) and field.attname not in dirty
+        ]
+        if not dirty and not auto_now:
+            return None
+        return dirty + auto_now
+
+    def refresh_from_db(self, using=None, fields=None, from_queryset=None):
+        super().refresh_from_db(using=using, fields=fields, from_queryset=from_queryset)
+        if hasattr(self, '_loaded_values'):
+            attnames = None
+            if fields is not None:
+                attnames = [self._meta.get_field(name).attname for name in fields]
+            self._snapshot_loaded_values(attnames)
@@ -9,8 +9,11 @@ from .views import (
     ConfirmDeleteCourseView,
     CourseDetailView,
     JoinCourseView,
+    BulkEnrollCourseView,
     UserEnrolledCoursesView,
-    CheckEnrollmentView
+    CheckEnrollmentView,
+    CoursesExportView,
+    EnrollmentsExportView,
 )
 
 app_name = 'courses'
@@ -24,6 +27,9 @@ urlpatterns = [
     path('<int:id>/delete/', DeleteCourseView.as_view(), name='delete-course'),
     path('<int:id>/details/', CourseDetailView.as_view(), name='course-detail'),
     path('<int:id>/join/', JoinCourseView.as_view(), name='join-course'),
+    path('<int:id>/bulk-enroll/', BulkEnrollCourseView.as_view(), name='bulk-enroll'),
     path('my-courses/', UserEnrolledCoursesView.as_view(), name='my-courses'),
     path('<int:id>/check-enrollment/', CheckEnrollmentView.as_view(), name='check-enrollment'),
+    path('export/', CoursesExportView.as_view(), name='export-courses'),
+    path('enrollments/export/', EnrollmentsExportView.as_view(), name='export-enrollments'),
 ]
\ No newline at end of file
@@ -4,13 +4,21 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.exceptions import PermissionDenied, ValidationError
 from django.utils.translation import gettext_lazy as _
-from django.db import transaction
+from django.db import models, transaction
+from django.db.models.functions import Lower
 from .models import Course
+from .cache import CatalogCacheMixin
+from .eager import EagerLoadingViewMixin
+from .exports import StreamingExportView
+from .conditional import ConditionalGetMixin, course_detail_state, queryset_state
+from .pagination import KeysetPagination
+from .replicas import ReplicaReadViewMixin
 from .serializers import (
     CourseCreateSerializer, CourseListSerializer, 
     CourseUpdateSerializer, CourseDetailSerializer,
-    CourseEnrollmentSerializer
+    CourseEnrollmentSerializer, CourseBulkEnrollSerializer
 )
+from account.models import CustomUser
 from django.db import IntegrityError
 
 class IsAdminUser(permissions.BasePermission):
@@ -158,19 +166,19 @@ class UpdateCourseView(generics.UpdateAPIView):
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 # ======= RetrieveCourseView =============
-class RetrieveCourseView(generics.RetrieveAPIView):
+class RetrieveCourseView(EagerLoadingViewMixin, generics.RetrieveAPIView):
     
     serializer_class = CourseListSerializer
     permission_classes = [permissions.IsAuthenticated, IsAdminUser]
     lookup_field = 'id'
     
-    def get_queryset(self):
-        return Course.objects.filter(is_active=True)
+    def get_base_queryset(self):
+        return Course.objects.filter(is_active=True).with_catalog_stats()
     
     def get_object(self):
         id = self.kwargs.get('id')
         try:
-            return Course.objects.get(id=id, is_active=True)
+            return self.get_queryset().get(id=id)
         except Course.DoesNotExist:
             raise ValidationError(_('المسار المطلوب غير موجود'))
     
@@ -213,8 +221,7 @@ class DeleteCourseView(generics.DestroyAPIView):
         try:
             course = self.get_object()
             
-            course.is_active = False
-            course.save()
+            course.soft_delete()
             
             return Response({
                 'success': True,
@@ -291,22 +298,41 @@ class ConfirmDeleteCourseView(APIView):
             }, status=status.HTTP_404_NOT_FOUND)
 
 # ======= ListCoursesView =============
-class ListCoursesView(generics.ListAPIView):
+class ListCoursesView(ReplicaReadViewMixin, CatalogCacheMixin, ConditionalGetMixin, EagerLoadingViewMixin, generics.ListAPIView):
     
+    catalog_cache_name = 'courses-list'
     serializer_class = CourseListSerializer
     permission_classes = [permissions.IsAuthenticated]
     
-    def get_queryset(self):
+    def get_visible_courses(self):
         user = self.request.user
         
         if user.is_admin:
-            return Course.objects.filter(is_active=True).order_by('-created_at')
-        else:
-            return Course.objects.filter(is_active=True, is_public=True).order_by('-created_at')
+            return Course.objects.filter(is_active=True)
+        return Course.objects.filter(is_active=True, is_public=True)
+    
+    def get_base_queryset(self):
+        # ⭐ إحصائيات الكتالوج في نفس الاستعلام بدلاً من استعلامات لكل مسار
+        return self.get_visible_courses().with_catalog_stats().order_by('-created_at')
+    
+    def get_condition_state(self, request, *args, **kwargs):
+        # ⭐ فحص مسبق: آخر تعديل وعدد المسارات الظاهرة (تغيرات المشاريع تحدّث updated_at)
+        # ومجموع المنضمين لأن الانضمام يغير enrolled_count فقط
+        return queryset_state(self.get_visible_courses(), enrolled=models.Sum('enrolled_count'))
     
     def list(self, request, *args, **kwargs):
         queryset = self.get_queryset()
         
+        # ⭐ وضع الترقيم بالمؤشر (?cursor= أو ?page_size=) - تكلفة ثابتة لكل صفحة
+        if KeysetPagination.is_requested(request):
+            paginator = KeysetPagination(request)
+            page = paginator.paginate_queryset(queryset)
+            serializer = self.get_serializer(page, many=True)
+            
+            response_data = {'message': _('تم جلب المسارات بنجاح')}
+            response_data.update(paginator.get_paginated_payload(queryset, serializer.data))
+            return Response(response_data)
+        
         if not queryset.exists():
             return Response({
                 'message': _('لا توجد مسارات متاحة'),
@@ -322,13 +348,22 @@ class ListCoursesView(generics.ListAPIView):
         })
 
 # ======= CourseDetailView =============
-class CourseDetailView(generics.RetrieveAPIView):
+class CourseDetailView(ReplicaReadViewMixin, ConditionalGetMixin, EagerLoadingViewMixin, generics.RetrieveAPIView):
     
     serializer_class = CourseDetailSerializer
     permission_classes = [permissions.IsAuthenticated]
     lookup_field = 'id'
     
-    def get_queryset(self):
+    def get_condition_state(self, request, *args, **kwargs):
+        # ⭐ استعلام واحد بدلاً من بناء قائمة المشاريع المتداخلة
+        # بنفس قيود الظهور: مسار غير ظاهر لا يُنتج حالة فيُعاد 404 مع أو بدون If-None-Match
+        return course_detail_state(
+            self.get_base_queryset(),
+            self.kwargs.get('id'),
+            request.user
+        )
+    
+    def get_base_queryset(self):
         user = self.request.user
         
         if user.is_admin:
@@ -339,7 +374,8 @@ class CourseDetailView(generics.RetrieveAPIView):
     def get_object(self):
         id = self.kwargs.get('id')
         try:
-            course = Course.objects.get(id=id, is_active=True)
+            # المسارات الخاصة تظهر للمشرفين فقط
+            course = self.prepare_queryset(self.get_base_queryset()).get(id=id)
             return course
             
         except Course.DoesNotExist:
@@ -350,11 +386,7 @@ class CourseDetailView(generics.RetrieveAPIView):
             course = self.get_object()
             serializer = self.get_serializer(course)
             
-            # ⭐ تحديث عدد المشاريع قبل الإرجاع
-            course.update_projects_count()
-            
-            # ⭐ استخدام العدد المحتسب في additional_info
-            actual_projects_count = course.get_actual_projects_count()
+            # ⭐ قراءة فقط: projects_count يُحدّث في مسارات الكتابة (Project.save/delete وحذف المسار)
             
             # additional_info = {
             #     'available_levels': dict(Course.LEVEL_CHOICES),
@@ -377,7 +409,7 @@ class CourseDetailView(generics.RetrieveAPIView):
                 'success': False,
                 'message': _('خطأ في جلب بيانات المسار'),
                 'error': str(e)
-            }, status=status.HTTP_400_BAD_REQUEST)
+            }, status=status.HTTP_404_NOT_FOUND)
 
 # باقي الـ Views كما هي...
 class JoinCourseView(APIView):
@@ -457,17 +489,106 @@ class JoinCourseView(APIView):
                 'error': str(e)
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-class UserEnrolledCoursesView(generics.ListAPIView):
+# ======= BulkEnrollCourseView =============
+class BulkEnrollCourseView(APIView):
+    """
+    إضافة دفعة من المتعلمين (معرفات أو بريد إلكتروني) لمسار في طلب واحد
+    التحقق باستعلام IN واحد، الإدراج بـ bulk_create، وتحديث العداد مرة واحدة
+    """
+    
+    permission_classes = [permissions.IsAuthenticated, IsAdminUser]
+    
+    @transaction.atomic
+    def post(self, request, id):
+        try:
+            course = Course.objects.get(id=id, is_active=True)
+        except Course.DoesNotExist:
+            return Response({
+                'success': False,
+                'message': _('المسار غير موجود'),
+                'error': _('المسار المطلوب غير موجود')
+            }, status=status.HTTP_404_NOT_FOUND)
+        
+        serializer = CourseBulkEnrollSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response({
+                'success': False,
+                'message': _('بيانات غير صالحة'),
+                'errors': serializer.errors
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        entries = serializer.validated_data['learners']
+        ids = {entry['id'] for entry in entries if entry['id'] is not None}
+        emails = {entry['email'] for entry in entries if entry['email'] is not None}
+        
+        # ⭐ استعلام واحد للتحقق من كل المدخلات (البريد بدون تفرقة بين الأحرف الكبيرة والصغيرة)
+        users = CustomUser.objects.annotate(
+            email_lower=Lower('email')
+        ).filter(
+            models.Q(id__in=ids) | models.Q(email_lower__in=emails)
+        ).order_by('id').values('id', 'email_lower', 'user_type')
+        by_id = {}
+        by_email = {}
+        for user in users:
+            by_id[user['id']] = user
+            # عند تطابق أكثر من حساب بعد التحويل يُختار الأقدم
+            by_email.setdefault(user['email_lower'], user)
+        
+        resolved = []
+        results = []
+        seen = set()
+        for parsed in entries:
+            entry = parsed['input']
+            if parsed['id'] is not None:
+                user = by_id.get(parsed['id'])
+            else:
+                user = by_email.get(parsed['email'])
+            if user is None:
+                results.append({'input': entry, 'status': 'not_found'})
+                continue
+            if user['id'] in seen:
+                results.append({'input': entry, 'user_id': user['id'], 'status': 'duplicate'})
+                continue
+            seen.add(user['id'])
+            if user['user_type'] != 'learner':
+                results.append({'input': entry, 'user_id': user['id'], 'status': 'not_learner'})
+                continue
+            resolved.append(user['id'])
+            results.append({'input': entry, 'user_id': user['id'], 'status': None})
+        
+        added = course.add_learners_bulk(resolved)
+        
+        for row in results:
+            if row['status'] is None:
+                row['status'] = 'enrolled' if row['user_id'] in added else 'already_enrolled'
+        
+        summary = {}
+        for row in results:
+            summary[row['status']] = summary.get(row['status'], 0) + 1
+        
+        return Response({
+            'success': True,
+            'message': _('تمت معالجة طلب الانضمام الجماعي'),
+            'course': {
+                'id': course.id,
+                'title': course.title,
+                'enrolled_students_count': course.enrolled_count,
+            },
+            'summary': summary,
+            'results': results,
+        }, status=status.HTTP_200_OK)
+
+class UserEnrolledCoursesView(EagerLoadingViewMixin, generics.ListAPIView):
     
     serializer_class = CourseListSerializer
     permission_classes = [permissions.IsAuthenticated, IsLearnerUser]
     
-    def get_queryset(self):
+    def get_base_queryset(self):
         user = self.request.user
         return Course.objects.filter(
             enrolled_learners=user,
             is_active=True
-        ).order_by('-created_at')
+        ).with_catalog_stats().order_by('-created_at')
     
     def list(self, request, *args, **kwargs):
         queryset = self.get_queryset()
@@ -486,7 +607,7 @@ class UserEnrolledCoursesView(generics.ListAPIView):
             'courses': serializer.data
         })
 
-class CheckEnrollmentView(APIView):
+class CheckEnrollmentView(ReplicaReadViewMixin, APIView):
     
     permission_classes = [permissions.IsAuthenticated, IsLearnerUser]
     
@@ -511,4 +632,42 @@ class CheckEnrollmentView(APIView):
             return Response({
                 'success': False,
                 'message': _('المسار غير موجود')
-            }, status=status.HTTP_404_NOT_FOUND)
\ No newline at end of file
+            }, status=status.HTTP_404_NOT_FOUND)
+
+
+# ======= التصدير (للمشرفين) =============
+class CoursesExportView(StreamingExportView):
+    """تصدير كل المسارات (بما فيها المعطلة) كـ NDJSON أو CSV"""
+    
+    export_name = 'courses'
+    export_columns = (
+        'id', 'title', 'description', 'level', 'category', 'estimated_duration',
+        'projects_count', 'enrolled_count', 'is_public', 'is_active',
+        'instructor_id', 'instructor_email', 'created_at', 'updated_at',
+    )
+    
+    def get_export_queryset(self):
+        return Course.objects.annotate(
+            instructor_email=models.F('instructor__email')
+        ).order_by('id')
+
+
+class EnrollmentsExportView(StreamingExportView):
+    """تصدير صفوف جدول الانضمام (?course_id= لمسار واحد)"""
+    
+    export_name = 'enrollments'
+    export_columns = ('id', 'course_id', 'course_title', 'learner_id', 'learner_email')
+    
+    def get_export_queryset(self):
+        queryset = Course.enrolled_learners.through.objects.annotate(
+            course_title=models.F('course__title'),
+            learner_id=models.F('customuser_id'),
+            learner_email=models.F('customuser__email'),
+        ).order_by('id')
+        
+        course_id = self.request.query_params.get('course_id')
+        if course_id:
+            if not course_id.isdigit():
+                raise ValidationError({'course_id': _('معرف المسار يجب أن يكون رقماً صحيحاً')})
+            queryset = queryset.filter(course_id=course_id)
+        return queryset
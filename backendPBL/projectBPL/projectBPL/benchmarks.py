@@ -0,0 +1,260 @@
+# projectBPL/benchmarks.py
+"""
+قياس زمن الاستجابة لمسارات API من سجل الميزانيات (query_budgets.QUERY_BUDGETS)
+الأمر نفسه bench_endpoints يُسجل في courses/management/commands لأن projectBPL ليس تطبيقاً مثبتاً
+percentile مشتركة مع أوامر القياس الأخرى (bench_sqlite / stress_concurrency)
+"""
+import json
+import platform
+import statistics
+import time
+
+import django
+from django.conf import settings
+from django.core.cache import caches
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction
+from django.db.models import Count
+from django.test.utils import override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from account.last_login import last_login_buffer
+from account.models import CustomUser
+from account.tokens import RefreshToken
+from courses.models import Course
+from projects.models import Project
+
+from .middleware import QueryStats
+from .query_budgets import QUERY_BUDGETS
+
+
+class BenchmarkFixture:
+    """كائنات بيانات القياس من قاعدة البيانات الحالية (بنفس أسماء بيانات اختبار الميزانيات)"""
+
+    def __init__(self, learner_password, other_learners_count=20):
+        self.learner_password = learner_password
+        self.admin = CustomUser.objects.filter(user_type='admin', is_active=True).order_by('id').first()
+        if self.admin is None:
+            raise CommandError('لا يوجد مشرف في قاعدة البيانات، شغل seed_scale أولاً')
+
+        # متعلم منضم لعدة مسارات ومسار منضم إليه بأكبر عدد من المشاريع
+        self.learner = (
+            CustomUser.objects.filter(user_type='learner', is_active=True)
+            .annotate(courses_total=Count('enrolled_courses_as_learner'))
+            .filter(courses_total__gt=0)
+            .order_by('-courses_total', 'id')
+            .first()
+        )
+        if self.learner is None:
+            raise CommandError('لا يوجد متعلم منضم لأي مسار، شغل seed_scale أولاً')
+
+        visible_courses = Course.objects.filter(is_active=True, is_public=True)
+        self.course = (
+            visible_courses.filter(enrolled_learners=self.learner)
+            .order_by('-projects_count', 'id')
+            .first()
+        )
+        self.other_course = visible_courses.exclude(enrolled_learners=self.learner).order_by('id').first()
+        if self.course is None or self.other_course is None:
+            raise CommandError('البيانات لا تحتوي مساراً منضماً إليه ومساراً غير منضم إليه للمتعلم')
+
+        self.course_projects = list(
+            Project.objects.filter(course=self.course, is_active=True).order_by('order', 'id')
+        )
+        if not self.course_projects:
+            raise CommandError(f'المسار {self.course.id} لا يحتوي مشاريع نشطة')
+        self.project = self.course_projects[0]
+        self.other_learners = list(
+            CustomUser.objects.filter(user_type='learner', is_active=True)
+            .exclude(enrolled_courses_as_learner=self.other_course)
+            .order_by('id')[:other_learners_count]
+        )
+
+    @property
+    def learner_refresh(self):
+        # توكن جديد لكل تكرار (يُنشأ داخل المعاملة التي يتم التراجع عنها)
+        return str(RefreshToken.for_user(self.learner))
+
+
+def percentile(sorted_values, fraction):
+    if len(sorted_values) == 1:
+        return sorted_values[0]
+    position = (len(sorted_values) - 1) * fraction
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+class EndpointBenchmarkCommand(BaseCommand):
+    help = (
+        'قياس زمن الاستجابة (p50/p95/p99) وعدد الاستعلامات وحجم الاستجابة لكل مسار API '
+        'على البيانات الحالية (seed_scale) وحفظ النتائج كـ JSON للمقارنة بين تشغيلين. '
+        'طلبات الكتابة تُنفذ داخل معاملة يتم التراجع عنها '
+        '(مثال: python manage.py bench_endpoints --output before.json ثم --compare before.json)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=50, help='عدد الطلبات المقاسة لكل مسار')
+        parser.add_argument('--warmup', type=int, default=3, help='طلبات تحمية غير مقاسة لكل مسار')
+        parser.add_argument('--only', action='append', default=[], help='قياس المسارات التي تحتوي هذا النص فقط')
+        parser.add_argument('--cold', action='store_true', help='مسح ذاكرة التخزين المؤقت قبل كل طلب')
+        parser.add_argument('--password', default='Seed123!x', help='كلمة مرور المتعلم (لقياس تسجيل الدخول)')
+        parser.add_argument('--output', help='ملف JSON لحفظ النتائج')
+        parser.add_argument('--compare', help='ملف JSON سابق للمقارنة معه')
+        parser.add_argument(
+            '--threshold', type=float, default=10.0,
+            help='نسبة التراجع المسموحة في p95 (%%) قبل وسم المسار بتراجع الأداء'
+        )
+
+    def handle(self, *args, **options):
+        if options['iterations'] < 1:
+            raise CommandError('--iterations يجب أن يكون 1 على الأقل')
+
+        budgets = [
+            budget for budget in QUERY_BUDGETS
+            if not options['only'] or any(text in budget.label for text in options['only'])
+        ]
+        if not budgets:
+            raise CommandError('لا توجد مسارات مطابقة لـ --only')
+
+        fixture = BenchmarkFixture(options['password'])
+        self.cold = options['cold']
+        results = {}
+
+        # عميل الاختبار يرسل Host: testserver، وتسجيل الاستعلامات في DEBUG وسطر السجل لكل طلب
+        # يضيفان زمناً غير موجود في الإنتاج (عدد الاستعلامات يُقاس هنا مباشرة)
+        with override_settings(
+            ALLOWED_HOSTS=list(settings.ALLOWED_HOSTS) + ['testserver'],
+            DEBUG=False,
+            SQL_INSTRUMENTATION=False,
+        ):
+            for budget in budgets:
+                results[budget.label] = self._bench(budget, fixture, options['warmup'], options['iterations'])
+                self._print_result(budget.label, results[budget.label])
+
+        report = {
+            'meta': {
+                'created_at': timezone.now().isoformat(),
+                'iterations': options['iterations'],
+                'cold': self.cold,
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'database': connections['default'].vendor,
+                'rows': {
+                    'users': CustomUser.objects.count(),
+                    'courses': Course.objects.count(),
+                    'projects': Project.objects.count(),
+                    'enrollments': Course.enrolled_learners.through.objects.count(),
+                },
+            },
+            'endpoints': results,
+        }
+
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as handle:
+                json.dump(report, handle, ensure_ascii=False, indent=2)
+            self.stdout.write(self.style.SUCCESS(f'✅ تم حفظ النتائج في {options["output"]}'))
+
+        if options['compare']:
+            self._compare(options['compare'], results, options['threshold'])
+
+    def _client(self, user):
+        client = APIClient()
+        if user is not None:
+            client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}')
+        return client
+
+    def _clear_caches(self):
+        caches[getattr(settings, 'CATALOG_CACHE_ALIAS', 'default')].clear()
+        caches[getattr(settings, 'AUTH_USER_CACHE_ALIAS', 'default')].clear()
+
+    def _request(self, budget, fixture, client):
+        """طلب واحد داخل معاملة يتم التراجع عنها: (الزمن بالثواني، الاستعلامات، البايتات، الحالة)"""
+        stats = QueryStats()
+        with transaction.atomic():
+            url, data = budget.build(fixture)
+            if self.cold:
+                self._clear_caches()
+            with connections['default'].execute_wrapper(stats):
+                started = time.perf_counter()
+                response = getattr(client, budget.method)(url, data=data, format='json')
+                if response.streaming:
+                    size = sum(len(chunk) for chunk in response.streaming_content)
+                else:
+                    size = len(response.content)
+                elapsed = time.perf_counter() - started
+            # قيم last_login المعلقة تُكتب داخل نفس المعاملة ثم يُتراجع عنها
+            last_login_buffer.flush()
+            transaction.set_rollback(True)
+        return elapsed, stats.count, size, response.status_code
+
+    def _bench(self, budget, fixture, warmup, iterations):
+        user = getattr(fixture, budget.user) if budget.user else None
+        client = self._client(user)
+        for _ in range(warmup):
+            self._request(budget, fixture, client)
+
+        timings, queries, sizes, statuses = [], [], [], set()
+        for _ in range(iterations):
+            elapsed, query_count, size, status_code = self._request(budget, fixture, client)
+            timings.append(elapsed * 1000)
+            queries.append(query_count)
+            sizes.append(size)
+            statuses.add(status_code)
+
+        timings.sort()
+        return {
+            'p50_ms': round(percentile(timings, 0.50), 3),
+            'p95_ms': round(percentile(timings, 0.95), 3),
+            'p99_ms': round(percentile(timings, 0.99), 3),
+            'mean_ms': round(statistics.fmean(timings), 3),
+            'queries': max(queries),
+            'bytes': max(sizes),
+            'status': sorted(statuses),
+            'expected_status': budget.status,
+            'iterations': iterations,
+        }
+
+    def _print_result(self, label, result):
+        line = (
+            f'{label:<50} p50={result["p50_ms"]:>8.2f}ms p95={result["p95_ms"]:>8.2f}ms '
+            f'p99={result["p99_ms"]:>8.2f}ms queries={result["queries"]:>3} bytes={result["bytes"]}'
+        )
+        if result['status'] != [result['expected_status']]:
+            self.stdout.write(self.style.WARNING(f'{line} ⚠️ الحالة {result["status"]}'))
+        else:
+            self.stdout.write(line)
+
+    def _compare(self, path, results, threshold):
+        try:
+            with open(path, encoding='utf-8') as handle:
+                baseline = json.load(handle)['endpoints']
+        except (OSError, ValueError, KeyError) as error:
+            raise CommandError(f'تعذر قراءة ملف المقارنة {path}: {error}')
+
+        self.stdout.write(f'\nالمقارنة مع {path} (التراجع المسموح في p95: {threshold}%)')
+        regressions = 0
+        for label, result in results.items():
+            previous = baseline.get(label)
+            if previous is None:
+                self.stdout.write(f'{label:<50} (جديد)')
+                continue
+            change = (
+                (result['p95_ms'] - previous['p95_ms']) / previous['p95_ms'] * 100
+                if previous['p95_ms'] else 0.0
+            )
+            line = (
+                f'{label:<50} p95 {previous["p95_ms"]:.2f} → {result["p95_ms"]:.2f}ms ({change:+.1f}%) '
+                f'queries {previous["queries"]} → {result["queries"]} '
+                f'bytes {previous["bytes"]} → {result["bytes"]}'
+            )
+            if change > threshold or result['queries'] > previous['queries']:
+                regressions += 1
+                self.stdout.write(self.style.WARNING(f'{line} ⚠️'))
+            else:
+                self.stdout.write(line)
+
+        summary = f'{regressions} مسار تراجع أداؤه'
+        self.stdout.write(self.style.WARNING(summary) if regressions else self.style.SUCCESS(f'✅ {summary}'))
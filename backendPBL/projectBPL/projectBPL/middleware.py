@@ -0,0 +1,143 @@
+# projectBPL/middleware.py
+import json
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+from rest_framework.permissions import SAFE_METHODS
+
+from courses.replicas import mark_user_sticky
+
+logger = logging.getLogger('projectBPL.sql')
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r'\b\d+(?:\.\d+)?\b')
+_IN_LIST = re.compile(r'\bIN\s*\((?:\s*\?\s*,?)+\)', re.IGNORECASE)
+_WHITESPACE = re.compile(r'\s+')
+
+
+class DuplicateQueryError(AssertionError):
+    """نفس الاستعلام (بعد التطبيع) نُفذ أكثر من الحد المسموح في طلب واحد (N+1)"""
+
+
+def normalize_sql(sql):
+    """بصمة الاستعلام: إزالة القيم الحرفية وتوحيد قوائم IN والمسافات"""
+    sql = _STRING_LITERAL.sub('?', sql)
+    sql = _NUMBER_LITERAL.sub('?', sql)
+    sql = sql.replace('%s', '?')
+    sql = _IN_LIST.sub('IN (...)', sql)
+    return _WHITESPACE.sub(' ', sql).strip()
+
+
+class QueryStats:
+    """عداد استعلامات طلب واحد (يُستخدم كـ execute_wrapper لكل اتصالات قاعدة البيانات)"""
+
+    def __init__(self, strict=False, duplicate_threshold=None):
+        self.strict = strict
+        self.duplicate_threshold = duplicate_threshold
+        self.count = 0
+        self.duration = 0.0
+        self.fingerprints = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        fingerprint = normalize_sql(sql)
+        self.fingerprints[fingerprint] += 1
+        self.count += 1
+
+        if (
+            self.strict and self.duplicate_threshold is not None
+            and self.fingerprints[fingerprint] > self.duplicate_threshold
+        ):
+            raise DuplicateQueryError(
+                f'الاستعلام نُفذ {self.fingerprints[fingerprint]} مرة في نفس الطلب '
+                f'(الحد {self.duplicate_threshold}): {fingerprint}'
+            )
+
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+
+    @property
+    def duration_ms(self):
+        return self.duration * 1000
+
+    def duplicates(self, minimum=2):
+        return [
+            {'sql': fingerprint, 'count': count}
+            for fingerprint, count in self.fingerprints.most_common()
+            if count >= minimum
+        ]
+
+    def server_timing(self):
+        duplicated = sum(count - 1 for count in self.fingerprints.values() if count > 1)
+        return (
+            f'db;dur={self.duration_ms:.1f};desc="{self.count} queries", '
+            f'dbdup;desc="{duplicated} repeated"'
+        )
+
+
+class QueryInstrumentationMiddleware:
+    """
+    قياس استعلامات كل طلب (العدد، الزمن الكلي، الاستعلامات المكررة) عند تفعيل SQL_INSTRUMENTATION:
+    - ترويسة Server-Timing في الاستجابة
+    - سطر JSON في السجل projectBPL.sql
+    - الوضع الصارم (SQL_INSTRUMENTATION_STRICT) يرفع DuplicateQueryError عندما يتكرر
+      نفس الاستعلام أكثر من SQL_DUPLICATE_QUERY_THRESHOLD مرة في نفس الطلب
+
+    ملاحظة: استعلامات الاستجابات المتدفقة (StreamingHttpResponse) بعد إرجاع العرض لا تُحتسب
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        # الإعدادات تُقرأ مع كل طلب حتى يعمل override_settings في الاختبارات
+        if not getattr(settings, 'SQL_INSTRUMENTATION', False):
+            return self.get_response(request)
+
+        stats = QueryStats(
+            strict=getattr(settings, 'SQL_INSTRUMENTATION_STRICT', False),
+            duplicate_threshold=getattr(settings, 'SQL_DUPLICATE_QUERY_THRESHOLD', 10)
+        )
+        request.query_stats = stats
+
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(stats))
+            response = self.get_response(request)
+
+        response['Server-Timing'] = stats.server_timing()
+        logger.info(json.dumps({
+            'method': request.method,
+            'path': request.get_full_path(),
+            'status': response.status_code,
+            'queries': stats.count,
+            'db_ms': round(stats.duration_ms, 2),
+            'duplicates': stats.duplicates(),
+        }, ensure_ascii=False))
+        return response
+
+
+class ReplicaStickinessMiddleware:
+    """
+    بعد كل طلب كتابة (POST/PUT/PATCH/DELETE) من مستخدم مصادَق تُقرأ طلباته التالية
+    من الرئيسية لمدة REPLICA_STICKY_SECONDS (read-your-writes مع نسخ القراءة)
+    المستخدم يُقرأ بعد العرض: مصادقة DRF تضعه على الطلب الأصلي
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if request.method not in SAFE_METHODS:
+            user = getattr(request, 'user', None)
+            if user is not None and user.is_authenticated:
+                mark_user_sticky(user.pk)
+        return response
@@ -0,0 +1,156 @@
+# projectBPL/query_budgets.py
+"""
+سجل ميزانيات الاستعلامات لكل مسار API (يُفحص في projectBPL/tests.py)
+
+كل مدخل يحدد: اسم المسار، الطريقة، المستخدم، الحد الأقصى لعدد الاستعلامات
+والحد الأقصى لحجم الاستجابة بالبايت على بيانات الاختبار (QueryBudgetTests.setUpTestData)
+
+- user: اسم المستخدم في بيانات الاختبار ('admin' أو 'learner') أو None لطلب بدون توكن
+- kwargs: معاملات المسار ← اسم الكائن في بيانات الاختبار (يُستخدم معرفه)
+- data: جسم الطلب (قاموس أو دالة تستقبل بيانات الاختبار وترجع الجسم)
+
+السجل نفسه يستخدمه أمر القياس bench_endpoints (projectBPL/benchmarks.py) على البيانات المولدة (seed_scale)
+
+عند أي تعديل يزيد عدد الاستعلامات يجب تحديث الميزانية هنا عن قصد
+"""
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional, Union
+
+from django.urls import reverse
+
+
+@dataclass(frozen=True)
+class QueryBudget:
+    url_name: str
+    max_queries: int
+    max_bytes: int
+    method: str = 'get'
+    user: Optional[str] = 'learner'
+    kwargs: dict = field(default_factory=dict)
+    query: str = ''
+    data: Union[dict, list, Callable[[Any], Any], None] = None
+    status: int = 200
+
+    @property
+    def label(self):
+        return f'{self.method.upper()} {self.url_name}{"?" + self.query if self.query else ""}'
+
+    def build(self, fixture):
+        """الرابط الكامل وجسم الطلب حسب كائنات بيانات الاختبار"""
+        url = reverse(self.url_name, kwargs={
+            name: getattr(fixture, attribute).pk for name, attribute in self.kwargs.items()
+        })
+        if self.query:
+            url = f'{url}?{self.query}'
+        data = self.data(fixture) if callable(self.data) else self.data
+        return url, data
+
+
+def _project_import_rows(fixture):
+    return [
+        {
+            'title': f'مشروع مستورد {index}',
+            'description': 'وصف المشروع المستورد وخطوات تنفيذه',
+            'estimated_time': 5,
+            'level': 'beginner',
+            'language': 'python',
+        }
+        for index in range(25)
+    ]
+
+
+QUERY_BUDGETS = (
+    # ===== account =====
+    QueryBudget(
+        'register-learner', 5, 1000, method='post', user=None, status=201,
+        data={'email': 'new.learner@example.com', 'password': 'Learner123!x', 'password2': 'Learner123!x'},
+    ),
+    QueryBudget(
+        'register-admin', 4, 1000, method='post', user=None, status=201,
+        data={'email': 'new.admin@example.com', 'password': 'Admin123!x', 'password2': 'Admin123!x'},
+    ),
+    QueryBudget(
+        'login', 3, 1500, method='post', user=None,
+        data=lambda fixture: {'email': fixture.learner.email, 'password': fixture.learner_password},
+    ),
+    QueryBudget(
+        'logout', 8, 500, method='post', status=205,
+        data=lambda fixture: {'refresh_token': fixture.learner_refresh},
+    ),
+    QueryBudget(
+        'token_refresh', 13, 1000, method='post', user=None,
+        data=lambda fixture: {'refresh': fixture.learner_refresh},
+    ),
+    QueryBudget('profile', 2, 1000),
+    QueryBudget('profile', 5, 1000, method='patch', data={'email': 'learner.renamed@example.com'}),
+    QueryBudget('learner-dashboard', 2, 8500),
+    QueryBudget('learner-progress', 2, 2500),
+
+    # ===== courses =====
+    QueryBudget('courses:list-courses', 5, 16000),
+    QueryBudget('courses:list-courses', 5, 1000, query='fields=id,title'),
+    QueryBudget(
+        'courses:create-course', 7, 500, method='post', user='admin', status=201,
+        data={
+            'title': 'مسار جديد', 'description': 'وصف المسار الجديد وأهدافه التعليمية', 'level': 'beginner',
+            'category': 'web', 'estimated_duration': 20, 'is_public': True,
+        },
+    ),
+    QueryBudget('courses:retrieve-course', 2, 1500, user='admin', kwargs={'id': 'course'}),
+    QueryBudget('courses:update-course', 2, 1000, user='admin', kwargs={'id': 'course'}),
+    QueryBudget(
+        'courses:update-course', 7, 500, method='put', user='admin', kwargs={'id': 'course'},
+        data={
+            'title': 'مسار معدل', 'description': 'وصف معدل للمسار وأهدافه التعليمية', 'level': 'advanced',
+            'category': 'data', 'estimated_duration': 30, 'is_public': True,
+        },
+    ),
+    QueryBudget('courses:confirm-delete', 4, 1500, user='admin', kwargs={'id': 'course'}),
+    QueryBudget('courses:delete-course', 10, 500, method='delete', user='admin', kwargs={'id': 'course'}),
+    QueryBudget('courses:course-detail', 8, 6500, kwargs={'id': 'course'}),
+    QueryBudget('courses:join-course', 14, 1500, method='post', kwargs={'id': 'other_course'}, status=201),
+    QueryBudget(
+        'courses:bulk-enroll', 9, 2000, method='post', user='admin', kwargs={'id': 'other_course'},
+        data=lambda fixture: {'learners': [learner.email for learner in fixture.other_learners]},
+    ),
+    QueryBudget('courses:my-courses', 4, 13000),
+    QueryBudget('courses:check-enrollment', 3, 500, kwargs={'id': 'course'}),
+    QueryBudget('courses:export-courses', 2, 13500, user='admin', query='output=ndjson'),
+    QueryBudget('courses:export-enrollments', 2, 1000, user='admin', query='output=csv'),
+
+    # ===== projects =====
+    QueryBudget(
+        'projects:create-project', 12, 500, method='post', user='admin', status=201,
+        data=lambda fixture: {
+            'course_id': fixture.course.id, 'title': 'مشروع جديد', 'description': 'وصف المشروع الجديد وخطوات تنفيذه',
+            'estimated_time': 8, 'level': 'beginner', 'language': 'python',
+        },
+    ),
+    QueryBudget(
+        'projects:update-project', 9, 1000, method='put', user='admin', kwargs={'pk': 'project'},
+        data={
+            'title': 'مشروع معدل', 'description': 'وصف معدل للمشروع وخطوات تنفيذه', 'estimated_time': 12,
+            'level': 'intermediate', 'language': 'javascript',
+        },
+    ),
+    QueryBudget('projects:confirm-delete', 2, 2500, user='admin', kwargs={'pk': 'project'}),
+    QueryBudget('projects:delete-project', 11, 1000, method='delete', user='admin', kwargs={'pk': 'project'}),
+    QueryBudget('projects:list-projects', 3, 71500),
+    QueryBudget('projects:list-projects', 3, 3000, query='fields=id,title,order'),
+    QueryBudget('projects:project-detail', 2, 1500, kwargs={'pk': 'project'}),
+    QueryBudget('projects:course-projects', 4, 5500, kwargs={'course_id': 'course'}),
+    QueryBudget(
+        'projects:import-projects', 10, 2500, method='post', user='admin', status=201,
+        kwargs={'course_id': 'course'}, data=_project_import_rows,
+    ),
+    QueryBudget(
+        'projects:reorder-projects', 8, 500, method='post', user='admin', kwargs={'course_id': 'course'},
+        data=lambda fixture: {'order': [project.id for project in reversed(fixture.course_projects)]},
+    ),
+    QueryBudget(
+        'projects:move-project', 10, 500, method='post', user='admin', kwargs={'pk': 'project'},
+        data=lambda fixture: {'after_id': fixture.course_projects[-1].id},
+    ),
+    QueryBudget('projects:start-project', 4, 1000, method='post', kwargs={'pk': 'project'}),
+    QueryBudget('projects:export-projects', 2, 57500, user='admin', query='output=ndjson'),
+)
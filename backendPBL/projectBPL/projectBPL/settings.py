@@ -13,6 +13,7 @@ https://docs.djangoproject.com/en/5.0/ref/settings/
 """
 
 import os
+import sys
 from pathlib import Path
 from datetime import timedelta
 
@@ -29,6 +30,9 @@ SECRET_KEY = 'django-insecure-your-secret-key-here-change-in-production'
 # SECURITY WARNING: don't run with debug turned on in production!
 DEBUG = True
 
+# تشغيل manage.py test (يعطل نسخ القراءة ويفعل القياس الصارم للاستعلامات)
+TESTING = len(sys.argv) > 1 and sys.argv[1] == 'test'
+
 ALLOWED_HOSTS = []
 
 
@@ -54,12 +58,14 @@ INSTALLED_APPS = [
     ]
 
 MIDDLEWARE = [
+    'projectBPL.middleware.QueryInstrumentationMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'projectBPL.middleware.ReplicaStickinessMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -92,9 +98,46 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'OPTIONS': {
+            # المعاملات تبدأ بـ BEGIN IMMEDIATE: الكاتب ينتظر القفل (busy_timeout)
+            # بدلاً من فشل ترقية قفل القراءة إلى كتابة فوراً بخطأ database is locked
+            'transaction_mode': 'IMMEDIATE',
+        },
     }
 }
 
+# إعدادات PRAGMA تُطبق عند فتح كل اتصال SQLite (courses/sqlite.py)
+# ويمكن تخصيصها لكل قاعدة بيانات بمفتاح PRAGMAS داخل DATABASES
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',        # القراء لا يحجبون الكاتب ولا العكس
+    'synchronous': 'NORMAL',      # آمن مع WAL ويوفر fsync لكل معاملة
+    'busy_timeout': 20000,        # انتظار القفل حتى 20 ثانية بالمللي ثانية
+    'mmap_size': 268435456,       # 256MB قراءة عبر الذاكرة المعينة
+    'cache_size': -65536,         # 64MB لكل اتصال (القيمة السالبة بالكيلوبايت)
+    'temp_store': 'MEMORY',
+}
+
+# نسخ القراءة (courses/replicas.py): مسارات ملفات SQLite مفصولة بفواصل في SQLITE_REPLICAS
+# مثال: SQLITE_REPLICAS=/srv/replica1.sqlite3,/srv/replica2.sqlite3
+# تُفتح للقراءة فقط وتُحدّث من الرئيسية بالأمر sync_sqlite_replicas
+# المتغير يُتجاهل أثناء الاختبارات: courses/tests.py يسجل نسختين مؤقتتين لاختبار التوجيه
+REPLICA_DATABASES = []
+_replica_paths = '' if TESTING else os.environ.get('SQLITE_REPLICAS', '')
+for _index, _path in enumerate(filter(None, _replica_paths.split(',')), start=1):
+    DATABASES[f'replica{_index}'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': _path.strip(),
+        'PRAGMAS': {'query_only': 'ON'},
+    }
+    REPLICA_DATABASES.append(f'replica{_index}')
+
+DATABASE_ROUTERS = ['courses.replicas.ReplicaRouter']
+
+# بعد أي كتابة يقرأ المستخدم من الرئيسية لمدة N ثانية، وهي أيضاً أقصى تأخير مقبول لنسخ القراءة
+# (مع عدة عمليات يجب أن تكون REPLICA_STICKY_CACHE_ALIAS ذاكرة مشتركة)
+REPLICA_STICKY_SECONDS = 10
+REPLICA_STICKY_CACHE_ALIAS = 'default'
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
@@ -144,13 +187,47 @@ MEDIA_ROOT = BASE_DIR / 'media'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Cache
+# الذاكرة المحلية افتراضياً (عملية واحدة)؛ عند التشغيل بعدة عمليات حدد CATALOG_CACHE_DIR
+# لاستخدام تخزين ملفات مشترك بحيث يصل إبطال الكتالوج لكل العمليات
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'projectbpl-default',
+    },
+}
+
+if os.environ.get('CATALOG_CACHE_DIR'):
+    CACHES['catalog'] = {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.environ['CATALOG_CACHE_DIR'],
+    }
+else:
+    CACHES['catalog'] = {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'projectbpl-catalog',
+    }
+
+# كتالوج المسارات والمشاريع المخزن (يُبطل تلقائياً مع كل كتابة عبر رقم الجيل)
+CATALOG_CACHE_ALIAS = 'catalog'
+CATALOG_CACHE_TIMEOUT = 300
+
 # Custom User Model
 AUTH_USER_MODEL = 'account.CustomUser'
 
+# الانضمام للمسارات يُقرأ من جدول الانضمام؛ تفعيل هذا الخيار يحافظ على نسخة مخزنة
+# من العناوين في CustomUser.enrolled_courses_titles (تُحدّث عند الانضمام والمغادرة فقط)
+ENROLLMENT_TITLES_CACHE = False
+
+# نسخة مخففة من المستخدم المصادَق تُخزن لكل معرف (بالثواني، 0 للتعطيل)
+# تُحذف عند حفظ المستخدم أو تحديثه جماعياً (update/delete)؛ مع عدة عمليات وذاكرة محلية
+# هذه المدة هي أقصى تأخير للتغييرات في العمليات الأخرى (حدد AUTH_USER_CACHE_ALIAS لذاكرة مشتركة)
+AUTH_USER_CACHE_TIMEOUT = 60
+
 # REST Framework Settings
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'account.authentication.CachedJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
@@ -193,6 +270,39 @@ SIMPLE_JWT = {
     'SLIDING_TOKEN_REFRESH_EXP_CLAIM': 'refresh_exp',
     'SLIDING_TOKEN_LIFETIME': timedelta(minutes=60),
     'SLIDING_TOKEN_REFRESH_LIFETIME': timedelta(days=1),
+    
+    # فحص القائمة السوداء عند التجديد عبر مرشح داخل العملية (account.tokens)
+    'TOKEN_REFRESH_SERIALIZER': 'account.serializers.TokenRefreshSerializer',
+}
+
+# مرشح التوكنات الملغاة: قراءة الإلغاءات الجديدة من العمليات الأخرى كل N ثانية
+# (أقصى مدة قد يُقبل فيها توكن أُلغي في عملية أخرى)، وإعادة البناء الكاملة كل ساعة
+TOKEN_BLACKLIST_FILTER_REFRESH_SECONDS = 1
+TOKEN_BLACKLIST_FILTER_REBUILD_SECONDS = 3600
+
+# تحديثات last_login تُجمع في الذاكرة وتُكتب دفعة واحدة كل N ثانية على الأكثر
+# (أقصى تأخير لقيمة آخر دخول في قاعدة البيانات، 0 = كتابة مباشرة مع كل دخول)
+LAST_LOGIN_MAX_STALENESS = 30
+
+# قياس استعلامات كل طلب (ترويسة Server-Timing وسطر في سجل projectBPL.sql)
+# الوضع الصارم يفشل الطلب عندما يتكرر نفس الاستعلام أكثر من الحد (N+1) ومفعل أثناء الاختبارات
+SQL_INSTRUMENTATION = DEBUG or TESTING
+SQL_INSTRUMENTATION_STRICT = TESTING
+SQL_DUPLICATE_QUERY_THRESHOLD = 10
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'projectBPL.sql': {
+            'handlers': ['console'],
+            'level': 'INFO' if DEBUG and not TESTING else 'WARNING',
+            'propagate': False,
+        },
+    },
 }
 
 # CORS Settings (لتطوير الواجهات الأمامية)
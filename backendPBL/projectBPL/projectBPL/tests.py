@@ -0,0 +1,166 @@
+# projectBPL/tests.py
+"""
+اختبارات ميزانية الاستعلامات: كل مسار في account و courses و projects له مدخل في
+projectBPL/query_budgets.py ويُفحص عدد استعلاماته وحجم استجابته على بيانات واقعية
+"""
+from collections import Counter
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.cache import caches
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from account import urls as account_urls
+from account.last_login import last_login_buffer
+from account.models import CustomUser
+from account.tokens import RefreshToken, revoked_tokens
+from courses import urls as courses_urls
+from courses.models import Course
+from projects import urls as projects_urls
+from projects.models import Project
+
+from .middleware import normalize_sql
+from .query_budgets import QUERY_BUDGETS
+
+COURSES_COUNT = 15
+ENROLLED_COURSES_COUNT = 12
+PROJECTS_PER_COURSE = 4
+OTHER_LEARNERS_COUNT = 20
+
+
+def registered_url_names():
+    names = set()
+    for module in (account_urls, courses_urls, projects_urls):
+        prefix = f'{module.app_name}:' if getattr(module, 'app_name', None) else ''
+        names.update(prefix + pattern.name for pattern in module.urlpatterns if pattern.name)
+    return names
+
+
+def format_queries(queries):
+    """قائمة الاستعلامات المنفذة مع الاستعلامات المكررة أولاً (لتحديد N+1 بسرعة)"""
+    fingerprints = Counter(normalize_sql(query['sql']) for query in queries)
+    duplicates = [
+        f'  x{count}: {fingerprint}'
+        for fingerprint, count in fingerprints.most_common() if count > 1
+    ]
+    lines = ['الاستعلامات المكررة:'] + duplicates if duplicates else []
+    lines.append('الاستعلامات المنفذة:')
+    lines.extend(f'  {index}. {query["sql"]}' for index, query in enumerate(queries, 1))
+    return '\n'.join(lines)
+
+
+@override_settings(SQL_INSTRUMENTATION=True, SQL_INSTRUMENTATION_STRICT=True)
+class QueryBudgetTests(TestCase):
+    """اختبار لكل مدخل في QUERY_BUDGETS (تُولد الدوال تلقائياً أسفل الملف)"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.learner_password = 'Learner123!x'
+        password = make_password(cls.learner_password)
+        cls.admin = CustomUser.objects.create_user(
+            'admin@example.com', 'Admin123!x', user_type='admin', first_name='مشرف', last_name='المسارات'
+        )
+        cls.learner = CustomUser.objects.create(
+            email='learner@example.com', password=password, user_type='learner'
+        )
+        cls.other_learners = CustomUser.objects.bulk_create([
+            CustomUser(
+                email=f'learner{index}@example.com', password=password, user_type='learner'
+            )
+            for index in range(OTHER_LEARNERS_COUNT)
+        ])
+
+        courses = [
+            Course.objects.create(
+                title=f'مسار {index}', description='وصف المسار ' * 20, level='beginner', category='web',
+                estimated_duration=10 + index, is_public=True, instructor=cls.admin
+            )
+            for index in range(COURSES_COUNT)
+        ]
+        Project.objects.bulk_create([
+            Project(
+                course=course, title=f'مشروع {course_index}-{index}', description='وصف المشروع ' * 20,
+                requirements='المتطلبات', objectives='الأهداف', resources='المصادر',
+                estimated_time=5, level='beginner', language='python', order=index + 1
+            )
+            for course_index, course in enumerate(courses)
+            for index in range(PROJECTS_PER_COURSE)
+        ])
+        Course.objects.recount_projects()
+
+        for course in courses[:ENROLLED_COURSES_COUNT]:
+            course.add_learner(cls.learner)
+        for learner in cls.other_learners[:5]:
+            courses[0].add_learner(learner)
+
+        cls.course = courses[0]
+        cls.other_course = courses[-1]
+        cls.course_projects = list(cls.course.projects.order_by('order'))
+        cls.project = cls.course_projects[0]
+        cls.learner_refresh = str(RefreshToken.for_user(cls.learner))
+
+    def setUp(self):
+        caches[getattr(settings, 'CATALOG_CACHE_ALIAS', 'default')].clear()
+        caches[getattr(settings, 'AUTH_USER_CACHE_ALIAS', 'default')].clear()
+        revoked_tokens.reset()
+
+    def tearDown(self):
+        # القيم المعلقة تُكتب داخل معاملة الاختبار ويُلغى مؤقت الكتابة
+        last_login_buffer.flush()
+
+    def get_client(self, user_name):
+        client = APIClient()
+        if user_name:
+            token = AccessToken.for_user(getattr(self, user_name))
+            client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        return client
+
+    def run_budget(self, budget):
+        client = self.get_client(budget.user)
+        url, data = budget.build(self)
+
+        with CaptureQueriesContext(connection) as context:
+            response = getattr(client, budget.method)(url, data=data, format='json')
+            if response.streaming:
+                content = b''.join(response.streaming_content)
+            else:
+                content = response.content
+
+        self.assertEqual(
+            response.status_code, budget.status,
+            f'{budget.label}: الحالة {response.status_code}\n{content[:1000].decode("utf-8", "replace")}'
+        )
+        self.assertLessEqual(
+            len(context.captured_queries), budget.max_queries,
+            f'{budget.label}: {len(context.captured_queries)} استعلام (الميزانية {budget.max_queries})\n'
+            f'{format_queries(context.captured_queries)}'
+        )
+        self.assertLessEqual(
+            len(content), budget.max_bytes,
+            f'{budget.label}: حجم الاستجابة {len(content)} بايت (الميزانية {budget.max_bytes})'
+        )
+
+    def test_every_url_has_a_budget(self):
+        budgeted = {budget.url_name for budget in QUERY_BUDGETS}
+        self.assertEqual(registered_url_names() - budgeted, set(), 'مسارات بدون ميزانية استعلامات')
+        self.assertEqual(budgeted - registered_url_names(), set(), 'ميزانيات لمسارات غير موجودة')
+
+
+def _make_budget_test(budget):
+    def test(self):
+        self.run_budget(budget)
+    test.__doc__ = budget.label
+    return test
+
+
+_test_names = Counter()
+for _budget in QUERY_BUDGETS:
+    _name = f'test_{_budget.method}_{_budget.url_name.replace(":", "_").replace("-", "_")}'
+    _test_names[_name] += 1
+    if _test_names[_name] > 1:
+        _name = f'{_name}_{_test_names[_name]}'
+    setattr(QueryBudgetTests, _name, _make_budget_test(_budget))
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-17 14:56
+
+from django.db import migrations, models
+
+ORDER_GAP = 1024
+
+
+def spread_orders(apps, schema_editor):
+    """إعادة توزيع الترتيب الحالي لكل مسار بمسافات ORDER_GAP (مسار بعد مسار)"""
+    Project = apps.get_model('projects', 'Project')
+
+    course_ids = Project.objects.order_by().values_list('course_id', flat=True).distinct()
+    for course_id in list(course_ids):
+        projects = list(
+            Project.objects.filter(course_id=course_id).order_by('order', 'created_at', 'id').only('id', 'order')
+        )
+        for index, project in enumerate(projects):
+            project.order = (index + 1) * ORDER_GAP
+        Project.objects.bulk_update(projects, ['order'], batch_size=300)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0004_backfill_enrollments_from_titles'),
+        ('projects', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(fields=['course', 'order'], name='project_course_order_idx'),
+        ),
+        migrations.RunPython(spread_orders, migrations.RunPython.noop),
+    ]
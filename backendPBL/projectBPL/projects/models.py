@@ -1,10 +1,14 @@
 # projects/models.py
-from django.db import models
+from django.db import connection, models, transaction
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
+from courses.cache import bump_generation
+from courses.counters import recount_projects
 from courses.models import Course
+from courses.tracking import DirtyFieldsMixin
 from account.models import CustomUser
 
-class Project(models.Model):
+class Project(DirtyFieldsMixin, models.Model):
     """نموذج مشروع تعليمي"""
     
     # مستويات المشروع
@@ -120,6 +124,7 @@ class Project(models.Model):
             models.Index(fields=['course', 'is_active']),
             models.Index(fields=['level']),
             models.Index(fields=['language']),
+            models.Index(fields=['course', 'order'], name='project_course_order_idx'),
         ]
         constraints = [
             models.UniqueConstraint(
@@ -133,31 +138,145 @@ class Project(models.Model):
         return f"{self.title} - {self.course.title}"
     
     def save(self, *args, **kwargs):
-        # إذا لم يتم تحديد ترتيب، اجعله الأخير في المسار
-        if not self.order:
-            last_project = Project.objects.filter(course=self.course).order_by('-order').first()
-            self.order = (last_project.order + 1) if last_project else 1
+        is_new = self._state.adding
+        # المسار وحالة التفعيل كما حُمّلت - لمعرفة متى يتغير عدد المشاريع في المسار
+        previous_course_id = self.get_loaded_value('course_id')
+        counted_state_changed = (
+            self.is_field_changed('course_id') or self.is_field_changed('is_active')
+        )
         
-        # حفظ المشروع
-        is_new = self.pk is None
-        super().save(*args, **kwargs)
-        
-        # ⭐⭐ تحديث عدد المشاريع في المسار بعد الحفظ (للجديد فقط)
-        if is_new:
-            self.course.update_projects_count()
+        with transaction.atomic():
+            # إذا لم يتم تحديد ترتيب، اجعله الأخير في المسار (تخصيص تحت القفل)
+            if not self.order:
+                self.order = Project.allocate_orders(self.course_id)[0]
+            
+            # حفظ المشروع - الأعمدة المتغيرة فقط عند التحديث
+            if not is_new:
+                kwargs['update_fields'] = self.get_save_update_fields(kwargs.get('update_fields'))
+            super().save(*args, **kwargs)
+            
+            # ⭐⭐ تحديث عدد المشاريع في نفس المعاملة: للجديد أو عند تغيير المسار/حالة التفعيل
+            if is_new or counted_state_changed:
+                self.course.update_projects_count()
+                if previous_course_id not in (None, self.course_id):
+                    recount_projects([previous_course_id])
+            self._snapshot_loaded_values()
     
     def delete(self, *args, **kwargs):
         """
-        الحذف الفعلي للمشروع مع تحديث عدد المشاريع في المسار
+        الحذف الفعلي للمشروع مع تحديث عدد المشاريع في المسار (في نفس المعاملة)
         """
         course = self.course
-        result = super().delete(*args, **kwargs)
-        
-        # تحديث عدد المشاريع في المسار بعد الحذف
-        course.update_projects_count()
+        with transaction.atomic():
+            result = super().delete(*args, **kwargs)
+            
+            # تحديث عدد المشاريع في المسار بعد الحذف
+            course.update_projects_count()
         
         return result
     
+    # ⭐⭐ الترتيب بمفاتيح متباعدة: الإضافة أو النقل يعدّل صفاً واحداً فقط
+    ORDER_GAP = 1024
+    
+    @staticmethod
+    def _lock_course(course_id):
+        """
+        قفل صف المسار حتى نهاية المعاملة لتسلسل تخصيص الترتيب
+        SQLite لا يدعم SELECT ... FOR UPDATE لذلك يُنفذ تحديث بدون أثر لأخذ قفل الكتابة
+        """
+        if connection.features.has_select_for_update:
+            list(Course.objects.select_for_update().filter(pk=course_id).values_list('pk', flat=True))
+        else:
+            Course.objects.filter(pk=course_id).update(projects_count=models.F('projects_count'))
+    
+    @classmethod
+    def allocate_orders(cls, course_id, count=1):
+        """
+        تخصيص count موضع في نهاية المسار تحت القفل (يجب استدعاؤها داخل transaction.atomic)
+        يستخدم فهرس (course, order) لقراءة أكبر ترتيب
+        """
+        cls._lock_course(course_id)
+        last_order = cls.objects.filter(course_id=course_id).aggregate(
+            last=models.Max('order')
+        )['last'] or 0
+        start = (last_order // cls.ORDER_GAP + 1) * cls.ORDER_GAP
+        return [start + index * cls.ORDER_GAP for index in range(count)]
+    
+    @classmethod
+    def renumber_course(cls, course_id, ordered_ids=None):
+        """
+        إعادة توزيع الترتيب بمسافات ORDER_GAP بـ bulk_update للصفوف المتغيرة فقط
+        (Django يقسمها لدفعات حسب حد المعاملات في SQLite: 999 / 4 = 249 مشروع لكل جملة)
+        ordered_ids: الترتيب الجديد المطلوب، وإلا يُحافظ على الترتيب الحالي
+        """
+        projects = {
+            project.pk: project
+            for project in cls.objects.filter(course_id=course_id).only('id', 'order')
+        }
+        if ordered_ids is None:
+            ordered_ids = sorted(projects, key=lambda pk: (projects[pk].order, pk))
+        
+        changed = []
+        now = timezone.now()
+        for index, pk in enumerate(ordered_ids):
+            project = projects[pk]
+            new_order = (index + 1) * cls.ORDER_GAP
+            if project.order != new_order:
+                project.order = new_order
+                project.updated_at = now
+                changed.append(project)
+        
+        cls.objects.bulk_update(changed, ['order', 'updated_at'])
+        if changed:
+            bump_generation()
+        return changed
+    
+    def move_after(self, previous=None):
+        """
+        نقل المشروع بعد مشروع آخر (أو إلى البداية إذا كان previous=None)
+        بحساب موضع في منتصف الفجوة بين الجارين - يعدّل صف هذا المشروع فقط
+        إلا إذا نفدت الفجوة فيُعاد توزيع المسار مرة واحدة
+        """
+        # savepoint=False: لا جزء يُلغى وحده، فلا حاجة لـ SAVEPOINT داخل معاملة الطلب
+        with transaction.atomic(savepoint=False):
+            self._lock_course(self.course_id)
+            siblings = Project.objects.filter(course_id=self.course_id).exclude(pk=self.pk)
+            
+            # ترتيب الجار يُقرأ تحت القفل (قد يكون نُقل أو حُذف بعد تحميله)
+            if previous is not None:
+                previous.order = siblings.filter(pk=previous.pk).values_list('order', flat=True).get()
+            lower = previous.order if previous is not None else 0
+            upper = siblings.filter(order__gt=lower).order_by('order').values_list('order', flat=True).first()
+            if upper is None:
+                upper = lower + 2 * self.ORDER_GAP
+            
+            if upper - lower < 2:
+                # لا توجد فجوة كافية: إعادة توزيع ثم إعادة المحاولة
+                Project.renumber_course(self.course_id)
+                return self.move_after(previous)
+            
+            self.order = (lower + upper) // 2
+            Project.objects.filter(pk=self.pk).update(order=self.order, updated_at=timezone.now())
+            bump_generation()
+        return self.order
+    
+    @classmethod
+    def import_for_course(cls, course, rows):
+        """
+        إنشاء دفعة مشاريع لمسار بـ bulk_create (بدون save لكل مشروع):
+        الترتيب يُحسب في الذاكرة بعد أكبر ترتيب موجود، وعدد المشاريع يُحدّث مرة واحدة
+        (يجب استدعاؤها داخل transaction.atomic)
+        """
+        projects = [cls(course=course, **row) for row in rows]
+        missing = [project for project in projects if not project.order]
+        for project, order in zip(missing, cls.allocate_orders(course.pk, len(missing))):
+            project.order = order
+        
+        created = cls.objects.bulk_create(projects, batch_size=500)
+        # bulk_create بدون post_save: تحديث العداد هو ما يُبطل الكتالوج (bump_generation)
+        course.update_projects_count()
+        return created
+    
     def get_absolute_url(self):
         """الحصول على رابط المشروع"""
         from django.urls import reverse
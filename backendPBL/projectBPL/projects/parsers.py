@@ -0,0 +1,34 @@
+# projects/parsers.py
+import csv
+import io
+
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+
+
+class CSVParser(BaseParser):
+    """تحويل محتوى CSV (صف العناوين + صف لكل مشروع) إلى قائمة قواميس"""
+
+    media_type = 'text/csv'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        try:
+            return rows_from_csv(stream.read().decode(encoding))
+        except (UnicodeDecodeError, csv.Error) as exc:
+            raise ParseError(f'CSV parse error - {exc}')
+
+
+def rows_from_csv(text):
+    """قراءة نص CSV مع تجاهل BOM والخلايا الفارغة (تُعامل كقيم غير مرسلة)"""
+    reader = csv.DictReader(io.StringIO(text.lstrip('\ufeff')))
+    rows = []
+    for row in reader:
+        rows.append({
+            key.strip(): value.strip()
+            for key, value in row.items()
+            if key and key.strip() and isinstance(value, str) and value.strip()
+        })
+    return rows
@@ -2,6 +2,8 @@
 from rest_framework import serializers
 from django.utils.translation import gettext_lazy as _
 from .models import Project
+from courses.eager import EagerLoadingMixin
+from courses.fieldsets import SparseFieldsetMixin
 from courses.models import Course
 
 
@@ -159,9 +161,44 @@ class ProjectCreateSerializer(serializers.ModelSerializer):
 
 
 
-class ProjectListSerializer(serializers.ModelSerializer):
+class ProjectImportRowSerializer(ProjectCreateSerializer):
+    """
+    Serializer لصف واحد في الاستيراد الجماعي - نفس قواعد الإنشاء
+    لكن بدون استعلامات لكل صف (المسار وتكرار العناوين يُتحقق منها دفعة واحدة)
+    """
+    
+    course_id = None
+    
+    class Meta(ProjectCreateSerializer.Meta):
+        fields = [
+            'title', 'description', 'requirements',
+            'objectives', 'resources', 'estimated_time',
+            'level', 'language', 'order'
+        ]
+    
+    def validate_title(self, value):
+        value = value.strip()
+        if len(value) < 3:
+            raise serializers.ValidationError(
+                _('العنوان يجب أن يكون على الأقل 3 أحرف')
+            )
+        return value
+
+
+class ProjectListSerializer(EagerLoadingMixin, SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer لعرض قائمة المشاريع"""
     
+    # ⭐ course_title / instructor_name / total_course_projects تمر على المسار ومشرفه
+    select_related_fields = ('course__instructor',)
+    
+    # ⭐ الأعمدة النصية الطويلة لا تُقرأ إذا لم تُطلب (?fields= / ?omit=)
+    deferrable_fields = {
+        'description': 'description',
+        'requirements': 'requirements',
+        'objectives': 'objectives',
+        'resources': 'resources',
+    }
+    
     # ⭐ تغيير: استخدام id بدلاً من project_id
     project_id = serializers.IntegerField(source='id')
     course_id = serializers.IntegerField(source='course.id')
@@ -321,9 +358,11 @@ class ProjectUpdateSerializer(serializers.ModelSerializer):
 
 # projects/serializers.py - إضافة في نهاية الملف
 
-class ProjectDeleteConfirmationSerializer(serializers.ModelSerializer):
+class ProjectDeleteConfirmationSerializer(EagerLoadingMixin, serializers.ModelSerializer):
     """Serializer لعرض معلومات المشروع قبل الحذف"""
     
+    select_related_fields = ('course__instructor',)
+    
     course_info = serializers.SerializerMethodField()
     deletion_impact = serializers.SerializerMethodField()
     current_user = serializers.SerializerMethodField()
@@ -360,4 +399,28 @@ class ProjectDeleteConfirmationSerializer(serializers.ModelSerializer):
                 'email': request.user.email,
                 'role': 'مشرف' if request.user.is_admin else 'مستخدم'
             }
-        return None
\ No newline at end of file
+        return None
+
+
+class ProjectReorderSerializer(serializers.Serializer):
+    """الترتيب الجديد الكامل لمشاريع مسار: قائمة معرفات المشاريع بالترتيب المطلوب"""
+    
+    order = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        error_messages={
+            'required': _('قائمة الترتيب مطلوبة'),
+            'empty': _('قائمة الترتيب لا يمكن أن تكون فارغة'),
+        }
+    )
+    
+    def validate_order(self, value):
+        if len(set(value)) != len(value):
+            raise serializers.ValidationError(_('قائمة الترتيب تحتوي على معرفات مكررة'))
+        return value
+
+
+class ProjectMoveSerializer(serializers.Serializer):
+    """نقل مشروع بعد مشروع آخر في نفس المسار (after_id=null للنقل إلى البداية)"""
+    
+    after_id = serializers.IntegerField(required=True, allow_null=True)
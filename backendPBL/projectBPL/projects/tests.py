@@ -1,3 +1,227 @@
+# projects/tests.py
+"""
+اختبارات الاستيراد الجماعي للمشاريع (ImportProjectsView / Project.import_for_course)
+والترتيب بمسافات ORDER_GAP (move_after / renumber_course / ReorderProjectsView)
+"""
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
 
-# Create your tests here.
+from account.last_login import last_login_buffer
+from account.models import CustomUser
+from courses.cache import _bump_now
+from courses.models import Course
+
+from .models import Project
+
+
+def api_client(user):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}')
+    return client
+
+
+def project_row(title, **fields):
+    row = {
+        'title': title, 'description': 'وصف المشروع ' * 10,
+        'estimated_time': 5, 'level': 'beginner', 'language': 'python',
+    }
+    row.update(fields)
+    return row
+
+
+class ProjectImportTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = CustomUser.objects.create(email='admin@example.com', user_type='admin')
+        cls.course = Course.objects.create(
+            title='مسار الاستيراد', description='وصف المسار ' * 10, estimated_duration=10,
+            is_public=True, instructor=cls.admin
+        )
+        cls.existing = Project.objects.create(course=cls.course, **project_row('مشروع موجود'))
+
+    def setUp(self):
+        self.client = api_client(self.admin)
+        self.url = reverse('projects:import-projects', kwargs={'course_id': self.course.id})
+
+    def tearDown(self):
+        last_login_buffer.flush()
+
+    def assertNothingImported(self):
+        self.assertEqual(list(Project.objects.filter(course=self.course).values_list('title', flat=True)), ['مشروع موجود'])
+        self.course.refresh_from_db()
+        self.assertEqual(self.course.projects_count, 1)
+
+    def test_import_json(self):
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            response = self.client.post(
+                self.url, {'projects': [project_row('مشروع أول'), project_row('مشروع ثان')]}, format='json'
+            )
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertEqual(response.data['created_count'], 2)
+        self.assertEqual(response.data['course']['projects_count'], 3)
+
+        orders = [project['order'] for project in response.data['projects']]
+        self.assertEqual(orders, [self.existing.order + Project.ORDER_GAP, self.existing.order + 2 * Project.ORDER_GAP])
+        # إبطال واحد للكتالوج (من تحديث العداد)
+        self.assertEqual([callback for callback in callbacks if callback is _bump_now], [_bump_now])
+
+    def test_row_numbered_errors(self):
+        rows = [
+            project_row('مشروع صالح'),
+            project_row('مشروع بدون مستوى', level='impossible'),
+            project_row('مش'),
+            project_row('مشروع بدون وقت', estimated_time=''),
+        ]
+        response = self.client.post(self.url, {'projects': rows}, format='json')
+
+        self.assertEqual(response.status_code, 400, response.content)
+        errors = {item['row']: item['errors'] for item in response.data['errors']}
+        self.assertEqual(set(errors), {2, 3, 4})
+        self.assertIn('level', errors[2])
+        self.assertIn('title', errors[3])
+        self.assertIn('estimated_time', errors[4])
+        # كل شيء أو لا شيء: الصف الصالح لم يُحفظ
+        self.assertNothingImported()
+
+    def test_duplicate_titles(self):
+        rows = [
+            project_row('مشروع جديد'),
+            project_row('مشروع موجود'),
+            project_row('مشروع جديد'),
+        ]
+        response = self.client.post(self.url, {'projects': rows}, format='json')
+
+        self.assertEqual(response.status_code, 400, response.content)
+        self.assertEqual([item['row'] for item in response.data['errors']], [2, 3])
+        self.assertNothingImported()
+
+    def test_csv_upload(self):
+        content = (
+            '\ufefftitle,description,estimated_time,level,language\n'
+            f'مشروع من الملف,{"وصف المشروع " * 10},4,intermediate,go\n'
+        ).encode('utf-8')
+        upload = SimpleUploadedFile('projects.csv', content, content_type='text/csv')
+
+        response = self.client.post(self.url, {'file': upload}, format='multipart')
+        self.assertEqual(response.status_code, 201, response.content)
+        project = Project.objects.get(course=self.course, title='مشروع من الملف')
+        self.assertEqual((project.estimated_time, project.level, project.language), (4, 'intermediate', 'go'))
+
+    def test_csv_body_and_invalid_encoding(self):
+        body = f'title,description,estimated_time,level,language\nمشروع نصي,{"وصف المشروع " * 10},3,beginner,rust\n'
+        response = self.client.post(self.url, body.encode('utf-8'), content_type='text/csv')
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertEqual(response.data['projects'][0]['title'], 'مشروع نصي')
+
+        upload = SimpleUploadedFile('projects.csv', 'title\nمشروع'.encode('cp1256'), content_type='text/csv')
+        response = self.client.post(self.url, {'file': upload}, format='multipart')
+        self.assertEqual(response.status_code, 400, response.content)
+        self.assertIn('file', response.data['errors'])
+
+
+class ProjectOrderingTests(TestCase):
+    """الترتيب بمسافات ORDER_GAP: النقل بين جارين، إعادة التوزيع عند نفاد الفجوة، وإعادة الترتيب الكاملة"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = CustomUser.objects.create(email='admin@example.com', user_type='admin')
+        cls.course = Course.objects.create(
+            title='مسار الترتيب', description='وصف المسار ' * 10, estimated_duration=10,
+            is_public=True, instructor=cls.admin
+        )
+        cls.other_course = Course.objects.create(
+            title='مسار آخر', description='وصف المسار ' * 10, estimated_duration=10,
+            is_public=True, instructor=cls.admin
+        )
+        cls.projects = [
+            Project.objects.create(course=cls.course, **project_row(f'مشروع {index}'))
+            for index in range(3)
+        ]
+        cls.foreign = Project.objects.create(course=cls.other_course, **project_row('مشروع مسار آخر'))
+
+    def setUp(self):
+        self.client = api_client(self.admin)
+
+    def tearDown(self):
+        last_login_buffer.flush()
+
+    def orders(self):
+        return list(Project.objects.filter(course=self.course).order_by('order').values_list('id', 'order'))
+
+    def test_move_between_neighbours_updates_one_row(self):
+        first, second, third = self.projects
+        self.assertEqual([order for _, order in self.orders()], [1024, 2048, 3072])
+
+        self.assertEqual(third.move_after(first), 1536)
+        self.assertEqual(self.orders(), [(first.id, 1024), (third.id, 1536), (second.id, 2048)])
+
+        self.assertEqual(second.move_after(None), 512)
+
+    def test_exhausted_gap_renumbers_course(self):
+        first, second, third = self.projects
+        for project, order in zip(self.projects, (1, 2, 3)):
+            Project.objects.filter(pk=project.pk).update(order=order)
+        first.refresh_from_db()
+
+        # لا توجد فجوة بين 1 و 2: إعادة توزيع المسار ثم النقل
+        self.assertEqual(third.move_after(first), 1536)
+        self.assertEqual(self.orders(), [(first.id, 1024), (third.id, 1536), (second.id, 2048)])
+
+    def test_move_reads_previous_order_under_lock(self):
+        first, second, third = self.projects
+        stale = Project.objects.get(pk=second.pk)
+        # نُقل الجار بعد تحميله (طلب متزامن)
+        Project.objects.filter(pk=second.pk).update(order=4096)
+
+        # بعد 4096 لا يوجد مشروع: منتصف (4096, 4096 + 2 * ORDER_GAP)
+        self.assertEqual(first.move_after(stale), 4096 + Project.ORDER_GAP)
+        self.assertEqual([pk for pk, _ in self.orders()], [third.id, second.id, first.id])
+
+    def test_move_view_rejects_other_course(self):
+        url = reverse('projects:move-project', kwargs={'pk': self.projects[0].pk})
+        response = self.client.post(url, {'after_id': self.foreign.pk}, format='json')
+        self.assertEqual(response.status_code, 400, response.content)
+        self.assertIn('after_id', response.data['errors'])
+
+    def test_reorder_validation(self):
+        url = reverse('projects:reorder-projects', kwargs={'course_id': self.course.id})
+        first, second, third = (project.pk for project in self.projects)
+
+        response = self.client.post(url, {'order': [third, first]}, format='json')
+        self.assertEqual(response.status_code, 400, response.content)
+        self.assertEqual((response.data['missing'], response.data['unknown']), ([second], []))
+
+        response = self.client.post(url, {'order': [third, first, second, self.foreign.pk]}, format='json')
+        self.assertEqual(response.status_code, 400, response.content)
+        self.assertEqual((response.data['missing'], response.data['unknown']), ([], [self.foreign.pk]))
+
+        response = self.client.post(url, {'order': [third, first, first]}, format='json')
+        self.assertEqual(response.status_code, 400, response.content)
+        self.assertIn('order', response.data['errors'])
+
+        response = self.client.post(url, {'order': [third, first, second]}, format='json')
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(response.data['updated_count'], 3)
+        self.assertEqual(self.orders(), [(third, 1024), (first, 2048), (second, 3072)])
+
+    def test_reorder_large_course_in_batches(self):
+        Project.objects.bulk_create([
+            Project(course=self.course, order=(index + 4) * Project.ORDER_GAP, **project_row(f'مشروع إضافي {index}'))
+            for index in range(297)
+        ])
+        ordered_ids = list(
+            Project.objects.filter(course=self.course).order_by('-order').values_list('id', flat=True)
+        )
+
+        with CaptureQueriesContext(connection) as queries:
+            changed = Project.renumber_course(self.course.id, ordered_ids)
+        self.assertEqual(len(changed), 300)
+        updates = [query for query in queries if query['sql'].startswith('UPDATE')]
+        self.assertEqual(len(updates), 2)  # 249 مشروع لكل جملة في SQLite
+        self.assertEqual([pk for pk, _ in self.orders()], ordered_ids)
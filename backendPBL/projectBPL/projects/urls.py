@@ -9,6 +9,10 @@ from .views import (
     DeleteProjectView,
     ConfirmDeleteProjectView,  # ⭐ إضافة الاستيراد
     StartProjectView,
+    ImportProjectsView,
+    ReorderProjectsView,
+    MoveProjectView,
+    ProjectsExportView,
     
 )
 
@@ -22,7 +26,11 @@ urlpatterns = [
     path('', ListProjectsView.as_view(), name='list-projects'),
     path('<int:pk>/', ProjectDetailView.as_view(), name='project-detail'),
     path('course/<int:course_id>/', CourseProjectsView.as_view(), name='course-projects'),
+    path('course/<int:course_id>/import/', ImportProjectsView.as_view(), name='import-projects'),
+    path('course/<int:course_id>/reorder/', ReorderProjectsView.as_view(), name='reorder-projects'),
+    path('<int:pk>/move/', MoveProjectView.as_view(), name='move-project'),
     path('<int:pk>/start/', StartProjectView.as_view(), name='start-project'),
+    path('export/', ProjectsExportView.as_view(), name='export-projects'),
 
 
 ]
\ No newline at end of file
@@ -7,9 +7,16 @@ from rest_framework.exceptions import PermissionDenied, ValidationError
 from django.utils.translation import gettext_lazy as _
 from django.db import transaction
 from django.shortcuts import get_object_or_404
+from rest_framework.parsers import JSONParser, MultiPartParser
 from .models import Project
-from .serializers import ProjectCreateSerializer, ProjectListSerializer, ProjectDetailSerializer, ProjectUpdateSerializer, ProjectDeleteConfirmationSerializer
+from .parsers import CSVParser, rows_from_csv
+from .serializers import ProjectCreateSerializer, ProjectListSerializer, ProjectDetailSerializer, ProjectUpdateSerializer, ProjectDeleteConfirmationSerializer, ProjectImportRowSerializer, ProjectReorderSerializer, ProjectMoveSerializer
+from courses.cache import CatalogCacheMixin
+from courses.eager import EagerLoadingViewMixin
+from courses.exports import StreamingExportView
+from courses.conditional import ConditionalGetMixin, course_projects_state, queryset_state
 from courses.models import Course
+from courses.replicas import ReplicaReadViewMixin
 
 
 class IsCourseInstructor(permissions.BasePermission):
@@ -112,13 +119,237 @@ class CreateProjectView(generics.CreateAPIView):
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
-class ListProjectsView(generics.ListAPIView):
+class ImportProjectsView(APIView):
+    """
+    واجهة استيراد مشاريع مسار دفعة واحدة (مصفوفة JSON أو ملف/محتوى CSV)
+    التحقق دفعة واحدة، الإدراج بـ bulk_create، وإعادة حساب projects_count مرة واحدة
+    """
+    
+    MAX_ROWS = 1000
+    
+    permission_classes = [permissions.IsAuthenticated, IsCourseInstructor]
+    parser_classes = [JSONParser, CSVParser, MultiPartParser]
+    
+    def get_rows(self, request):
+        """استخراج صفوف المشاريع من الطلب حسب نوع المحتوى"""
+        data = request.data
+        upload = request.FILES.get('file') if hasattr(request, 'FILES') else None
+        if upload is not None:
+            try:
+                return rows_from_csv(upload.read().decode('utf-8'))
+            except UnicodeDecodeError:
+                raise ValidationError({'file': [_('يجب أن يكون الملف بترميز UTF-8')]})
+        if isinstance(data, dict):
+            data = data.get('projects')
+        if not isinstance(data, list):
+            raise ValidationError({'projects': [_('يجب إرسال قائمة مشاريع (JSON) أو ملف CSV')]})
+        return data
+    
+    @transaction.atomic
+    def post(self, request, course_id):
+        try:
+            course = Course.objects.get(id=course_id, is_active=True)
+        except Course.DoesNotExist:
+            return Response({
+                'success': False,
+                'message': _('المسار التعليمي غير موجود')
+            }, status=status.HTTP_404_NOT_FOUND)
+        
+        try:
+            rows = self.get_rows(request)
+        except ValidationError as e:
+            return Response({
+                'success': False,
+                'message': _('فشل استيراد المشاريع'),
+                'errors': e.detail
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        if not rows or len(rows) > self.MAX_ROWS:
+            return Response({
+                'success': False,
+                'message': _('فشل استيراد المشاريع'),
+                'errors': {'projects': [_('عدد المشاريع يجب أن يكون بين 1 و {}').format(self.MAX_ROWS)]}
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        serializer = ProjectImportRowSerializer(data=rows, many=True, context={'request': request})
+        serializer.is_valid()
+        errors = serializer.errors or []
+        # ListSerializer يُعيد الأخطاء كقائمة أو كقاموس مفهرس حسب إصدار DRF
+        indexed_errors = errors.items() if isinstance(errors, dict) else enumerate(errors)
+        row_errors = [
+            {'row': index + 1, 'errors': row}
+            for index, row in indexed_errors
+            if row
+        ]
+        
+        validated_rows = serializer.validated_data if not row_errors else []
+        
+        # ⭐ التحقق من قيد unique_project_title_per_course باستعلام واحد + التكرار داخل الدفعة
+        if validated_rows:
+            titles = [row['title'] for row in validated_rows]
+            existing_titles = set(
+                Project.objects.filter(course=course, title__in=titles).values_list('title', flat=True)
+            )
+            seen_titles = set()
+            for index, title in enumerate(titles):
+                if title in existing_titles:
+                    row_errors.append({'row': index + 1, 'errors': {
+                        'title': [_('يوجد بالفعل مشروع بهذا العنوان في هذا المسار')]
+                    }})
+                elif title in seen_titles:
+                    row_errors.append({'row': index + 1, 'errors': {
+                        'title': [_('العنوان مكرر داخل ملف الاستيراد')]
+                    }})
+                seen_titles.add(title)
+        
+        if row_errors:
+            return Response({
+                'success': False,
+                'message': _('فشل استيراد المشاريع - لم يتم حفظ أي مشروع'),
+                'errors': sorted(row_errors, key=lambda item: item['row'])
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        created = Project.import_for_course(course, validated_rows)
+        
+        return Response({
+            'success': True,
+            'message': _('تم استيراد المشاريع بنجاح'),
+            'course': {
+                'course_id': course.id,
+                'title': course.title,
+                'projects_count': course.projects_count,
+            },
+            'created_count': len(created),
+            'projects': [
+                {'project_id': project.id, 'title': project.title, 'order': project.order}
+                for project in created
+            ]
+        }, status=status.HTTP_201_CREATED)
+
+
+class ReorderProjectsView(APIView):
+    """
+    واجهة تطبيق ترتيب جديد كامل لمشاريع مسار بـ bulk_update (Project.renumber_course)
+    """
+    
+    permission_classes = [permissions.IsAuthenticated, IsCourseInstructor]
+    
+    @transaction.atomic
+    def post(self, request, course_id):
+        try:
+            course = Course.objects.get(id=course_id, is_active=True)
+        except Course.DoesNotExist:
+            return Response({
+                'success': False,
+                'message': _('المسار التعليمي غير موجود')
+            }, status=status.HTTP_404_NOT_FOUND)
+        
+        serializer = ProjectReorderSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response({
+                'success': False,
+                'message': _('فشل إعادة ترتيب المشاريع'),
+                'errors': serializer.errors
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        ordered_ids = serializer.validated_data['order']
+        
+        Project._lock_course(course.id)
+        course_project_ids = set(
+            Project.objects.filter(course=course).values_list('id', flat=True)
+        )
+        if set(ordered_ids) != course_project_ids:
+            return Response({
+                'success': False,
+                'message': _('فشل إعادة ترتيب المشاريع'),
+                'errors': {'order': [_('يجب أن تحتوي القائمة على جميع مشاريع المسار مرة واحدة فقط')]},
+                'missing': sorted(course_project_ids - set(ordered_ids)),
+                'unknown': sorted(set(ordered_ids) - course_project_ids),
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        changed = Project.renumber_course(course.id, ordered_ids)
+        
+        return Response({
+            'success': True,
+            'message': _('تم إعادة ترتيب المشاريع بنجاح'),
+            'course_id': course.id,
+            'updated_count': len(changed),
+            'order': [
+                {'project_id': pk, 'order': (index + 1) * Project.ORDER_GAP}
+                for index, pk in enumerate(ordered_ids)
+            ]
+        })
+
+
+class MoveProjectView(APIView):
+    """
+    واجهة نقل مشروع واحد داخل مسار - يُعدّل صف المشروع المنقول فقط
+    """
+    
+    permission_classes = [permissions.IsAuthenticated, IsCourseInstructor]
+    
+    @transaction.atomic
+    def post(self, request, pk):
+        try:
+            project = Project.objects.get(id=pk, is_active=True)
+        except Project.DoesNotExist:
+            return Response({
+                'success': False,
+                'message': _('المشروع غير موجود')
+            }, status=status.HTTP_404_NOT_FOUND)
+        
+        serializer = ProjectMoveSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response({
+                'success': False,
+                'message': _('فشل نقل المشروع'),
+                'errors': serializer.errors
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        after_id = serializer.validated_data['after_id']
+        previous = None
+        if after_id is not None:
+            if after_id == project.id:
+                return Response({
+                    'success': False,
+                    'message': _('فشل نقل المشروع'),
+                    'errors': {'after_id': [_('لا يمكن نقل المشروع بعد نفسه')]}
+                }, status=status.HTTP_400_BAD_REQUEST)
+            try:
+                previous = Project.objects.get(id=after_id, course_id=project.course_id)
+            except Project.DoesNotExist:
+                return Response({
+                    'success': False,
+                    'message': _('فشل نقل المشروع'),
+                    'errors': {'after_id': [_('المشروع المحدد غير موجود في نفس المسار')]}
+                }, status=status.HTTP_400_BAD_REQUEST)
+        
+        try:
+            new_order = project.move_after(previous)
+        except Project.DoesNotExist:
+            # حُذف المشروع المحدد أو نُقل لمسار آخر قبل أخذ القفل
+            return Response({
+                'success': False,
+                'message': _('فشل نقل المشروع'),
+                'errors': {'after_id': [_('المشروع المحدد غير موجود في نفس المسار')]}
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        return Response({
+            'success': True,
+            'message': _('تم نقل المشروع بنجاح'),
+            'project_id': project.id,
+            'order': new_order
+        })
+
+
+class ListProjectsView(ReplicaReadViewMixin, CatalogCacheMixin, ConditionalGetMixin, EagerLoadingViewMixin, generics.ListAPIView):
     """واجهة عرض قائمة المشاريع"""
     
+    catalog_cache_name = 'projects-list'
     serializer_class = ProjectListSerializer
     permission_classes = [permissions.IsAuthenticated]
     
-    def get_queryset(self):
+    def get_base_queryset(self):
         user = self.request.user
         
         # فلترة حسب المسار إذا تم تمرير course_id
@@ -150,32 +381,37 @@ class ListProjectsView(generics.ListAPIView):
                 is_active=True
             ).order_by('course', 'order')
     
+    def get_condition_state(self, request, *args, **kwargs):
+        # ⭐ فحص مسبق: آخر تعديل للمشاريع ومساراتها (العنوان وعدد المشاريع) وعدد الصفوف
+        return queryset_state(self.get_queryset(), 'course__updated_at')
+    
     def list(self, request, *args, **kwargs):
-        queryset = self.get_queryset()
+        # ⭐ استعلام واحد: العدد من الصفوف المحملة بدلاً من exists() و count()
+        projects = list(self.get_queryset())
         
-        if not queryset.exists():
+        if not projects:
             return Response({
                 'message': _('لا توجد مشاريع متاحة'),
                 'projects': []
             })
         
-        serializer = self.get_serializer(queryset, many=True)
+        serializer = self.get_serializer(projects, many=True)
         
         return Response({
             'message': _('تم جلب المشاريع بنجاح'),
-            'count': queryset.count(),
+            'count': len(projects),
             'projects': serializer.data
         })
 
 
-class ProjectDetailView(generics.RetrieveAPIView):
+class ProjectDetailView(ReplicaReadViewMixin, EagerLoadingViewMixin, generics.RetrieveAPIView):
     """واجهة عرض تفاصيل مشروع معين (UC-05 الخطوة 3)"""
     
     serializer_class = ProjectDetailSerializer
     permission_classes = [permissions.IsAuthenticated]
     lookup_field = 'pk'  # ⭐ تغيير: استخدام pk بدلاً من project_id
     
-    def get_queryset(self):
+    def get_base_queryset(self):
         user = self.request.user
         
         if user.is_admin:
@@ -201,20 +437,24 @@ class ProjectDetailView(generics.RetrieveAPIView):
         })
 
 
-class CourseProjectsView(generics.ListAPIView):
+class CourseProjectsView(CatalogCacheMixin, ConditionalGetMixin, EagerLoadingViewMixin, generics.ListAPIView):
     """واجهة عرض مشاريع مسار معين"""
     
+    catalog_cache_name = 'course-projects'
     serializer_class = ProjectListSerializer
     permission_classes = [permissions.IsAuthenticated]
     
-    def get_queryset(self):
+    def get_condition_state(self, request, *args, **kwargs):
+        return course_projects_state(Course.objects.all(), self.kwargs.get('course_id'))
+    
+    def get_base_queryset(self):
         user = self.request.user
         # ⭐ تغيير: استخدام course_id بدلاً من path_id
         course_id = self.kwargs.get('course_id')
         
         try:
             # ⭐ تغيير: البحث باستخدام id بدلاً من pathid
-            self.course = Course.objects.get(id=course_id)
+            self.course = Course.objects.select_related('instructor').get(id=course_id)
             
             if user.is_admin:
                 return Project.objects.filter(course=self.course, is_active=True)
@@ -230,9 +470,9 @@ class CourseProjectsView(generics.ListAPIView):
     def list(self, request, *args, **kwargs):
         """تعديل الـ response لإضافة معلومات إضافية"""
         try:
-            queryset = self.get_queryset()
+            projects = list(self.get_queryset())
             
-            if not queryset.exists():
+            if not projects:
                 return Response({
                     'message': _('لا توجد مشاريع في هذا المسار'),
                     'projects': [],
@@ -244,11 +484,11 @@ class CourseProjectsView(generics.ListAPIView):
                     }
                 })
             
-            serializer = self.get_serializer(queryset, many=True)
+            serializer = self.get_serializer(projects, many=True)
             
             return Response({
                 'message': _('تم جلب مشاريع المسار بنجاح'),
-                'count': queryset.count(),
+                'count': len(projects),
                 'course_info': {
                     'course_id': self.course.id,  # ⭐ تغيير
                     'title': self.course.title,
@@ -455,21 +695,21 @@ class DeleteProjectView(generics.DestroyAPIView):
 
 # projects/views.py - تحديث ConfirmDeleteProjectView
 
-class ConfirmDeleteProjectView(generics.RetrieveAPIView):
+class ConfirmDeleteProjectView(EagerLoadingViewMixin, generics.RetrieveAPIView):
     """واجهة تأكيد حذف مشروع (UC-06 الخطوة 4)"""
     
     serializer_class = ProjectDeleteConfirmationSerializer
     permission_classes = [permissions.IsAuthenticated, IsCourseInstructor]
     lookup_field = 'pk'
     
-    def get_queryset(self):
+    def get_base_queryset(self):
         return Project.objects.filter(is_active=True)
     
     def get_object(self):
         """الحصول على المشروع المطلوب"""
         pk = self.kwargs.get('pk')
         try:
-            return Project.objects.get(id=pk, is_active=True)
+            return self.get_queryset().get(id=pk)
         except Project.DoesNotExist:
             raise ValidationError(_('المشروع المطلوب غير موجود'))
     
@@ -591,6 +831,22 @@ class StartProjectView(APIView):
         
 
 
-
-
-
+class ProjectsExportView(StreamingExportView):
+    """تصدير كل المشاريع كـ NDJSON أو CSV للمشرفين (?course_id= لمسار واحد)"""
+    
+    export_name = 'projects'
+    export_columns = (
+        'id', 'course_id', 'title', 'description', 'requirements', 'objectives',
+        'resources', 'estimated_time', 'level', 'language', 'order', 'is_active',
+        'created_at', 'updated_at',
+    )
+    
+    def get_export_queryset(self):
+        queryset = Project.objects.order_by('id')
+        
+        course_id = self.request.query_params.get('course_id')
+        if course_id:
+            if not course_id.isdigit():
+                raise ValidationError({'course_id': _('معرف المسار يجب أن يكون رقماً صحيحاً')})
+            queryset = queryset.filter(course_id=course_id)
+        return queryset